@@ -49,8 +49,20 @@ def envision_cli():
     default=500,
     type=float,
 )
-def start_server(port, scenarios, max_capacity):
-    run(scenario_dirs=scenarios, max_capacity_mb=max_capacity, port=port)
+@click.option(
+    "-r",
+    "--recordings",
+    help="A list of binary (`.envb`) recordings to serve for playback.",
+    multiple=True,
+    default=[],
+)
+def start_server(port, scenarios, max_capacity, recordings):
+    run(
+        scenario_dirs=scenarios,
+        max_capacity_mb=max_capacity,
+        port=port,
+        recordings=recordings,
+    )
 
 
 envision_cli.add_command(start_server)
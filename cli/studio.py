@@ -17,14 +17,17 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
+import hashlib
+import json
 import multiprocessing
 import os
 import subprocess
 import sys
-from multiprocessing import Process, Semaphore, synchronize
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from multiprocessing.pool import ThreadPool
 from pathlib import Path
-from typing import Sequence
+from typing import Any, Dict, List, Sequence
 
 import click
 
@@ -60,20 +63,90 @@ def _build_single_scenario(clean: bool, allow_offset_map: bool, scenario: str):
     if clean:
         _clean(scenario)
 
-    scenario_root = Path(scenario)
-    scenario_root_str = str(scenario_root)
+    _build_scenario_py(scenario, force=True)
+    _build_map_glb(scenario, allow_offset_map, force=True)
 
+
+def _build_scenario_py(scenario: str, force: bool = False) -> bool:
+    """Runs the scenario's `scenario.py` if its inputs or outputs changed since it last
+    ran. Returns whether it ran.
+    """
+    scenario_root = Path(scenario)
     scenario_py = scenario_root / "scenario.py"
-    if scenario_py.exists():
-        _install_requirements(scenario_root)
-        subprocess.check_call([sys.executable, scenario_py])
+    if not scenario_py.exists():
+        return False
 
+    manifest = _read_manifest(scenario_root)
+    step = manifest.get(_SCENARIO_PY_STEP)
+    # The seeds are part of the scenario.py source.
+    inputs = _scenario_py_inputs(
+        scenario_root, step.get("dependencies", []) if step else []
+    )
+    if step and step["inputs"] == inputs:
+        stale_outputs = _stale_outputs(scenario_root, step["outputs"])
+        if not force and not stale_outputs:
+            return False
+    else:
+        # Generators keep existing outputs, drop those built from other inputs.
+        stale_outputs = list(step["outputs"]) if step else []
+
+    for output in stale_outputs:
+        if (scenario_root / output).exists():
+            (scenario_root / output).unlink()
+
+    _install_requirements(scenario_root)
+    dependencies = _run_scenario_py(scenario_py)
+
+    manifest[_SCENARIO_PY_STEP] = {
+        "inputs": _scenario_py_inputs(scenario_root, dependencies),
+        "dependencies": dependencies,
+        "outputs": {
+            str(path.relative_to(scenario_root)): _file_digest(path)
+            for path in _scenario_py_outputs(scenario_root)
+        },
+    }
+    _write_manifest(scenario_root, manifest)
+    return True
+
+
+def _build_map_glb(scenario: str, allow_offset_map: bool, force: bool = False) -> bool:
+    """Exports the scenario's road map to `map.glb` if the map or the export options
+    changed since it was last exported. Returns whether it was exported. The road map
+    is also compiled, so that simulations and the export load it instead of building
+    it.
+    """
+    from smarts.core.default_map_builder import compile_road_map
     from smarts.core.scenario import Scenario
 
-    traffic_histories = Scenario.discover_traffic_histories(scenario_root_str)
-    shift_to_origin = not allow_offset_map
+    scenario_root = Path(scenario)
+    scenario_root_str = str(scenario_root)
+    map_spec = Scenario.discover_map(
+        scenario_root_str, shift_to_origin=not allow_offset_map
+    )
+    map_spec_pkl = scenario_root / "map_spec.pkl"
+    inputs = _digest(
+        [_smarts_version(), str(allow_offset_map)]
+        + [
+            f"{path}:{_file_digest(path)}"
+            for path in _map_input_files(Path(map_spec.source))
+            + ([map_spec_pkl] if map_spec_pkl.exists() else [])
+        ]
+    )
+    manifest = _read_manifest(scenario_root)
+    step = manifest.get(_MAP_GLB_STEP)
+    up_to_date = (
+        not force
+        and step
+        and step["inputs"] == inputs
+        and not _stale_outputs(scenario_root, step["outputs"])
+    )
+
+    # Only reads the header of an existing snapshot.
+    compile_road_map(map_spec)
+    if up_to_date:
+        return False
 
-    map_spec = Scenario.discover_map(scenario_root_str, shift_to_origin=shift_to_origin)
+    # Loads the snapshot compiled above.
     road_map, _ = map_spec.builder_fn(map_spec)
     if not road_map:
         click.echo(
@@ -81,19 +154,171 @@ def _build_single_scenario(clean: bool, allow_offset_map: bool, scenario: str):
             "Please make sure the path passed is a valid Scenario with RoadNetwork file required "
             "(or a way to create one) for scenario building.".format(scenario_root_str)
         )
-        return
+        return False
 
-    road_map.to_glb(os.path.join(scenario_root, "map.glb"))
+    map_glb = scenario_root / "map.glb"
+    road_map.to_glb(str(map_glb))
+
+    manifest[_MAP_GLB_STEP] = {
+        "inputs": inputs,
+        "outputs": {map_glb.name: _file_digest(map_glb)},
+    }
+    _write_manifest(scenario_root, manifest)
+    return True
+
+
+_MANIFEST = "build_manifest.json"
+_SCENARIO_PY_STEP = "scenario.py"
+_MAP_GLB_STEP = "map.glb"
+# Artifacts generated by running scenario.py
+_SCENARIO_PY_OUTPUTS = [
+    "bubbles.pkl",
+    "missions.pkl",
+    "map_spec.pkl",
+    "friction_map.pkl",
+    "history_mission.pkl",
+    "*.rou.xml",
+    "*.rou.alt.xml",
+    "social_agents/*",
+    "traffic/*",
+    "*.shf",
+]
+
+
+# Runs scenario.py as `__main__` and records the source files of the modules it
+# imported from outside the Python installation and the smarts package.
+_RUN_SCENARIO_PY = """
+import json, os, runpy, site, sys
+import smarts
+scenario_py, dependencies_json = sys.argv[1:]
+sys.argv = [scenario_py]
+sys.path[0] = os.path.dirname(scenario_py)
+runpy.run_path(scenario_py, run_name="__main__")
+excluded = {sys.prefix, sys.base_prefix, os.path.dirname(smarts.__file__)}
+excluded.update(site.getsitepackages() + [site.getusersitepackages()])
+excluded = tuple(os.path.realpath(path) + os.sep for path in excluded)
+dependencies = set()
+for module in list(sys.modules.values()):
+    path = getattr(module, "__file__", None)
+    if path and os.path.isfile(path):
+        path = os.path.realpath(path)
+        if not path.startswith(excluded):
+            dependencies.add(path)
+with open(dependencies_json, "w") as f:
+    json.dump(sorted(dependencies), f)
+"""
+
+
+def _run_scenario_py(scenario_py: Path) -> List[str]:
+    """Runs `scenario.py` and returns the files of the modules it imported from
+    outside the scenario, the Python installation and smarts.
+    """
+    scenario_root = scenario_py.parent.resolve()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dependencies_json = os.path.join(tmp_dir, "dependencies.json")
+        subprocess.check_call(
+            [
+                sys.executable,
+                "-c",
+                _RUN_SCENARIO_PY,
+                str(scenario_py.resolve()),
+                dependencies_json,
+            ]
+        )
+        with open(dependencies_json) as f:
+            dependencies = json.load(f)
+    return [path for path in dependencies if scenario_root not in Path(path).parents]
+
+
+def _scenario_py_inputs(scenario_root: Path, dependencies: Sequence[str]) -> str:
+    return _digest(
+        [_smarts_version()]
+        + [
+            f"{path.relative_to(scenario_root)}:{_file_digest(path)}"
+            for path in _scenario_input_files(scenario_root)
+        ]
+        + [
+            f"{path}:{_file_digest(Path(path)) if Path(path).is_file() else None}"
+            for path in dependencies
+        ]
+    )
+
+
+def _scenario_input_files(scenario_root: Path) -> List[Path]:
+    generated = {scenario_root / _MANIFEST, scenario_root / "map.glb"}
+    for pattern in _SCENARIO_PY_OUTPUTS + _CLEAN_PATTERNS:
+        generated.update(scenario_root.glob(pattern))
+    return sorted(
+        path
+        for path in scenario_root.rglob("*")
+        if path.is_file()
+        and path not in generated
+        and "__pycache__" not in path.relative_to(scenario_root).parts
+    )
+
+
+def _scenario_py_outputs(scenario_root: Path) -> List[Path]:
+    return sorted(
+        {
+            path
+            for pattern in _SCENARIO_PY_OUTPUTS
+            for path in scenario_root.glob(pattern)
+            if path.is_file()
+        }
+    )
+
+
+def _map_input_files(map_source: Path) -> List[Path]:
+    if map_source.is_file():
+        return [map_source]
+    if not map_source.is_dir():
+        return []
+    return sorted(
+        path
+        for pattern in ("*.net.xml", "*.xodr")
+        for path in map_source.glob(pattern)
+        if not path.name.endswith("-AUTOGEN.net.xml")
+    )
+
+
+def _stale_outputs(scenario_root: Path, outputs: Dict[str, str]) -> List[str]:
+    return [
+        output
+        for output, digest in outputs.items()
+        if not (scenario_root / output).is_file()
+        or _file_digest(scenario_root / output) != digest
+    ]
 
 
-def _build_single_scenario_proc(
-    clean: bool, allow_offset_map: bool, scenario: str, semaphore: synchronize.Semaphore
-):
-    semaphore.acquire()
+def _read_manifest(scenario_root: Path) -> Dict[str, Any]:
     try:
-        _build_single_scenario(clean, allow_offset_map, scenario)
-    finally:
-        semaphore.release()
+        with open(scenario_root / _MANIFEST) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(scenario_root: Path, manifest: Dict[str, Any]):
+    with open(scenario_root / _MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _file_digest(path: Path) -> str:
+    hasher = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _digest(values: Sequence[str]) -> str:
+    return hashlib.md5("\n".join(values).encode()).hexdigest()
+
+
+def _smarts_version() -> str:
+    import smarts
+
+    return smarts.VERSION
 
 
 def _install_requirements(scenario_root):
@@ -169,24 +394,44 @@ def build_all_scenarios(clean: bool, allow_offset_maps: bool, scenarios: str):
         # if scenarios is not given, set /scenarios as default
         scenarios = ["scenarios"]
 
-    concurrency = max(1, multiprocessing.cpu_count() - 1)
-    sema = Semaphore(concurrency)
-    all_processes = []
+    to_build = []
     for scenarios_path in scenarios:
         for subdir, _, _ in os.walk(scenarios_path):
             if _is_scenario_folder_to_build(subdir):
                 p = Path(subdir)
                 scenario = f"{scenarios_path}/{p.relative_to(scenarios_path)}"
-                proc = Process(
-                    target=_build_single_scenario_proc,
-                    args=(clean, allow_offset_maps, scenario, sema),
+                if clean:
+                    _clean(scenario)
+                to_build.append(scenario)
+
+    # Each scenario's map.glb may depend on the map spec written by its scenario.py,
+    # otherwise the build steps are independent and share one pool of workers.
+    concurrency = max(1, multiprocessing.cpu_count() - 1)
+    failed = []
+    with ProcessPoolExecutor(max_workers=concurrency) as pool:
+        pending = {
+            pool.submit(_build_scenario_py, scenario): (scenario, _SCENARIO_PY_STEP)
+            for scenario in to_build
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                scenario, step = pending.pop(future)
+                try:
+                    built = future.result()
+                except Exception as e:
+                    click.echo(f"Failed to build {step} of {scenario}: {e}", err=True)
+                    failed.append(scenario)
+                    continue
+                click.echo(
+                    f"{'Built' if built else 'Up to date'}: {step} of {scenario}"
                 )
-                all_processes.append((scenario, proc))
-                proc.start()
+                if step == _SCENARIO_PY_STEP:
+                    future = pool.submit(_build_map_glb, scenario, allow_offset_maps)
+                    pending[future] = (scenario, _MAP_GLB_STEP)
 
-    for scenario_path, proc in all_processes:
-        click.echo(f"Waiting on {scenario_path} ...")
-        proc.join()
+    if failed:
+        raise click.ClickException(f"Failed to build scenarios: {', '.join(failed)}")
 
 
 @scenario_cli.command(
@@ -197,24 +442,27 @@ def clean_scenario(scenario: str):
     _clean(scenario)
 
 
+_CLEAN_PATTERNS = [
+    "map.glb",
+    "bubbles.pkl",
+    "missions.pkl",
+    "flamegraph-perf.log",
+    "flamegraph.svg",
+    "flamegraph.html",
+    "*.rou.xml",
+    "*.rou.alt.xml",
+    "social_agents/*",
+    "traffic/*",
+    "history_mission.pkl",
+    "*.shf",
+    "*-AUTOGEN.net.xml",
+    _MANIFEST,
+]
+
+
 def _clean(scenario: str):
-    to_be_removed = [
-        "map.glb",
-        "bubbles.pkl",
-        "missions.pkl",
-        "flamegraph-perf.log",
-        "flamegraph.svg",
-        "flamegraph.html",
-        "*.rou.xml",
-        "*.rou.alt.xml",
-        "social_agents/*",
-        "traffic/*",
-        "history_mission.pkl",
-        "*.shf",
-        "*-AUTOGEN.net.xml",
-    ]
     p = Path(scenario)
-    for file_name in to_be_removed:
+    for file_name in _CLEAN_PATTERNS:
         for f in p.glob(file_name):
             # Remove file
             f.unlink()
@@ -228,16 +476,19 @@ def replay(directory: Sequence[str], timestep: float, endpoint: str):
     from envision.client import Client as Envision
 
     for path in directory:
-        jsonl_paths = list(Path(path).glob("*.jsonl"))
+        record_paths = [
+            *Path(path).glob("*.jsonl"),
+            *Path(path).glob("*.envb"),
+        ]
         click.echo(
-            f"Replaying {len(jsonl_paths)} record(s) at path={path} with "
+            f"Replaying {len(record_paths)} record(s) at path={path} with "
             f"timestep={timestep}s"
         )
 
-        with ThreadPool(len(jsonl_paths)) as pool:
+        with ThreadPool(len(record_paths)) as pool:
             pool.starmap(
                 Envision.read_and_send,
-                [(jsonl, endpoint, timestep) for jsonl in jsonl_paths],
+                [(record, endpoint, timestep) for record in record_paths],
             )
 
 
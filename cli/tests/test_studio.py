@@ -0,0 +1,128 @@
+# MIT License
+#
+# Copyright (C) 2022. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+import shutil
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from cli import studio
+from smarts.core import default_map_builder
+
+SCENARIO_PY = """
+import pickle, sys
+from pathlib import Path
+
+sys.path.insert(0, {helpers!r})
+import tiny_helper
+
+with open({runs!r}, "a") as f:
+    f.write("run\\n")
+with open(Path(__file__).parent / "missions.pkl", "wb") as f:
+    pickle.dump(tiny_helper.MISSIONS, f)
+"""
+
+
+@pytest.fixture
+def scenario(tmp_path, monkeypatch):
+    monkeypatch.setattr(default_map_builder, "_compiled_map_dir", lambda: tmp_path)
+    helpers = tmp_path / "helpers"
+    helpers.mkdir()
+    (helpers / "tiny_helper.py").write_text("MISSIONS = ['a']\n")
+
+    scenario = tmp_path / "scenarios" / "tiny"
+    scenario.mkdir(parents=True)
+    shutil.copy("scenarios/loop/map.net.xml", scenario)
+    (scenario / "scenario.py").write_text(
+        SCENARIO_PY.format(helpers=str(helpers), runs=str(tmp_path / "runs.txt"))
+    )
+    return scenario
+
+
+def _runs(scenario: Path) -> int:
+    runs = scenario.parents[1] / "runs.txt"
+    return len(runs.read_text().splitlines()) if runs.exists() else 0
+
+
+def test_unchanged_build_is_a_no_op(scenario):
+    assert studio._build_scenario_py(str(scenario))
+    assert studio._build_map_glb(str(scenario), allow_offset_map=False)
+    assert (scenario / "missions.pkl").is_file()
+    assert (scenario / "map.glb").is_file()
+    manifest = (scenario / studio._MANIFEST).read_text()
+
+    assert not studio._build_scenario_py(str(scenario))
+    assert not studio._build_map_glb(str(scenario), allow_offset_map=False)
+    assert _runs(scenario) == 1
+    assert (scenario / studio._MANIFEST).read_text() == manifest
+
+
+@pytest.mark.parametrize("edited", ["scenario.py", "helper"])
+def test_edited_input_forces_rebuild(scenario, edited):
+    assert studio._build_scenario_py(str(scenario))
+
+    if edited == "scenario.py":
+        path = scenario / "scenario.py"
+        path.write_text(path.read_text() + "\n# edited\n")
+    else:
+        path = scenario.parents[1] / "helpers" / "tiny_helper.py"
+        path.write_text("MISSIONS = ['b']\n")
+
+    assert studio._build_scenario_py(str(scenario))
+    assert _runs(scenario) == 2
+    assert not studio._build_scenario_py(str(scenario))
+
+
+def test_deleted_or_modified_artifact_is_rebuilt(scenario):
+    assert studio._build_scenario_py(str(scenario))
+    assert studio._build_map_glb(str(scenario), allow_offset_map=False)
+
+    (scenario / "missions.pkl").unlink()
+    assert studio._build_scenario_py(str(scenario))
+    assert (scenario / "missions.pkl").is_file()
+    assert _runs(scenario) == 2
+
+    map_glb = (scenario / "map.glb").read_bytes()
+    (scenario / "map.glb").write_bytes(b"modified")
+    assert studio._build_map_glb(str(scenario), allow_offset_map=False)
+    assert (scenario / "map.glb").read_bytes() == map_glb
+
+
+def test_clean_resets_manifest(scenario):
+    scenarios = str(scenario.parent)
+    runner = CliRunner()
+    result = runner.invoke(studio.build_all_scenarios, [scenarios])
+    assert result.exit_code == 0, result.output
+    assert "Built: scenario.py" in result.output
+
+    result = runner.invoke(studio.build_all_scenarios, [scenarios])
+    assert result.exit_code == 0, result.output
+    assert "Built" not in result.output
+    assert _runs(scenario) == 1
+
+    result = runner.invoke(studio.build_all_scenarios, ["--clean", scenarios])
+    assert result.exit_code == 0, result.output
+    assert "Up to date" not in result.output
+    assert "Built: scenario.py" in result.output
+    assert "Built: map.glb" in result.output
+    assert _runs(scenario) == 2
+    assert (scenario / studio._MANIFEST).is_file()
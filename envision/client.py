@@ -20,10 +20,12 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import ctypes
 import json
 import logging
 import multiprocessing
 import re
+import threading
 import time
 import warnings
 from datetime import datetime
@@ -33,7 +35,7 @@ from typing import Optional, Union
 import numpy as np
 import websocket
 
-from envision import types
+from envision import recording, serialization, types
 from smarts.core.utils.file import unpack
 
 
@@ -65,6 +67,24 @@ class JSONEncoder(json.JSONEncoder):
 class Client:
     """Used to push state from SMARTS to Envision server while the simulation is
     running.
+
+    Args:
+        endpoint: The envision server to connect to.
+        wait_between_retries: The time between attempts to connect to the server.
+        output_dir: If given, the states are also recorded as `.jsonl` (or `.envb`
+            if `binary_recording`) in this directory.
+        sim_name: A name to identify the simulation by in envision.
+        headless: If the client should not connect to the server.
+        binary: If states are streamed to the server as compact binary frames (see
+            `envision.serialization`) instead of JSON. The server keeps the frames
+            compact and only decodes them to JSON for the web clients that watch.
+        binary_recording: If states are recorded as binary frames instead of JSON
+            lines.
+        max_fps: If given, at most this many states are sent per second of
+            simulation time, independent of the simulation step size.
+        detail: The level of detail of the sent states.
+        emit_unsubscribed: If states are sent while no web client watches the
+            simulation on the server. States are always sent while recording.
     """
 
     class QueueDone:
@@ -79,9 +99,21 @@ class Client:
         output_dir: Optional[str] = None,
         sim_name: Optional[str] = None,
         headless: bool = False,
+        binary: bool = True,
+        binary_recording: bool = False,
+        max_fps: Optional[float] = None,
+        detail: types.EmissionDetail = types.EmissionDetail(),
+        emit_unsubscribed: bool = True,
     ):
         self._log = logging.getLogger(self.__class__.__name__)
         self._headless = headless
+        self._binary = binary
+        self._min_frame_interval = 1 / max_fps if max_fps else 0
+        self._last_frame_time = None
+        self._detail = detail
+        self._emit_unsubscribed = emit_unsubscribed
+        # Set by the server through the websocket, see `envision.server`.
+        self._subscribed = multiprocessing.Value(ctypes.c_bool, True, lock=False)
 
         current_time = datetime.now().strftime("%Y%m%d%H%M%S%f")[:-4]
         client_id = current_time
@@ -98,13 +130,16 @@ class Client:
         if output_dir:
             output_dir = Path(f"{output_dir}/{int(time.time())}")
             output_dir.mkdir(parents=True, exist_ok=True)
-            path = (output_dir / client_id).with_suffix(".jsonl")
+            path = (output_dir / client_id).with_suffix(
+                ".envb" if binary_recording else ".jsonl"
+            )
             self._logging_queue = multiprocessing.Queue()
             self._logging_process = multiprocessing.Process(
                 target=self._write_log_state,
                 args=(
                     self._logging_queue,
                     path,
+                    binary_recording,
                 ),
             )
             self._logging_process.daemon = True
@@ -130,8 +165,34 @@ class Client:
         """Indicates if this client is disconnected from the remote."""
         return self._headless
 
+    @property
+    def detail(self) -> types.EmissionDetail:
+        """The level of detail of the sent states."""
+        return self._detail
+
+    def should_emit(self, frame_time: float) -> bool:
+        """Checks if a state for the given frame time would be sent. Building the
+        state can be skipped if not.
+        """
+        if (
+            self._last_frame_time is not None
+            and 0
+            <= frame_time - self._last_frame_time
+            < self._min_frame_interval - 1e-9
+        ):
+            return False
+        if self._logging_process:
+            return True
+        return not self._headless and (
+            self._emit_unsubscribed or self._subscribed.value
+        )
+
     @staticmethod
-    def _write_log_state(queue, path):
+    def _write_log_state(queue, path, binary=False):
+        if binary:
+            Client._write_binary_log_state(queue, path)
+            return
+
         with path.open("w", encoding="utf-8") as f:
             while True:
                 state = queue.get()
@@ -144,26 +205,48 @@ class Client:
 
                 f.write(f"{state}\n")
 
+    @staticmethod
+    def _write_binary_log_state(queue, path):
+        encoder = serialization.StateEncoder()
+        with recording.RecordingWriter(path) as writer:
+            while True:
+                state = queue.get()
+                if type(state) is Client.QueueDone:
+                    break
+
+                if isinstance(state, str):
+                    state = json.loads(state)
+                writer.write(encoder.encode(state))
+
     @staticmethod
     def read_and_send(
         path: str,
         endpoint: str = "ws://localhost:8081",
         fixed_timestep_sec: float = 0.1,
         wait_between_retries: float = 0.5,
+        binary: bool = True,
     ):
-        """Send a pre-recorded envision simulation to the envision server."""
+        """Send a pre-recorded envision simulation, either `.jsonl` or a binary
+        recording, to the envision server."""
         client = Client(
             endpoint=endpoint,
             wait_between_retries=wait_between_retries,
+            binary=binary,
         )
-        with open(path, "r") as f:
-            for line in f:
-                line = line.rstrip("\n")
-                time.sleep(fixed_timestep_sec)
-                client._send_raw(line)
-
-            client.teardown()
-            logging.info("Finished Envision data replay")
+        if recording.is_binary_recording(path):
+            with recording.Recording(path) as record:
+                for index in range(len(record)):
+                    time.sleep(fixed_timestep_sec)
+                    client._send_raw(record.frame(index))
+        else:
+            with open(path, "r") as f:
+                for line in f:
+                    line = line.rstrip("\n")
+                    time.sleep(fixed_timestep_sec)
+                    client._send_raw(line)
+
+        client.teardown()
+        logging.info("Finished Envision data replay")
 
     def _connect(
         self,
@@ -173,8 +256,24 @@ class Client:
     ):
         connection_established = False
         warned_about_connection = False
+        encoder = serialization.StateEncoder() if self._binary else None
+        decoder = serialization.StateDecoder()
+
+        def optionally_serialize_and_write(state: Union[types.State, str, bytes], ws):
+            if isinstance(state, bytes):
+                # A frame from a binary recording, forwarded as is. After a reconnect
+                # the server skips deltas until the next recorded keyframe.
+                if encoder:
+                    ws.send(state, websocket.ABNF.OPCODE_BINARY)
+                    return
+                state = json.dumps(decoder.decode(state))
+
+            if encoder:
+                if isinstance(state, str):
+                    state = json.loads(state)
+                ws.send(encoder.encode(state), websocket.ABNF.OPCODE_BINARY)
+                return
 
-        def optionally_serialize_and_write(state: Union[types.State, str], ws):
             # if not already serialized
             if not isinstance(state, str):
                 state = unpack(state)
@@ -205,25 +304,50 @@ class Client:
                 else:
                     self._log.info(logmsg)
 
-        def on_open(ws):
-            nonlocal connection_established
-            connection_established = True
+        def on_message(ws, message):
+            message = json.loads(message)
+            if "subscribers" in message:
+                self._subscribed.value = message["subscribers"] > 0
 
+        def send_states(ws):
             while True:
                 state = state_queue.get()
                 if type(state) is Client.QueueDone:
                     ws.close()
                     break
 
-                optionally_serialize_and_write(state, ws)
+                try:
+                    optionally_serialize_and_write(state, ws)
+                except Exception as e:
+                    on_error(ws, e)
+                    break
+
+        sender = None
+
+        def on_open(ws):
+            nonlocal connection_established, sender
+            connection_established = True
+            # Until the server reports otherwise (older servers never do)
+            self._subscribed.value = True
+            if encoder:
+                # The server needs a keyframe to decode the following deltas.
+                encoder.reset()
+
+            # Send from another thread so that the server's messages are received.
+            sender = threading.Thread(target=send_states, args=(ws,), daemon=True)
+            sender.start()
 
         def run_socket(endpoint, wait_between_retries):
-            nonlocal connection_established
+            nonlocal connection_established, sender
             tries = 1
             while True:
                 # TODO: use a real network socket instead (probably UDP)
                 ws = websocket.WebSocketApp(
-                    endpoint, on_error=on_error, on_close=on_close, on_open=on_open
+                    endpoint,
+                    on_error=on_error,
+                    on_close=on_close,
+                    on_open=on_open,
+                    on_message=on_message,
                 )
 
                 with warnings.catch_warnings():
@@ -231,6 +355,9 @@ class Client:
                     #      retry that cause annoying warnings within Python 3.8+
                     warnings.filterwarnings("ignore", category=ResourceWarning)
                     ws.run_forever()
+                if sender:
+                    sender.join()
+                    sender = None
 
                 if not connection_established:
                     self._log.info(f"Attempt {tries} to connect to Envision.")
@@ -251,12 +378,13 @@ class Client:
 
     def send(self, state: types.State):
         """Send the given envision state to the remote as the most recent state."""
+        self._last_frame_time = state.frame_time
         if not self._headless and self._process.is_alive():
             self._state_queue.put(state)
         if self._logging_process:
             self._logging_queue.put(state)
 
-    def _send_raw(self, state: str):
+    def _send_raw(self, state: Union[str, bytes]):
         """Skip serialization if we already have serialized data. This is useful if
         we are reading from file and forwarding through the websocket.
         """
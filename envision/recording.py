@@ -0,0 +1,225 @@
+# MIT License
+#
+# Copyright (C) 2022. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""Indexed binary envision recordings.
+
+A recording is laid out as:
+
+    MAGIC | version | frames | end marker | index | trailer
+
+where each frame is a binary frame from `envision.serialization` prefixed with its
+length and the end marker is a zero length. The index holds the time, location and
+keyframe of every frame and the trailer points to the index. A reader therefore
+memory-maps the recording and binary searches the index to seek to any time, without
+holding the episode in memory. Every keyframe starts a chunk of frames that decode
+independently of the rest of the recording.
+
+A recording that was cut short before its index was written (e.g. the recording
+process was killed) is indexed by scanning the frame headers when it is opened.
+"""
+import mmap
+import struct
+from typing import Optional
+
+import numpy as np
+
+from envision import serialization
+
+MAGIC = b"ENVR"
+VERSION = 1
+
+_FRAME_LENGTH = struct.Struct("<I")
+_TRAILER = struct.Struct("<QQ4s")
+_TRAILER_MAGIC = b"ENVI"
+
+INDEX_DTYPE = np.dtype(
+    [
+        ("frame_time", "<f8"),
+        ("offset", "<u8"),
+        ("length", "<u4"),
+        ("keyframe", "<u4"),
+    ]
+)
+"""An index entry. `keyframe` is the index entry of the keyframe the frame is
+relative to."""
+
+
+def is_binary_recording(path) -> bool:
+    """Checks if the file at the given path is a binary envision recording."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class RecordingWriter:
+    """Writes binary envision frames into an indexed recording.
+
+    Args:
+        path: The file to record to.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + bytes([VERSION]))
+        self._index = []
+        self._keyframe = None
+
+    def write(self, message: bytes):
+        """Appends a binary frame to the recording."""
+        header = serialization.read_header(message)
+        if header.keyframe:
+            self._keyframe = len(self._index)
+        elif self._keyframe is None:
+            raise ValueError("A recording must start with a keyframe")
+
+        self._file.write(_FRAME_LENGTH.pack(len(message)))
+        self._index.append(
+            (header.frame_time, self._file.tell(), len(message), self._keyframe)
+        )
+        self._file.write(message)
+
+    def close(self):
+        """Writes the index and closes the recording."""
+        if self._file.closed:
+            return
+
+        self._file.write(_FRAME_LENGTH.pack(0))
+        index_offset = self._file.tell()
+        self._file.write(np.array(self._index, dtype=INDEX_DTYPE).tobytes())
+        self._file.write(_TRAILER.pack(index_offset, len(self._index), _TRAILER_MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Recording:
+    """A memory-mapped binary envision recording.
+
+    Args:
+        path: The recording to open.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can not be mapped
+            self._file.close()
+            raise ValueError(f"Not a binary envision recording: {path}")
+        if self._mmap[: len(MAGIC) + 1] != MAGIC + bytes([VERSION]):
+            self.close()
+            raise ValueError(
+                f"Not a binary envision recording of a supported version: {path}"
+            )
+
+        self._index = self._read_index()
+        self._frame_times = self._index["frame_time"]
+
+    def _read_index(self) -> np.ndarray:
+        if len(self._mmap) >= len(MAGIC) + 1 + _TRAILER.size:
+            index_offset, count, magic = _TRAILER.unpack_from(
+                self._mmap, len(self._mmap) - _TRAILER.size
+            )
+            if magic == _TRAILER_MAGIC:
+                # A view of the mapped file, only the pages searched are read.
+                return np.frombuffer(
+                    self._mmap, dtype=INDEX_DTYPE, count=count, offset=index_offset
+                )
+        return self._scan_index()
+
+    def _scan_index(self) -> np.ndarray:
+        index = []
+        keyframe = None
+        offset = len(MAGIC) + 1
+        while offset + _FRAME_LENGTH.size <= len(self._mmap):
+            (length,) = _FRAME_LENGTH.unpack_from(self._mmap, offset)
+            offset += _FRAME_LENGTH.size
+            if length == 0 or offset + length > len(self._mmap):
+                break
+
+            header = serialization.read_header(
+                self._mmap[offset : offset + serialization.HEADER_SIZE]
+            )
+            if header.keyframe:
+                keyframe = len(index)
+            if keyframe is not None:
+                index.append((header.frame_time, offset, length, keyframe))
+            offset += length
+        return np.array(index, dtype=INDEX_DTYPE)
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def start_time(self) -> Optional[float]:
+        """The time of the first frame."""
+        return float(self._frame_times[0]) if len(self) else None
+
+    @property
+    def end_time(self) -> Optional[float]:
+        """The time of the last frame."""
+        return float(self._frame_times[-1]) if len(self) else None
+
+    def frame_time(self, index: int) -> float:
+        """The time of the frame at the given index."""
+        return float(self._frame_times[index])
+
+    def find(self, timestamp: float) -> int:
+        """Finds the first frame at or after the given time, or the last frame if
+        the recording ends before then."""
+        if len(self) == 0:
+            raise IndexError("The recording has no frames")
+        index = int(np.searchsorted(self._frame_times, timestamp, side="left"))
+        return min(index, len(self) - 1)
+
+    def frame(self, index: int) -> bytes:
+        """The binary frame at the given index."""
+        entry = self._index[index]
+        offset = int(entry["offset"])
+        return self._mmap[offset : offset + int(entry["length"])]
+
+    def keyframe_index(self, index: int) -> int:
+        """The index of the keyframe the frame at the given index is relative to."""
+        return int(self._index[index]["keyframe"])
+
+    def decode(self, index: int) -> dict:
+        """Decodes the frame at the given index into the full state dictionary."""
+        keyframe_index = self.keyframe_index(index)
+        keyframe = None if keyframe_index == index else self.frame(keyframe_index)
+        return serialization.decode_frame(self.frame(index), keyframe)
+
+    def close(self):
+        """Unmaps and closes the recording."""
+        # Views of the map must be released before it can be closed.
+        self._index = None
+        self._frame_times = None
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
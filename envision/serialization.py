@@ -0,0 +1,422 @@
+# MIT License
+#
+# Copyright (C) 2022. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""A compact binary wire format for envision states.
+
+Each frame is either a keyframe holding the full state or a delta holding only the
+parts of the state that differ from the most recent keyframe. Static data such as
+mission route geometry is therefore only sent with keyframes. Numeric sequences
+(positions, waypoints, driven paths, point clouds, ...) are quantized to integers
+and moved out of the JSON skeleton into a raw binary buffer.
+
+A frame is laid out as:
+
+    header | zlib(skeleton length | JSON skeleton | binary buffer)
+
+where the skeleton refers to arrays in the buffer with `{"$a": [dtype, shape,
+scale, offset]}` markers and stores homogeneous lists of dictionaries (such as
+waypoints) column-wise as `{"$t": {key: column}}` tables.
+"""
+import functools
+import json
+import math
+import struct
+import zlib
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+
+from smarts.core.utils.file import unpack
+
+MAGIC = b"ENVB"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBBId")
+HEADER_SIZE = _HEADER.size
+"""The size in bytes of the header that `read_header` reads."""
+_SKELETON_LENGTH = struct.Struct("<I")
+_KEYFRAME_FLAG = 0x1
+_COMPRESSED_FLAG = 0x2
+
+_QUANTIZATION_SCALE = 1000
+"""Floats are stored as integer multiples of 1/_QUANTIZATION_SCALE, i.e. millimeters
+for positions."""
+_INT32_LIMIT = 2 ** 31 - 1
+
+_ARRAY = "$a"
+_TABLE = "$t"
+_DELETED = "$del"
+_UNCHANGED = object()
+
+
+class FrameHeader(NamedTuple):
+    """The header of a binary envision frame."""
+
+    keyframe: bool
+    """If this frame holds a full state instead of a delta."""
+    keyframe_id: int
+    """The keyframe this frame is (or is relative to)."""
+    frame_time: float
+    """The simulation time of this frame."""
+
+
+class _Array:
+    __slots__ = ("dtype", "shape", "scale", "data")
+
+    def __init__(self, dtype: str, shape, scale: Optional[int], data: bytes):
+        self.dtype = dtype
+        self.shape = shape
+        self.scale = scale
+        self.data = data
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, _Array)
+            and self.data == other.data
+            and self.dtype == other.dtype
+            and self.shape == other.shape
+            and self.scale == other.scale
+        )
+
+
+class _DecodedArray(list):
+    """A decoded numeric array, which holds no further markers to expand."""
+
+
+def is_binary_frame(message) -> bool:
+    """Checks if the given websocket message is a binary envision frame."""
+    return isinstance(message, (bytes, bytearray)) and message[:4] == MAGIC
+
+
+def read_header(message: bytes) -> FrameHeader:
+    """Reads the header of a binary envision frame without decoding the state."""
+    magic, version, flags, keyframe_id, frame_time = _HEADER.unpack_from(message)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Unsupported envision frame (version={version})")
+    return FrameHeader(bool(flags & _KEYFRAME_FLAG), keyframe_id, frame_time)
+
+
+def decode_frame(message: bytes, keyframe: Optional[bytes] = None) -> dict:
+    """Decodes a binary envision frame into the full state dictionary.
+
+    Args:
+        message: The frame to decode.
+        keyframe: The keyframe the frame is relative to. Not needed if `message` is
+            itself a keyframe.
+    Returns:
+        The state as plain JSON compatible python objects.
+    """
+    header = read_header(message)
+    if header.keyframe:
+        return _expand(_load(message))
+
+    if keyframe is None:
+        raise ValueError("A keyframe is required to decode a delta frame")
+    keyframe_header = read_header(keyframe)
+    if not keyframe_header.keyframe or keyframe_header.keyframe_id != (
+        header.keyframe_id
+    ):
+        raise ValueError(
+            f"Frame is relative to keyframe {header.keyframe_id} which is not "
+            f"keyframe {keyframe_header.keyframe_id}"
+        )
+    return _expand(_apply(_load(keyframe), _load(message)))
+
+
+class StateEncoder:
+    """Encodes a stream of envision states into binary frames.
+
+    Args:
+        keyframe_interval: The number of frames between two keyframes.
+        compress: If the frame payloads should be zlib compressed.
+    """
+
+    def __init__(self, keyframe_interval: int = 50, compress: bool = True):
+        assert keyframe_interval > 0
+        self._keyframe_interval = keyframe_interval
+        self._compress = compress
+        self._keyframe = None
+        self._keyframe_id = 0
+        self._frames_since_keyframe = 0
+
+    def reset(self):
+        """Forces the next frame to be a keyframe. Use this when a new receiver
+        starts listening to the stream."""
+        self._keyframe = None
+
+    def encode(self, state) -> bytes:
+        """Encodes the next state of the stream.
+
+        Args:
+            state: The `envision.types.State` (or its unpacked dictionary form).
+        Returns:
+            The binary frame.
+        """
+        if not isinstance(state, dict):
+            state = unpack(state)
+        floats = []
+        packed = _pack(state, floats)
+        _quantize(floats)
+
+        keyframe = (
+            self._keyframe is None
+            or self._frames_since_keyframe >= self._keyframe_interval
+        )
+        if keyframe:
+            self._keyframe = packed
+            self._keyframe_id = (self._keyframe_id + 1) & 0xFFFFFFFF
+            self._frames_since_keyframe = 0
+            body = packed
+        else:
+            body = _diff(self._keyframe, packed)
+            if body is _UNCHANGED:
+                body = {}
+        self._frames_since_keyframe += 1
+
+        flags = _KEYFRAME_FLAG if keyframe else 0
+        payload = _dump(body)
+        if self._compress:
+            flags |= _COMPRESSED_FLAG
+            payload = zlib.compress(payload, 1)
+        header = _HEADER.pack(
+            MAGIC, VERSION, flags, self._keyframe_id, float(state["frame_time"])
+        )
+        return header + payload
+
+
+class StateDecoder:
+    """Decodes a stream of binary frames produced by a `StateEncoder`."""
+
+    def __init__(self):
+        self._keyframe = None
+
+    def decode(self, message: bytes) -> dict:
+        """Decodes the next frame of the stream into the full state dictionary."""
+        if read_header(message).keyframe:
+            self._keyframe = message
+        return decode_frame(message, self._keyframe)
+
+
+def _escape(key):
+    # Reserve keys starting with "$" for the format's own markers.
+    if isinstance(key, str) and key.startswith("$"):
+        return "$" + key
+    return key
+
+
+def _unescape(key: str):
+    return key[1:] if key.startswith("$") else key
+
+
+_SCALAR_TYPES = (str, float, int, bool, type(None))
+
+
+def _pack(value, floats: list):
+    # Float arrays are collected in `floats` to be quantized by `_quantize`.
+    if type(value) in _SCALAR_TYPES:
+        return value
+    if isinstance(value, dict):
+        return {_escape(k): _pack(v, floats) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return _pack_sequence(value, floats)
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in "iuf":
+            return _pack_array(value, floats)
+        return _pack(value.tolist(), floats)
+    if isinstance(value, np.bool_):
+        # Matches `envision.client.JSONEncoder` which the web client expects.
+        return "true" if value else "false"
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _pack_sequence(sequence, floats: list):
+    if len(sequence) == 0:
+        return []
+
+    first = sequence[0]
+    if isinstance(first, dict):
+        keys = first.keys()
+        if len(sequence) > 1 and all(
+            isinstance(v, dict) and v.keys() == keys for v in sequence
+        ):
+            return {
+                _TABLE: {
+                    _escape(k): _pack_sequence([v[k] for v in sequence], floats)
+                    for k in keys
+                }
+            }
+    elif not isinstance(first, (str, bool, type(None))):
+        try:
+            array = np.asarray(sequence)
+        except ValueError:
+            # Ragged sequence
+            array = None
+        if array is not None and array.dtype.kind in "iuf":
+            return _pack_array(array, floats)
+
+    return [_pack(v, floats) for v in sequence]
+
+
+def _pack_array(array: np.ndarray, floats: list):
+    if array.size == 0:
+        return array.tolist()
+
+    shape = list(array.shape)
+    if array.dtype.kind == "f":
+        # Holds the raw values until quantized.
+        packed = _Array("<f8", shape, None, array.astype(np.float64).ravel())
+        floats.append(packed)
+        return packed
+
+    array = array.astype(np.int64)
+    if np.abs(array).max() <= _INT32_LIMIT:
+        return _Array("<i4", shape, None, array.astype("<i4").tobytes())
+    return _Array("<i8", shape, None, array.astype("<i8").tobytes())
+
+
+def _quantize(floats: list):
+    # A state holds many small float arrays which are far cheaper to quantize all
+    # at once than one by one. Arrays with values that do not fit the quantization,
+    # including non-finite values, keep their raw floats.
+    if not floats:
+        return
+
+    sizes = [packed.data.size for packed in floats]
+    starts = np.cumsum(sizes) - sizes
+    values = np.concatenate([packed.data for packed in floats])
+    quantized = np.rint(values * _QUANTIZATION_SCALE)
+    # Also false for non-finite values.
+    in_range = np.abs(quantized) <= _INT32_LIMIT
+    data = np.where(in_range, quantized, 0).astype("<i4").tobytes()
+    fits = np.logical_and.reduceat(in_range, starts)
+    for packed, start, size, fit in zip(floats, starts.tolist(), sizes, fits.tolist()):
+        if fit:
+            packed.dtype = "<i4"
+            packed.scale = _QUANTIZATION_SCALE
+            packed.data = data[start * 4 : (start + size) * 4]
+        else:
+            packed.data = packed.data.astype("<f8").tobytes()
+
+
+def _non_finite_to_str(value):
+    # Matches `envision.client.JSONEncoder` which the web client expects.
+    if isinstance(value, list):
+        return [_non_finite_to_str(v) for v in value]
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "Infinity" if value > 0 else "-Infinity"
+    return value
+
+
+def _diff(base, value):
+    if type(base) is dict and type(value) is dict:
+        delta = {}
+        deleted = [k for k in base if k not in value]
+        if deleted:
+            delta[_DELETED] = deleted
+        for k, v in value.items():
+            if k in base:
+                v = _diff(base[k], v)
+                if v is _UNCHANGED:
+                    continue
+            delta[k] = v
+        return delta or _UNCHANGED
+
+    if base == value:
+        return _UNCHANGED
+    return value
+
+
+def _apply(base, delta):
+    if type(base) is not dict or type(delta) is not dict:
+        return delta
+
+    result = dict(base)
+    for k in delta.get(_DELETED, ()):
+        del result[k]
+    for k, v in delta.items():
+        if k == _DELETED:
+            continue
+        result[k] = _apply(base[k], v) if k in base else v
+    return result
+
+
+def _dump(body) -> bytes:
+    buffers = []
+    offset = 0
+
+    def default(obj):
+        nonlocal offset
+        if isinstance(obj, _Array):
+            buffers.append(obj.data)
+            marker = {_ARRAY: [obj.dtype, obj.shape, obj.scale, offset]}
+            offset += len(obj.data)
+            return marker
+        if isinstance(obj, np.generic):
+            return obj.item()
+        raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+    skeleton = json.dumps(body, default=default, separators=(",", ":")).encode()
+    return b"".join([_SKELETON_LENGTH.pack(len(skeleton)), skeleton, *buffers])
+
+
+@functools.lru_cache(maxsize=8)
+def _load(message: bytes):
+    # Cached since every delta frame is decoded against the same keyframe. Callers
+    # must not mutate the result.
+    flags = message[5]
+    payload = memoryview(message)[_HEADER.size :]
+    if flags & _COMPRESSED_FLAG:
+        payload = memoryview(zlib.decompress(payload))
+    (skeleton_length,) = _SKELETON_LENGTH.unpack_from(payload)
+    skeleton_end = _SKELETON_LENGTH.size + skeleton_length
+    skeleton = bytes(payload[_SKELETON_LENGTH.size : skeleton_end])
+    buffer = payload[skeleton_end:]
+
+    def object_hook(obj: dict):
+        if len(obj) == 1 and _ARRAY in obj:
+            dtype, shape, scale, offset = obj[_ARRAY]
+            dtype = np.dtype(dtype)
+            array = np.frombuffer(
+                buffer, dtype=dtype, count=int(np.prod(shape)), offset=offset
+            ).reshape(shape)
+            if scale is not None:
+                return _DecodedArray((array / scale).tolist())
+            if dtype.kind == "f" and not np.isfinite(array).all():
+                return _DecodedArray(_non_finite_to_str(array.tolist()))
+            return _DecodedArray(array.tolist())
+        return obj
+
+    return json.loads(skeleton, object_hook=object_hook)
+
+
+def _expand(value) -> Any:
+    if type(value) is dict:
+        if len(value) == 1 and _TABLE in value:
+            columns = {_unescape(k): _expand(v) for k, v in value[_TABLE].items()}
+            return [dict(zip(columns, row)) for row in zip(*columns.values())]
+        return {_unescape(k): _expand(v) for k, v in value.items()}
+    if type(value) is list:
+        return [_expand(v) for v in value]
+    return value
@@ -20,16 +20,18 @@
 import argparse
 import asyncio
 import bisect
+import functools
 import importlib.resources as pkg_resources
 import json
 import logging
 import random
+import re
 import signal
 import sys
 import threading
 import time
 from pathlib import Path
-from typing import Dict, Sequence, Union
+from typing import Dict, Optional, Sequence, Union
 
 import ijson
 import tornado.gen
@@ -40,6 +42,7 @@ import tornado.websocket
 from tornado.websocket import WebSocketClosedError
 
 import smarts.core.models
+from envision import recording, serialization
 from envision.types import State
 from envision.web import dist as web_dist
 from smarts.core.utils.file import path2hash
@@ -53,6 +56,9 @@ WEB_CLIENT_RUN_LOOPS = {}
 # Mapping of simulation ID to the Frames data store
 FRAMES = {}
 
+# Mapping of simulation ID to the websocket receiving the simulation's states
+BROADCAST_WEBSOCKETS = {}
+
 
 class AllowCORSMixin:
     """A mixin that adds CORS headers to the page."""
@@ -77,10 +83,20 @@ class AllowCORSMixin:
 class Frame:
     """A frame that describes a single envision simulation step."""
 
-    def __init__(self, data: str, timestamp: float, next_=None):
-        """data is a State object that was converted to string using json.dumps"""
+    def __init__(
+        self,
+        data: Union[str, bytes],
+        timestamp: float,
+        next_=None,
+        keyframe: Optional[bytes] = None,
+    ):
+        """data is a State object that was converted to string using json.dumps or
+        a binary frame from `envision.serialization`. Binary delta frames are decoded
+        against the given keyframe when their data is first requested.
+        """
         self._timestamp = timestamp
         self._data = data
+        self._keyframe = keyframe
         self._size = sys.getsizeof(data)
         self.next_ = next_
 
@@ -92,10 +108,12 @@ class Frame:
     @property
     def data(self):
         """The raw envision data."""
+        if isinstance(self._data, bytes):
+            return _decode_frame_to_json(self._data, self._keyframe)
         return self._data
 
     @data.setter
-    def data(self, data: str):
+    def data(self, data: Union[str, bytes]):
         self._data = data
         self._size = sys.getsizeof(data)
 
@@ -105,6 +123,13 @@ class Frame:
         return self._size
 
 
+@functools.lru_cache(maxsize=64)
+def _decode_frame_to_json(data: bytes, keyframe: Optional[bytes]) -> str:
+    # Web clients watching the same simulation or recording read the same frames, so
+    # each frame is only decoded once while the stored frames stay compact.
+    return json.dumps(serialization.decode_frame(data, keyframe))
+
+
 class Frames:
     """A managed collection of simulation frames.
     This collection uses a random discard of simulation frames to stay under capacity.
@@ -174,6 +199,79 @@ class Frames:
             del self._timestamps[idx_to_delete]
 
 
+class RecordedFrame:
+    """A frame of a binary recording that is read when its data is requested."""
+
+    def __init__(self, frames: "RecordedFrames", index: int):
+        self._frames = frames
+        self._index = index
+
+    @property
+    def timestamp(self):
+        """The timestamp for this frame."""
+        return self._frames.recording.frame_time(self._index)
+
+    @property
+    def data(self):
+        """The raw envision data."""
+        return self._frames.frame_data(self._index)
+
+    @property
+    def size(self):
+        """The byte size of the frame's raw data."""
+        return 0
+
+    @property
+    def next_(self):
+        """The following frame or `None` at the end of the recording."""
+        if self._index + 1 >= len(self._frames.recording):
+            return None
+        return RecordedFrame(self._frames, self._index + 1)
+
+
+class RecordedFrames:
+    """The frames of a binary recording (see `envision.recording`). The recording is
+    memory-mapped and searched through its index, so recordings of any length play
+    back without being held in memory.
+    """
+
+    def __init__(self, path):
+        self.recording = recording.Recording(path)
+        self._keyframe = (None, None)
+
+    @property
+    def start_frame(self):
+        """The first frame in all available frames."""
+        return RecordedFrame(self, 0) if len(self.recording) else None
+
+    @property
+    def start_time(self):
+        """The first timestamp in all available frames."""
+        return self.recording.start_time
+
+    @property
+    def elapsed_time(self):
+        """The total elapsed time between the first and last frame."""
+        if len(self.recording) == 0:
+            return 0
+        return self.recording.end_time - self.recording.start_time
+
+    def __call__(self, timestamp):
+        """Finds the nearest frame according to the given timestamp."""
+        return RecordedFrame(self, self.recording.find(timestamp))
+
+    def frame_data(self, index: int) -> str:
+        """The envision state of the frame at the given index as JSON."""
+        keyframe = None
+        keyframe_index = self.recording.keyframe_index(index)
+        if keyframe_index != index:
+            cached_index, keyframe = self._keyframe
+            if cached_index != keyframe_index:
+                keyframe = self.recording.frame(keyframe_index)
+                self._keyframe = (keyframe_index, keyframe)
+        return _decode_frame_to_json(self.recording.frame(index), keyframe)
+
+
 class WebClientRunLoop:
     """The run loop is like a "video player" for the simulation. It supports seeking
     and playback. The run loop wraps the web client handler and pushes the frame
@@ -271,6 +369,20 @@ class WebClientRunLoop:
                 return frame_ptr, frames_to_send
 
 
+def _notify_subscribers(simulation_id):
+    """Tells the envision client of a simulation how many web clients watch it, so
+    that it can skip sending states while there are none."""
+    broadcast_websocket = BROADCAST_WEBSOCKETS.get(simulation_id)
+    if broadcast_websocket is None:
+        return
+
+    subscribers = len(WEB_CLIENT_RUN_LOOPS.get(simulation_id, ()))
+    try:
+        broadcast_websocket.write_message(json.dumps({"subscribers": subscribers}))
+    except WebSocketClosedError:
+        pass
+
+
 class BroadcastWebSocket(tornado.websocket.WebSocketHandler):
     """This websocket receives the SMARTS state (the other end of the open websocket
     is held by the Envision Client (SMARTS)) and broadcasts it to all web clients
@@ -287,8 +399,12 @@ class BroadcastWebSocket(tornado.websocket.WebSocketHandler):
         self._logger.debug(f"Broadcast websocket opened for simulation={simulation_id}")
         self._simulation_id = simulation_id
         self._frames = Frames(max_capacity_mb=self._max_capacity_mb)
+        self._keyframe = None
+        self._keyframe_id = None
         FRAMES[simulation_id] = self._frames
         WEB_CLIENT_RUN_LOOPS[simulation_id] = set()
+        BROADCAST_WEBSOCKETS[simulation_id] = self
+        _notify_subscribers(simulation_id)
 
     def on_close(self):
         """Close the broadcast websocket."""
@@ -297,11 +413,31 @@ class BroadcastWebSocket(tornado.websocket.WebSocketHandler):
         )
         del WEB_CLIENT_RUN_LOOPS[self._simulation_id]
         del FRAMES[self._simulation_id]
+        del BROADCAST_WEBSOCKETS[self._simulation_id]
 
     async def on_message(self, message):
         """Asynchronously receive messages from the Envision client."""
-        frame_time = next(ijson.items(message, "frame_time", use_float=True))
-        self._frames.append(Frame(timestamp=frame_time, data=message))
+        if not serialization.is_binary_frame(message):
+            frame_time = next(ijson.items(message, "frame_time", use_float=True))
+            self._frames.append(Frame(timestamp=frame_time, data=message))
+            return
+
+        header = serialization.read_header(message)
+        if header.keyframe:
+            self._keyframe = message
+            self._keyframe_id = header.keyframe_id
+        elif header.keyframe_id != self._keyframe_id:
+            self._logger.warning(
+                f"Dropping frame relative to missing keyframe={header.keyframe_id}"
+            )
+            return
+        self._frames.append(
+            Frame(
+                timestamp=header.frame_time,
+                data=message,
+                keyframe=None if header.keyframe else self._keyframe,
+            )
+        )
 
 
 class StateWebSocket(tornado.websocket.WebSocketHandler):
@@ -312,6 +448,8 @@ class StateWebSocket(tornado.websocket.WebSocketHandler):
     def initialize(self):
         """Setup this websocket."""
         self._logger = logging.getLogger(self.__class__.__name__)
+        self._simulation_id = None
+        self._run_loop = None
 
     def check_origin(self, origin):
         """Check the validity of the message origin."""
@@ -336,17 +474,22 @@ class StateWebSocket(tornado.websocket.WebSocketHandler):
         )
 
         self._logger.debug(f"State websocket opened for simulation={simulation_id}")
+        self._simulation_id = simulation_id
         WEB_CLIENT_RUN_LOOPS[simulation_id].add(self._run_loop)
+        _notify_subscribers(simulation_id)
 
         self._run_loop.run_forever()
 
     def on_close(self):
         """Stop listening and close the socket."""
         self._logger.debug(f"State websocket closed")
-        for run_loop in WEB_CLIENT_RUN_LOOPS.values():
-            if self in run_loop:
+        if self._run_loop is None:
+            return
+        for run_loops in WEB_CLIENT_RUN_LOOPS.values():
+            if self._run_loop in run_loops:
                 self._run_loop.stop()
-                run_loop.remove(self._run_loop)
+                run_loops.remove(self._run_loop)
+        _notify_subscribers(self._simulation_id)
 
     async def on_message(self, message):
         """Asynchonously handle playback requests."""
@@ -487,8 +630,17 @@ def on_shutdown():
     tornado.ioloop.IOLoop.current().stop()
 
 
-def run(scenario_dirs, max_capacity_mb=500, port=8081):
+def load_recordings(paths: Sequence[Union[str, Path]]):
+    """Serve the given binary recordings as simulations named after their files."""
+    for path in paths:
+        simulation_id = re.sub(r"\W+", "_", Path(path).stem)
+        FRAMES[simulation_id] = RecordedFrames(path)
+        WEB_CLIENT_RUN_LOOPS[simulation_id] = set()
+
+
+def run(scenario_dirs, max_capacity_mb=500, port=8081, recordings=()):
     """Create and run an envision web server."""
+    load_recordings(recordings)
     app = make_app(scenario_dirs, max_capacity_mb)
     app.listen(port)
     logging.debug(f"Envision listening on port={port}")
@@ -532,9 +684,21 @@ def main():
         default=500,
         type=float,
     )
+    parser.add_argument(
+        "--recordings",
+        help="A list of binary (`.envb`) recordings to serve for playback.",
+        default=[],
+        type=str,
+        nargs="+",
+    )
     args = parser.parse_args()
 
-    run(scenario_dirs=args.scenarios, max_capacity_mb=args.max_capacity, port=args.port)
+    run(
+        scenario_dirs=args.scenarios,
+        max_capacity_mb=args.max_capacity,
+        port=args.port,
+        recordings=args.recordings,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+# MIT License
+#
+# Copyright (C) 2022. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+import json
+import time
+from collections import namedtuple
+
+import pytest
+import websocket
+
+from envision.client import Client as Envision
+
+FakeState = namedtuple("FakeState", ["frame_time"])
+
+
+@pytest.fixture
+def server_subscribers(monkeypatch):
+    """Mocks out the websockets.WebSocketApp with a server that reports the given
+    number of web clients watching the simulation."""
+    subscribers = []
+
+    class FakeWebSocketApp:
+        def __init__(self, endpoint, on_error, on_close, on_open, on_message):
+            self._on_open = on_open
+            self._on_message = on_message
+
+        def send(self, data, opcode=websocket.ABNF.OPCODE_TEXT):
+            return len(data)
+
+        def run_forever(self):
+            self._on_open(self)
+            for count in subscribers:
+                self._on_message(self, json.dumps({"subscribers": count}))
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(websocket, "WebSocketApp", FakeWebSocketApp)
+    return subscribers
+
+
+def _wait_for(condition, timeout=5):
+    start = time.time()
+    while not condition() and time.time() - start < timeout:
+        time.sleep(0.05)
+    return condition()
+
+
+def test_max_fps(server_subscribers):
+    envision = Envision(headless=True, max_fps=4)
+    # Headless clients that do not record have nothing to send to.
+    assert not envision.should_emit(0)
+
+    envision = Envision(max_fps=4, headless=False)
+    try:
+        emitted = []
+        for step in range(10):
+            frame_time = round(step * 0.1, 1)
+            if envision.should_emit(frame_time):
+                envision.send(FakeState(frame_time))
+                emitted.append(frame_time)
+        assert emitted == [0, 0.3, 0.6, 0.9]
+
+        # Time restarts, e.g. for a new simulation
+        assert envision.should_emit(0)
+    finally:
+        envision.teardown()
+
+
+@pytest.mark.parametrize("emit_unsubscribed", [True, False])
+def test_emission_follows_subscription(server_subscribers, emit_unsubscribed):
+    server_subscribers.append(0)
+    envision = Envision(emit_unsubscribed=emit_unsubscribed)
+    try:
+        if emit_unsubscribed:
+            time.sleep(0.5)
+            assert envision.should_emit(0)
+        else:
+            assert _wait_for(lambda: not envision.should_emit(0))
+    finally:
+        envision.teardown()
+
+
+def test_emission_resumes_on_subscription(server_subscribers):
+    server_subscribers.extend([0, 1])
+    envision = Envision(emit_unsubscribed=False)
+    try:
+        time.sleep(0.5)
+        assert envision.should_emit(0)
+    finally:
+        envision.teardown()
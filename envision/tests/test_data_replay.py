@@ -27,6 +27,7 @@ from pathlib import Path
 import pytest
 import websocket
 
+from envision import serialization
 from envision.client import Client as Envision
 from envision.utils.multiprocessing_queue import Queue
 from smarts.core.agent import Agent
@@ -77,12 +78,12 @@ def fake_websocket_app_class():
         store them locally for later evaluation.
         """
 
-        def __init__(self, endpoint, on_error, on_close, on_open):
+        def __init__(self, endpoint, on_error, on_close, on_open, on_message=None):
             self._on_error = on_error
             self._on_close = on_close
             self._on_open = on_open
 
-        def send(self, data):
+        def send(self, data, opcode=websocket.ABNF.OPCODE_TEXT):
             sent.put(data)
             return len(data)
 
@@ -95,7 +96,17 @@ def fake_websocket_app_class():
     return FakeWebSocketApp, sent
 
 
-def test_data_replay(agent_spec, scenarios_iterator, data_replay_path, monkeypatch):
+@pytest.mark.parametrize(
+    "binary, binary_recording", [(False, False), (True, False), (True, True)]
+)
+def test_data_replay(
+    agent_spec,
+    scenarios_iterator,
+    data_replay_path,
+    monkeypatch,
+    binary,
+    binary_recording,
+):
     """We stub out the websocket the Envision client writes to and store the sent data.
     We do the same under Envision client's replay feature and compare that the data
     sent to the websocket is the same as before.
@@ -122,7 +133,9 @@ def test_data_replay(agent_spec, scenarios_iterator, data_replay_path, monkeypat
     monkeypatch.setattr(websocket, "WebSocketApp", FakeWebSocketApp)
     assert original_sent_data.qsize() == 0
 
-    envision = Envision(output_dir=data_replay_path)
+    envision = Envision(
+        output_dir=data_replay_path, binary=binary, binary_recording=binary_recording
+    )
     smarts = SMARTS(
         agent_interfaces={AGENT_ID: agent_spec.interface},
         traffic_sim=SumoTrafficSimulation(time_resolution=TIMESTEP_SEC),
@@ -136,8 +149,10 @@ def test_data_replay(agent_spec, scenarios_iterator, data_replay_path, monkeypat
     data_replay_run_paths = [x for x in data_replay_path.iterdir() if x.is_dir()]
     assert len(data_replay_run_paths) == 1
 
-    jsonl_paths = list(data_replay_run_paths[0].glob("*.jsonl"))
-    assert len(jsonl_paths) == 1
+    recording_paths = list(
+        data_replay_run_paths[0].glob("*.envb" if binary_recording else "*.jsonl")
+    )
+    assert len(recording_paths) == 1
     assert original_sent_data.qsize() > 0
 
     # 2. Inspect replay data
@@ -148,9 +163,17 @@ def test_data_replay(agent_spec, scenarios_iterator, data_replay_path, monkeypat
     assert new_sent_data.qsize() == 0
 
     # Now read data replay
-    Envision.read_and_send(jsonl_paths[0], fixed_timestep_sec=TIMESTEP_SEC)
+    Envision.read_and_send(
+        recording_paths[0], fixed_timestep_sec=TIMESTEP_SEC, binary=binary
+    )
 
     # Verify the new data matches the original data
     assert original_sent_data.qsize() == new_sent_data.qsize()
+    original_decoder = serialization.StateDecoder()
+    new_decoder = serialization.StateDecoder()
     for _ in range(new_sent_data.qsize()):
-        assert original_sent_data.get() == new_sent_data.get()
+        original, new = original_sent_data.get(), new_sent_data.get()
+        if binary:
+            assert new_decoder.decode(new) == original_decoder.decode(original)
+        else:
+            assert original == new
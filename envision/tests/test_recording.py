@@ -0,0 +1,111 @@
+# MIT License
+#
+# Copyright (C) 2022. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+import json
+
+import pytest
+
+from envision import recording, serialization
+from envision.server import RecordedFrames
+
+NUM_FRAMES = 25
+
+
+def _state(frame_time):
+    return {
+        "frame_time": frame_time,
+        "traffic": {"car-1": {"position": [frame_time * 10, 1.0, 0.0]}},
+        "bubbles": [[[0.0, 0.0], [10.0, 0.0], [10.0, 10.0]]],
+    }
+
+
+@pytest.fixture
+def recording_path(tmp_path):
+    path = tmp_path / "episode.envb"
+    encoder = serialization.StateEncoder(keyframe_interval=10)
+    with recording.RecordingWriter(path) as writer:
+        for i in range(NUM_FRAMES):
+            writer.write(encoder.encode(_state(i / 10)))
+    return path
+
+
+def test_recording_index(recording_path):
+    assert recording.is_binary_recording(recording_path)
+
+    with recording.Recording(recording_path) as record:
+        assert len(record) == NUM_FRAMES
+        assert record.start_time == 0
+        assert record.end_time == pytest.approx(2.4)
+        assert record.find(1.25) == 13
+        assert record.find(-1) == 0
+        assert record.find(100) == NUM_FRAMES - 1
+        assert record.keyframe_index(13) == 10
+        assert record.keyframe_index(10) == 10
+
+        for i in range(NUM_FRAMES):
+            assert record.decode(i) == _state(i / 10)
+
+
+def test_unfinished_recording_is_scanned(recording_path):
+    with recording.Recording(recording_path) as record:
+        frames = [record.frame(i) for i in range(len(record))]
+
+    # Cut off the index and part of the last frame, as if the recorder was killed.
+    data = recording_path.read_bytes()
+    recording_path.write_bytes(data[: data.index(frames[-1]) + 5])
+
+    with recording.Recording(recording_path) as record:
+        assert len(record) == NUM_FRAMES - 1
+        assert [record.frame(i) for i in range(len(record))] == frames[:-1]
+        assert record.find(1.25) == 13
+        assert record.decode(13) == _state(1.3)
+
+
+def test_recording_needs_keyframe(tmp_path):
+    encoder = serialization.StateEncoder()
+    encoder.encode(_state(0))
+    delta = encoder.encode(_state(0.1))
+    with recording.RecordingWriter(tmp_path / "episode.envb") as writer:
+        with pytest.raises(ValueError):
+            writer.write(delta)
+
+    jsonl_path = tmp_path / "episode.jsonl"
+    jsonl_path.write_text(json.dumps(_state(0)) + "\n")
+    assert not recording.is_binary_recording(jsonl_path)
+    with pytest.raises(ValueError):
+        recording.Recording(jsonl_path)
+
+
+def test_server_plays_recording(recording_path):
+    frames = RecordedFrames(recording_path)
+    assert frames.start_time == 0
+    assert frames.elapsed_time == pytest.approx(2.4)
+
+    frame = frames(frames.start_time + 1.25)
+    assert frame.timestamp == pytest.approx(1.3)
+    assert json.loads(frame.data) == _state(1.3)
+
+    timestamps = []
+    frame = frames.start_frame
+    while frame:
+        timestamps.append(frame.timestamp)
+        frame = frame.next_
+    assert timestamps == [pytest.approx(i / 10) for i in range(NUM_FRAMES)]
@@ -0,0 +1,153 @@
+# MIT License
+#
+# Copyright (C) 2022. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+import json
+
+import numpy as np
+import pytest
+
+from envision import serialization
+from envision.client import JSONEncoder
+from envision.server import Frame
+
+
+def _state(frame_time, x, vehicles=("car-1", "car-2")):
+    return {
+        "frame_time": frame_time,
+        "scenario_id": "loop",
+        "scenario_name": "loop",
+        "traffic": {
+            vehicle_id: {
+                "actor_id": vehicle_id,
+                "position": [x + i, 2.5, 0.0],
+                "heading": 0.25,
+                "speed": 10.0,
+                "events": {"collisions": [], "reached_goal": False},
+                "waypoint_paths": [
+                    [
+                        {"pos": [x + j, 1.0], "lane_id": "E0_0", "lane_index": 0}
+                        for j in range(3)
+                    ]
+                ],
+                "point_cloud": np.array([[1.0, 1.0, 0.0], [np.inf, 2.0, 0.0]]),
+            }
+            for i, vehicle_id in enumerate(vehicles)
+        },
+        "bubbles": [[[0.0, 0.0], [10.0, 0.0], [10.0, 10.0]]],
+        "ego_agent_ids": ["Agent-007"],
+        "scores": {"Agent-007": 1},
+    }
+
+
+def _as_json(state):
+    """The state as the web client receives it from a JSON stream."""
+    return json.loads(json.dumps(state, cls=JSONEncoder))
+
+
+def test_keyframe_round_trip():
+    state = _state(0.1, 12.0004)
+    message = serialization.StateEncoder().encode(state)
+
+    header = serialization.read_header(message)
+    assert header.keyframe
+    assert header.frame_time == 0.1
+    # Positions are quantized to millimeters.
+    assert serialization.decode_frame(message) == _as_json(_state(0.1, 12.0))
+
+
+def test_delta_round_trip():
+    encoder = serialization.StateEncoder(keyframe_interval=3)
+    decoder = serialization.StateDecoder()
+    states = [
+        _state(0.1, 1.0),
+        _state(0.2, 2.0),
+        # A vehicle leaves
+        _state(0.3, 3.0, vehicles=("car-1",)),
+        # The next keyframe
+        _state(0.4, 4.0, vehicles=("car-1", "car-3")),
+        _state(0.5, 4.0, vehicles=("car-1", "car-3")),
+    ]
+    messages = [encoder.encode(state) for state in states]
+    headers = [serialization.read_header(m) for m in messages]
+
+    assert [h.keyframe for h in headers] == [True, False, False, True, False]
+    assert headers[1].keyframe_id == headers[0].keyframe_id
+    assert headers[3].keyframe_id != headers[0].keyframe_id
+    # Unchanged state (apart from the frame time) leaves only the header.
+    assert len(messages[4]) < len(messages[3]) / 2
+
+    for state, message in zip(states, messages):
+        assert decoder.decode(message) == _as_json(state)
+
+
+def test_delta_needs_its_keyframe():
+    encoder = serialization.StateEncoder()
+    keyframe = encoder.encode(_state(0.1, 1.0))
+    delta = encoder.encode(_state(0.2, 2.0))
+    encoder.reset()
+    other_keyframe = encoder.encode(_state(0.3, 3.0))
+
+    assert serialization.decode_frame(delta, keyframe) == _as_json(_state(0.2, 2.0))
+    with pytest.raises(ValueError):
+        serialization.decode_frame(delta)
+    with pytest.raises(ValueError):
+        serialization.decode_frame(delta, other_keyframe)
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_values_survive_encoding(compress):
+    state = {
+        "frame_time": 1.0,
+        "$reserved": {"$a": [1, 2]},
+        "large": [1e12, 2.5],
+        "ints": np.arange(4),
+        "big_ints": [2 ** 40, 1],
+        "ragged": [[1.0], [1.0, 2.0]],
+        "mixed": [{"a": 1}, {"b": 2}],
+        "flags": [True, False],
+        "empty": [],
+        "nan": [float("nan")],
+    }
+    message = serialization.StateEncoder(compress=compress).encode(state)
+
+    assert serialization.decode_frame(message) == {
+        "frame_time": 1.0,
+        "$reserved": {"$a": [1, 2]},
+        "large": [1e12, 2.5],
+        "ints": [0, 1, 2, 3],
+        "big_ints": [2 ** 40, 1],
+        "ragged": [[1.0], [1.0, 2.0]],
+        "mixed": [{"a": 1}, {"b": 2}],
+        "flags": [True, False],
+        "empty": [],
+        "nan": ["NaN"],
+    }
+
+
+def test_server_frame_serves_json():
+    encoder = serialization.StateEncoder()
+    keyframe = encoder.encode(_state(0.1, 1.0))
+    delta = encoder.encode(_state(0.2, 2.0))
+
+    frame = Frame(data=delta, timestamp=0.2, keyframe=keyframe)
+    assert json.loads(frame.data) == _as_json(_state(0.2, 2.0))
+    assert frame.data is frame.data
+    assert frame.size < len(json.dumps(_state(0.2, 2.0), cls=JSONEncoder))
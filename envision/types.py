@@ -76,6 +76,17 @@ class State(NamedTuple):
     frame_time: float
 
 
+class EmissionDetail(NamedTuple):
+    """The level of detail of the states sent to envision."""
+
+    point_clouds: bool = True
+    """If the lidar point clouds of agents are sent."""
+    waypoint_stride: int = 1
+    """Every n-th waypoint of the waypoint paths is sent, none if 0."""
+    driven_path_stride: int = 1
+    """Every n-th point of the driven paths is sent, none if 0."""
+
+
 def format_actor_id(actor_id: str, vehicle_id: str, is_multi: bool):
     """A conversion utility to ensure that an actor id conforms to envision's actor id standard.
     Args:
@@ -34,7 +34,7 @@ setup(
         "rich>=11.2.0",
         "Rtree>=0.9.7",
         "sh>=1.14.2",
-        "shapely>=1.8.1",
+        "shapely>=1.8.1",  # shapely>=2.0 vectorizes the map GLB export
         "tableprint>=0.9.1",
         "trimesh==3.9.29",  # Used for writing .glb files
         "visdom>=0.1.8.9",
@@ -19,7 +19,7 @@
 # THE SOFTWARE.
 import logging
 import warnings
-from typing import Any, Callable
+from typing import Any, Callable, List, Sequence
 
 from smarts.core.sensors import Observation
 
@@ -57,6 +57,15 @@ class Agent:
 
         raise NotImplementedError
 
+    def act_batch(self, observations: Sequence[Observation], **configs) -> List[Any]:
+        """The actions for a batch of adapted observations, in the same order.
+
+        Override this to evaluate a policy on a stacked batch. Agents overriding this
+        should keep no per-agent state between steps, since one instance is then
+        shared by the remote social agents which are built from the same spec.
+        """
+        return [self.act(obs, **configs) for obs in observations]
+
 
 def deprecated_agent_spec(*args, **kwargs):
     """Deprecated version of AgentSpec, see smarts.zoo.agent_spec"""
@@ -17,9 +17,9 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
-from dataclasses import dataclass, field, replace
+from dataclasses import dataclass, field, fields, replace
 from enum import IntEnum
-from typing import List, Optional, Tuple, Union
+from typing import FrozenSet, Iterable, List, Optional, Tuple, Union
 
 from .controllers import ActionSpaceType
 from .lidar_sensor_params import BasicLidar
@@ -36,6 +36,9 @@ class DrivableAreaGridMap:
     width: int = 256
     height: int = 256
     resolution: float = 50 / 256
+    update_every: int = 1
+    """The number of simulation steps between updates of this sensor. The last value
+    is observed in between updates."""
 
 
 @dataclass
@@ -48,6 +51,9 @@ class OGM:
     width: int = 256
     height: int = 256
     resolution: float = 50 / 256
+    update_every: int = 1
+    """The number of simulation steps between updates of this sensor. The last value
+    is observed in between updates."""
 
 
 @dataclass
@@ -60,6 +66,9 @@ class RGB:
     width: int = 256
     height: int = 256
     resolution: float = 50 / 256
+    update_every: int = 1
+    """The number of simulation steps between updates of this sensor. The last value
+    is observed in between updates."""
 
 
 @dataclass
@@ -67,6 +76,9 @@ class Lidar:
     """Lidar point cloud observations."""
 
     sensor_params: LidarSensorParams = BasicLidar
+    update_every: int = 1
+    """The number of simulation steps between updates of this sensor. The last value
+    is observed in between updates."""
 
 
 @dataclass
@@ -76,6 +88,9 @@ class Waypoints:
     """
 
     lookahead: int = 32
+    update_every: int = 1
+    """The number of simulation steps between updates of this sensor. The last value
+    is observed in between updates."""
 
 
 @dataclass
@@ -89,6 +104,9 @@ class RoadWaypoints:
 
     # The distance in meters to include waypoints for (both behind and in front of the agent)
     horizon: int = 20
+    update_every: int = 1
+    """The number of simulation steps between updates of this sensor. The last value
+    is observed in between updates."""
 
 
 @dataclass
@@ -97,6 +115,9 @@ class NeighborhoodVehicles:
 
     radius: Optional[float] = None
     """The distance within which neighborhood vehicles are detected. `None` means vehicles will be detected within an unlimited distance."""
+    update_every: int = 1
+    """The number of simulation steps between updates of this sensor. The last value
+    is observed in between updates."""
 
 
 @dataclass
@@ -276,6 +297,14 @@ class AgentInterface:
     Enable acceleration and jerk observations.
     """
 
+    observation_fields: Optional[Iterable[str]] = None
+    """
+    The names of the `Observation` fields the agent reads, or None for all of them.
+    Fields that are not listed are not computed and are left as None in the
+    observation. `events` is always provided but, unless it is listed, only holds the
+    checks that the done criteria need.
+    """
+
     def __post_init__(self):
         self.neighborhood_vehicles = AgentInterface._resolve_config(
             self.neighborhood_vehicles, NeighborhoodVehicles
@@ -294,6 +323,16 @@ class AgentInterface:
             self.accelerometer, Accelerometer
         )
         assert self.vehicle_type in {"sedan", "bus"}
+        self.observation_fields = AgentInterface._resolve_observation_fields(
+            self.observation_fields
+        )
+
+    def requires(self, observation_field: str) -> bool:
+        """Checks if the agent reads the given `Observation` field."""
+        return (
+            self.observation_fields is None
+            or observation_field in self.observation_fields
+        )
 
     @staticmethod
     def from_type(requested_type: AgentType, **kwargs):
@@ -414,3 +453,18 @@ class AgentInterface:
             return config
         else:
             return False
+
+    @staticmethod
+    def _resolve_observation_fields(
+        observation_fields: Optional[Iterable[str]],
+    ) -> Optional[FrozenSet[str]]:
+        if observation_fields is None:
+            return None
+        # Deferred as the sensors depend on the agent interface
+        from .sensors import Observation
+
+        observation_fields = frozenset(observation_fields)
+        unknown = observation_fields - {f.name for f in fields(Observation)}
+        if unknown:
+            raise ValueError(f"Unknown observation fields: {sorted(unknown)}")
+        return observation_fields
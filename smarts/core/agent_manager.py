@@ -21,8 +21,6 @@
 import logging
 from typing import Any, Dict, Optional, Set, Tuple, Union
 
-import cloudpickle
-
 from envision.types import format_actor_id
 from smarts.core.agent_interface import AgentInterface
 from smarts.core.bubble_manager import BubbleManager
@@ -42,10 +40,11 @@ class AgentManager:
          time.
     """
 
-    def __init__(self, interfaces, zoo_addrs=None):
+    def __init__(self, interfaces, zoo_addrs=None, zoo_agents_per_worker=1):
         self._log = logging.getLogger(self.__class__.__name__)
         self._remote_agent_buffer = None
         self._zoo_addrs = zoo_addrs
+        self._zoo_agents_per_worker = zoo_agents_per_worker
         self._ego_agent_ids = set()
         self._social_agent_ids = set()
         self._vehicle_with_sensors = dict()
@@ -282,9 +281,7 @@ class AgentManager:
         try:
             social_agent_actions = {
                 agent_id: (
-                    cloudpickle.loads(
-                        self._remote_social_agents_action[agent_id].result().action
-                    )
+                    self._remote_social_agents_action[agent_id].result()
                     if self._remote_social_agents_action.get(agent_id, None)
                     else None
                 )
@@ -354,10 +351,21 @@ class AgentManager:
         """Forwards observations to managed social agents."""
         # TODO: Don't send observations (or receive actions) from agents that have done
         #       vehicles.
-        self._remote_social_agents_action = {}
-        for agent_id, remote_agent in self._remote_social_agents.items():
-            obs = observations[agent_id]
-            self._remote_social_agents_action[agent_id] = remote_agent.act(obs)
+        self._remote_social_agents_action = self._act_social_agents(observations)
+
+    def _act_social_agents(self, observations):
+        if not self._remote_social_agents:
+            return {}
+
+        from smarts.core.remote_agent import RemoteAgent
+
+        # Agents co-located on a worker receive their observations in one batch.
+        agent_ids = list(self._remote_social_agents)
+        act_futures = RemoteAgent.act_batch(
+            [self._remote_social_agents[agent_id] for agent_id in agent_ids],
+            [observations[agent_id] for agent_id in agent_ids],
+        )
+        return dict(zip(agent_ids, act_futures))
 
     def switch_initial_agents(self, agent_interfaces: Dict[str, AgentInterface]):
         """Replaces the initial agent interfaces with a new group. This comes into effect on next reset."""
@@ -392,14 +400,17 @@ class AgentManager:
                 from smarts.core.remote_agent_buffer import RemoteAgentBuffer
 
                 self._remote_agent_buffer = RemoteAgentBuffer(
-                    zoo_manager_addrs=self._zoo_addrs
+                    zoo_manager_addrs=self._zoo_addrs,
+                    agents_per_worker=self._zoo_agents_per_worker,
                 )
         else:
             return
 
         self._remote_social_agents = {
-            agent_id: self._remote_agent_buffer.acquire_remote_agent()
-            for agent_id in social_agents
+            agent_id: self._remote_agent_buffer.acquire_remote_agent(
+                group=self._social_agent_group(social_agent_model)
+            )
+            for agent_id, (_, social_agent_model) in social_agents.items()
         }
 
         for agent_id, (social_agent, social_agent_model) in social_agents.items():
@@ -415,7 +426,10 @@ class AgentManager:
             self._social_agent_ids.add(agent_id)
 
         for social_agent_id, remote_social_agent in self._remote_social_agents.items():
-            remote_social_agent.start(social_agents[social_agent_id][0])
+            social_agent, social_agent_model = social_agents[social_agent_id]
+            remote_social_agent.start(
+                social_agent, group=self._social_agent_group(social_agent_model)
+            )
 
     def start_keep_alive_boid_agents(self, sim):
         """Configures and adds boid agents to the sim."""
@@ -465,6 +479,13 @@ class AgentManager:
 
         assert isinstance(agent_id, str)  # SUMO expects strings identifiers
 
+        if sim.kinematic and agent_interface.lidar:
+            self._log.warning(
+                f"Agent {agent_id} subscribes to lidar, which does not detect vehicles "
+                "without a physics body. In kinematic mode, only vehicles controlled "
+                "with a dynamic action space are seen."
+            )
+
         scenario = sim.scenario
         mission = scenario.mission(agent_id)
         plan = Plan(sim.road_map, mission)
@@ -512,15 +533,25 @@ class AgentManager:
             from smarts.core.remote_agent_buffer import RemoteAgentBuffer
 
             self._remote_agent_buffer = RemoteAgentBuffer(
-                zoo_manager_addrs=self._zoo_addrs
+                zoo_manager_addrs=self._zoo_addrs,
+                agents_per_worker=self._zoo_agents_per_worker,
             )
-        remote_agent = self._remote_agent_buffer.acquire_remote_agent()
-        remote_agent.start(social_agent)
+        group = self._social_agent_group(agent_model)
+        remote_agent = self._remote_agent_buffer.acquire_remote_agent(group=group)
+        remote_agent.start(social_agent, group=group)
         self._remote_social_agents[agent_id] = remote_agent
         self._agent_interfaces[agent_id] = social_agent.interface
         self._social_agent_ids.add(agent_id)
         self._social_agent_data_models[agent_id] = agent_model
 
+    @staticmethod
+    def _social_agent_group(agent_model: SocialAgent) -> str:
+        # Social agents running the same policy share a group, so that they can be
+        # co-located and act in a batch.
+        return repr(
+            (agent_model.agent_locator, sorted(agent_model.policy_kwargs.items()))
+        )
+
     def teardown_ego_agents(self, filter_ids: Optional[Set] = None):
         """Tears down all given ego agents passed through the filter.
         Args:
@@ -561,10 +592,7 @@ class AgentManager:
 
     def reset_agents(self, observations: Dict[str, Observation]):
         """Reset agents, feeding in an initial observation."""
-        self._remote_social_agents_action = {}
-        for agent_id, remote_agent in self._remote_social_agents.items():
-            obs = observations[agent_id]
-            self._remote_social_agents_action[agent_id] = remote_agent.act(obs)
+        self._remote_social_agents_action = self._act_social_agents(observations)
 
         # Observations contain those for social agents; filter them out
         return self._filter_for_active_ego(observations)
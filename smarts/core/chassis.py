@@ -187,6 +187,9 @@ class Chassis:
 class BoxChassis(Chassis):
     """Control a vehicle by setting its absolute position and heading. The collision
     shape of the vehicle is a box of the provided dimensions.
+
+    Without a bullet client the chassis is kinematic. It has no physics body, so it
+    has no contact points and its collisions have to be found geometrically.
     """
 
     def __init__(
@@ -194,16 +197,19 @@ class BoxChassis(Chassis):
         pose: Pose,
         speed: float,
         dimensions: Dimensions,
-        bullet_client: bc.BulletClient,
+        bullet_client: Optional[bc.BulletClient],
     ):
         self._dimensions = dimensions
-        self._bullet_body = BulletBoxShape(self._dimensions.as_lwh, bullet_client)
-        self._bullet_constraint = BulletPositionConstraint(
-            self._bullet_body, bullet_client
-        )
-        bullet_client.setCollisionFilterGroupMask(
-            self._bullet_body._bullet_id, -1, 0x0, 0x0
-        )
+        self._bullet_body = None
+        self._bullet_constraint = None
+        if bullet_client is not None:
+            self._bullet_body = BulletBoxShape(self._dimensions.as_lwh, bullet_client)
+            self._bullet_constraint = BulletPositionConstraint(
+                self._bullet_body, bullet_client
+            )
+            bullet_client.setCollisionFilterGroupMask(
+                self._bullet_body._bullet_id, -1, 0x0, 0x0
+            )
         self._pose = None
         self.control(pose, speed)
         self._client = bullet_client
@@ -214,7 +220,8 @@ class BoxChassis(Chassis):
         self._last_dt = dt
         self._pose = pose
         self._speed = speed
-        self._bullet_constraint.move_to(pose)
+        if self._bullet_constraint:
+            self._bullet_constraint.move_to(pose)
 
     def reapply_last_control(self):
         # no need to do anything here since we're not applying forces
@@ -237,14 +244,17 @@ class BoxChassis(Chassis):
             assert linear_velocity is not None
             assert angular_velocity is not None
             self._speed = np.linalg.norm(linear_velocity)
-            self._client.resetBaseVelocity(
-                self.bullet_id,
-                linearVelocity=linear_velocity,
-                angularVelocity=angular_velocity,
-            )
+            if self._client:
+                self._client.resetBaseVelocity(
+                    self.bullet_id,
+                    linearVelocity=linear_velocity,
+                    angularVelocity=angular_velocity,
+                )
         self.set_pose(force_pose)
 
     def set_pose(self, pose: Pose):
+        if not self._client:
+            return
         position, orientation = pose.as_bullet()
         self._client.resetBasePositionAndOrientation(
             self.bullet_id, position, orientation
@@ -257,6 +267,8 @@ class BoxChassis(Chassis):
 
     @property
     def contact_points(self) -> Sequence:
+        if not self._client:
+            return []
         contact_points = _query_bullet_contact_points(self._client, self.bullet_id, -1)
         return [
             ContactPoint(bullet_id=p[2], contact_point=p[5], contact_point_other=p[6])
@@ -264,8 +276,8 @@ class BoxChassis(Chassis):
         ]
 
     @property
-    def bullet_id(self) -> str:
-        return self._bullet_body._bullet_id
+    def bullet_id(self) -> Optional[str]:
+        return self._bullet_body._bullet_id if self._bullet_body else None
 
     @property
     def speed(self) -> float:
@@ -316,8 +328,9 @@ class BoxChassis(Chassis):
         pass
 
     def teardown(self):
-        self._bullet_constraint.teardown()
-        self._bullet_body.teardown()
+        if self._bullet_body:
+            self._bullet_constraint.teardown()
+            self._bullet_body.teardown()
 
 
 class AckermannChassis(Chassis):
@@ -18,7 +18,6 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 from enum import Enum
-from functools import partial
 
 import numpy as np
 
@@ -112,36 +111,20 @@ class Controllers:
             TrajectoryTrackingController.perform_trajectory_tracking_MPC(
                 action, vehicle, controller_state, sim.last_dt
             )
-        elif action_space == ActionSpaceType.LaneWithContinuousSpeed:
-            LaneFollowingController.perform_lane_following(
-                sim,
-                agent_id,
-                vehicle,
-                controller_state,
-                sensor_state,
-                action[0],
-                action[1],
-            )
-        elif action_space == ActionSpaceType.Lane:
-            perform_lane_following = partial(
-                LaneFollowingController.perform_lane_following,
-                sim=sim,
-                agent_id=agent_id,
-                vehicle=vehicle,
-                controller_state=controller_state,
-                sensor_state=sensor_state,
-            )
-
-            # 12.5 m/s (45 km/h) is used as the nominal speed for lane change.
-            # For keep_lane, the nominal speed is set to 15 m/s (54 km/h).
-            if action == "keep_lane":
-                perform_lane_following(target_speed=15, lane_change=0)
-            elif action == "slow_down":
-                perform_lane_following(target_speed=0, lane_change=0)
-            elif action == "change_lane_left":
-                perform_lane_following(target_speed=12.5, lane_change=1)
-            elif action == "change_lane_right":
-                perform_lane_following(target_speed=12.5, lane_change=-1)
+        elif action_space in (
+            ActionSpaceType.Lane,
+            ActionSpaceType.LaneWithContinuousSpeed,
+        ):
+            target = _lane_following_target(action, action_space)
+            if target is not None:
+                LaneFollowingController.perform_lane_following(
+                    sim,
+                    agent_id,
+                    vehicle,
+                    controller_state,
+                    sensor_state,
+                    *target,
+                )
         elif action_space == ActionSpaceType.Imitation:
             ImitationController.perform_action(sim.last_dt, vehicle, action)
         else:
@@ -151,6 +134,64 @@ class Controllers:
                 "inside controller"
             )
 
+    @staticmethod
+    def perform_actions(sim, vehicle_actions):
+        """Calls control for many vehicles. The vehicles in the lane following action
+        spaces are controlled together as a batch.
+        Args:
+            sim:
+                A simulation instance.
+            vehicle_actions:
+                The arguments of `perform_action` for each vehicle, as tuples of
+                `(agent_id, vehicle, action, controller_state, sensor_state,
+                action_space, vehicle_type)`.
+        """
+        lane_following = []
+        for vehicle_action in vehicle_actions:
+            (
+                agent_id,
+                vehicle,
+                action,
+                controller_state,
+                sensor_state,
+                action_space,
+                vehicle_type,
+            ) = vehicle_action
+            target = _lane_following_target(action, action_space)
+            if target is None or vehicle_type == "bus":
+                Controllers.perform_action(sim, *vehicle_action)
+            else:
+                lane_following.append(
+                    (agent_id, vehicle, controller_state, sensor_state, *target)
+                )
+
+        if lane_following:
+            LaneFollowingController.perform_lane_following_batch(
+                sim, *zip(*lane_following)
+            )
+
+
+# 12.5 m/s (45 km/h) is used as the nominal speed for lane change.
+# For keep_lane, the nominal speed is set to 15 m/s (54 km/h).
+_LANE_ACTION_TARGETS = {
+    "keep_lane": (15, 0),
+    "slow_down": (0, 0),
+    "change_lane_left": (12.5, 1),
+    "change_lane_right": (12.5, -1),
+}
+
+
+def _lane_following_target(action, action_space):
+    """The `(target_speed, lane_change)` of a lane following action, or None if the
+    action is not lane following."""
+    if action is None:
+        return None
+    if action_space == ActionSpaceType.LaneWithContinuousSpeed:
+        return action[0], action[1]
+    if action_space == ActionSpaceType.Lane:
+        return _LANE_ACTION_TARGETS.get(action)
+    return None
+
 
 class ControllerOutOfLaneException(Exception):
     """Represents an error due to a vehicle straying too far from any available lane."""
@@ -18,15 +18,13 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 import math
+from typing import Sequence
 
 import numpy as np
 from scipy import signal
 
 from smarts.core.chassis import AckermannChassis
-from smarts.core.controllers.trajectory_tracking_controller import (
-    TrajectoryTrackingController,
-)
-from smarts.core.utils.math import lerp, low_pass_filter, min_angles_difference_signed
+from smarts.core.utils.math import low_pass_filter, min_angles_difference_signed
 
 METER_PER_SECOND_TO_KM_PER_HR = 3.6
 
@@ -89,46 +87,170 @@ class LaneFollowingController:
             lane_change:
                 Lane index offset from vehicle's current lane.
         """
-        assert isinstance(vehicle.chassis, AckermannChassis)
-        state = controller_state
-        # This lookahead value is coupled with a few calculations below, changing it
-        # may affect stability of the controller.
-        wp_paths = sim.road_map.waypoint_paths(
-            vehicle.pose, lookahead=16, route=sensor_state.plan.route
+        cls.perform_lane_following_batch(
+            sim,
+            [agent_id],
+            [vehicle],
+            [controller_state],
+            [sensor_state],
+            [target_speed],
+            [lane_change],
         )
-        assert wp_paths, "no waypoints found.  not near lane?"
-        current_lane = LaneFollowingController.find_current_lane(
-            wp_paths, vehicle.position
+
+    @classmethod
+    def perform_lane_following_batch(
+        cls,
+        sim,
+        agent_ids: Sequence[str],
+        vehicles: Sequence,
+        controller_states: Sequence[LaneFollowingControllerState],
+        sensor_states: Sequence,
+        target_speeds: Sequence[float],
+        lane_changes: Sequence[int],
+    ):
+        """Control many vehicles at once. The waypoints and the state of each vehicle
+        are gathered into arrays, the throttle, brake and steering of all vehicles are
+        computed together and are then applied to each vehicle.
+
+        Args:
+            sim:
+                The simulator instance.
+            agent_ids:
+                The ids of the agents controlling the vehicles.
+            vehicles:
+                The vehicles that are to be controlled.
+            controller_states:
+                The previous controller state of each vehicle from this controller.
+            sensor_states:
+                The current sensor state of each vehicle.
+            target_speeds:
+                The baseline target speed of each vehicle.
+            lane_changes:
+                The lane index offset of each vehicle from its current lane.
+        """
+        count = len(vehicles)
+        dt = sim.last_dt
+        target_speed = np.asarray(target_speeds, dtype=np.float64)
+        lane_change = np.asarray(lane_changes)
+
+        # Desired closed loop poles of the lateral dynamics
+        # The higher the absolute value, the closed loop response will
+        # be faster for that state, the four states of that are used for
+        # Linearization of the lateral dynamics are:
+        # [lateral error, heading error, yaw_rate, side_slip angle]
+        desired_poles = np.array(
+            [
+                cls.lateral_error,
+                cls.heading_error,
+                cls.yaw_rate,
+                cls.side_slip_angle,
+            ]
         )
-        wp_path = wp_paths[np.clip(current_lane + lane_change, 0, len(wp_paths) - 1)]
 
-        # we compute a road "curviness" to inform our throttle activation.
-        # We should move slowly when we are on curvy roads.
-        ewma_road_curviness = 0.0
-        for wp_a, wp_b in reversed(list(zip(wp_path, wp_path[1:]))):
-            ewma_road_curviness = lerp(
-                ewma_road_curviness,
-                math.degrees(abs(wp_a.relative_heading(wp_b.heading))),
-                0.03,
+        wp_path_by_vehicle = []
+        vehicle_rows = []
+        for i, (vehicle, state, sensor_state) in enumerate(
+            zip(vehicles, controller_states, sensor_states)
+        ):
+            assert isinstance(vehicle.chassis, AckermannChassis)
+            # This lookahead value is coupled with a few calculations below, changing
+            # it may affect stability of the controller.
+            wp_paths = sim.road_map.waypoint_paths(
+                vehicle.pose, lookahead=16, route=sensor_state.plan.route
             )
+            assert wp_paths, "no waypoints found.  not near lane?"
+            current_lane = LaneFollowingController.find_current_lane(
+                wp_paths, vehicle.position
+            )
+            wp_path_by_vehicle.append(
+                wp_paths[min(max(current_lane + lane_changes[i], 0), len(wp_paths) - 1)]
+            )
+
+            LaneFollowingController.calculate_lateral_gains(
+                sim, state, vehicle, desired_poles, target_speeds[i]
+            )
+            linear_velocity, angular_velocity = vehicle.chassis.velocity_vectors
+            # An unset minimum curvature location is infinitely far away.
+            if state.min_curvature_location == (None, None):
+                min_curvature_location = (math.inf, math.inf)
+            else:
+                min_curvature_location = state.min_curvature_location
+            vehicle_rows.append(
+                (
+                    vehicle.position[0],
+                    vehicle.position[1],
+                    *min_curvature_location,
+                    vehicle.heading,
+                    vehicle.speed,
+                    linear_velocity[1],
+                    angular_velocity[2],
+                    vehicle.max_steering_wheel,
+                    state.heading_error_gain,
+                    state.lateral_error_gain,
+                    state.integral_speed_error,
+                    state.speed_error,
+                    state.lateral_integral_error,
+                    state.steering_state,
+                    state.throttle_state,
+                )
+            )
+
+        vehicle_array = np.array(vehicle_rows, dtype=np.float64)
+        position = vehicle_array[:, 0:2]
+        min_curvature_location = vehicle_array[:, 2:4]
+        (
+            heading,
+            speed,
+            lateral_speed,
+            z_yaw,
+            max_steering_wheel,
+            heading_error_gain,
+            lateral_error_gain,
+            integral_speed_error,
+            previous_speed_error,
+            lateral_integral_error,
+            steering_state,
+            throttle_state,
+        ) = vehicle_array[:, 4:].T
+
+        # The paths are padded to the longest path.
+        wp_counts = np.array([len(wp_path) for wp_path in wp_path_by_vehicle])
+        wp_positions = np.zeros((count, max(wp_counts), 2))
+        wp_headings = np.zeros((count, max(wp_counts)))
+        for i, wp_path in enumerate(wp_path_by_vehicle):
+            wp_positions[i, : len(wp_path)] = [wp.pos[:2] for wp in wp_path]
+            wp_headings[i, : len(wp_path)] = [wp.heading for wp in wp_path]
+
+        rows = np.arange(count)
+        # The heading change and the length of each step along the paths.
+        step_headings = min_angles_difference_signed(
+            wp_headings[:, 1:], wp_headings[:, :-1]
+        )
+        step_lengths = np.linalg.norm(np.diff(wp_positions, axis=1), axis=-1)
+
+        # we compute a road "curviness" to inform our throttle activation.
+        # We should move slowly when we are on curvy roads. This is an exponentially
+        # weighted average of the heading changes along the path, from its end to
+        # its start.
+        heading_changes = np.degrees(np.abs(step_headings))
+        pair_index = np.arange(wp_headings.shape[1] - 1)
+        curviness_weights = np.where(
+            pair_index < (wp_counts - 1)[:, None], 0.03 * 0.97 ** pair_index, 0
+        )
+        ewma_road_curviness = np.sum(curviness_weights * heading_changes, axis=1)
 
         road_curviness_normalization = 2.5
         road_curviness = np.clip(
             ewma_road_curviness / road_curviness_normalization, 0, 1
         )
         # Number of trajectory point used for curvature calculation.
-        num_trajectory_points = min([10, len(wp_path)])
-        trajectory = [
-            [wp_path[i].pos[0] for i in range(num_trajectory_points)],
-            [wp_path[i].pos[1] for i in range(num_trajectory_points)],
-            [wp_path[i].heading for i in range(num_trajectory_points)],
-        ]
+        num_trajectory_points = np.minimum(10, wp_counts)
         # The following calculates the radius of curvature for the 4th
         # waypoints in the waypoint list. Value 4 is chosen to ensure
         # that the heading error correction is triggered before the vehicle
         # reaches to a sharp turn defined be min_curvature.
-        look_ahead_curvature = abs(
-            TrajectoryTrackingController.curvature_calculation(trajectory, 4)
+        look_ahead_curvature = np.abs(
+            cls._curvature_radii(step_lengths, step_headings, num_trajectory_points, 4)
         )
         # Minimum curvature limit for pushing forward the waypoint
         # which is used for heading error calculation.
@@ -136,11 +258,12 @@ class LaneFollowingController:
         # If the look_ahead_curvature is less than the min_curvature, then
         # update the location of the points which its curvature is less than
         # min_curvature.
-        if look_ahead_curvature <= min_curvature:
-            state.min_curvature_location = (
-                wp_path[4].pos[0],
-                wp_path[4].pos[1],
-            )
+        # Only paths of more than 9 waypoints have a finite look ahead curvature.
+        curvature_location_updated = look_ahead_curvature <= min_curvature
+        if np.any(curvature_location_updated):
+            min_curvature_location[curvature_location_updated] = wp_positions[
+                curvature_location_updated, 4
+            ]
 
         # LOOK AHEAD ERROR SETTING
         # look_ahead_wp_num is the ahead waypoint which is used to
@@ -152,46 +275,38 @@ class LaneFollowingController:
         # normal look ahead distant is set to 8 meters which is reduced
         # to 6 meters when the curvature increases.
         # Note: waypoints are spaced at roughly 1 meter apart
-        if road_curviness > 0.5:
-            look_ahead_wp_num = 3
-        else:
-            look_ahead_wp_num = 4
+        look_ahead_wp_num = np.where(road_curviness > 0.5, 3, 4)
+        look_ahead_wp_num = np.minimum(look_ahead_wp_num, wp_counts - 1)
 
-        look_ahead_wp_num = min(look_ahead_wp_num, len(wp_path) - 1)
-
-        reference_heading = wp_path[0].heading
-        look_ahead_wp = wp_path[look_ahead_wp_num]
-        look_ahead_dist = look_ahead_wp.dist_to(vehicle.position)
-        vehicle_look_ahead_pt = [
-            vehicle.position[0] - look_ahead_dist * math.sin(vehicle.heading),
-            vehicle.position[1] + look_ahead_dist * math.cos(vehicle.heading),
-        ]
+        reference_heading = wp_headings[:, 0]
+        look_ahead_wp_position = wp_positions[rows, look_ahead_wp_num]
+        look_ahead_wp_heading = wp_headings[rows, look_ahead_wp_num]
+        look_ahead_dist = np.hypot(*(look_ahead_wp_position - position).T)
+        vehicle_look_ahead_x = position[:, 0] - look_ahead_dist * np.sin(heading)
+        vehicle_look_ahead_y = position[:, 1] + look_ahead_dist * np.cos(heading)
 
         # 5.56 m/s (20 km/h), 6.94 m/s (25 km/h) are desired speed for different thresholds
         #   for road curviness
         # 0.5 , 0.8 are dimensionless thresholds for road_curviness.
         # 1.8 and 0.6 are the longitudinal velocity controller
         # proportional gains for different road curvinesss.
-        if road_curviness < 0.3:
-            raw_throttle = (
-                -METER_PER_SECOND_TO_KM_PER_HR * 1.8 * (vehicle.speed - target_speed)
-            )
-        elif road_curviness > 0.3 and road_curviness < 0.8:
-            raw_throttle = (
+        raw_throttle = np.where(
+            road_curviness < 0.3,
+            -METER_PER_SECOND_TO_KM_PER_HR * 1.8 * (speed - target_speed),
+            np.where(
+                (road_curviness > 0.3) & (road_curviness < 0.8),
                 -0.6
                 * METER_PER_SECOND_TO_KM_PER_HR
-                * (vehicle.speed - np.clip(target_speed, 0, 6.94))
-            )
-        else:
-            raw_throttle = (
+                * (speed - np.clip(target_speed, 0, 6.94)),
                 -0.6
                 * METER_PER_SECOND_TO_KM_PER_HR
-                * (vehicle.speed - np.clip(target_speed, 0, 5.56))
-            )
+                * (speed - np.clip(target_speed, 0, 5.56)),
+            ),
+        )
 
-        speed_error = vehicle.speed - target_speed
-        state.integral_speed_error += speed_error * sim.last_dt
-        velocity_error_damping_term = (speed_error - state.speed_error) / sim.last_dt
+        speed_error = speed - target_speed
+        integral_speed_error += speed_error * dt
+        velocity_error_damping_term = (speed_error - previous_speed_error) / dt
         # 5.5 is the gain of feedforward term for throttle. This term is
         # directly related to the steering angle, this is added to further
         # enhance the speed tracking performance. TODO: currently, the bullet
@@ -199,87 +314,68 @@ class LaneFollowingController:
         # calculating the front lateral force. we need to replace the coefficient
         # with better approximation of the front lateral forces using explicit
         # differention.
-        lateral_force_coefficient = 1.5
-        if vehicle.speed < 8 or target_speed < 6:
-            lateral_force_coefficient = 0
+        lateral_force_coefficient = np.where((speed < 8) | (target_speed < 6), 0, 1.5)
         # 0.2 is the coefficient of d-controller for speed tracking
         # 0.1 is the coefficient of I-controller for speed tracking
         raw_throttle += (
             -0.2 * velocity_error_damping_term
-            - 0.1 * state.integral_speed_error
-            + abs(
-                lateral_force_coefficient
-                * math.sin(state.steering_state * vehicle.max_steering_wheel)
+            - 0.1 * integral_speed_error
+            + np.abs(
+                lateral_force_coefficient * np.sin(steering_state * max_steering_wheel)
             )
         )
-        state.speed_error = speed_error
         # If the distance of the vehicle to the ahead point for which
         # the waypoint curvature is less than min_curvature is less than
         # 2 meters, then push forward the waypoint which is used to
         # calculate the heading error.
-        if (state.min_curvature_location != (None, None)) and math.sqrt(
-            (vehicle.position[0] - state.min_curvature_location[0]) ** 2
-            + (vehicle.position[1] - state.min_curvature_location[1]) ** 2
-        ) < 2:
-            reference_heading = wp_path[look_ahead_wp_num].heading
-
-        # Desired closed loop poles of the lateral dynamics
-        # The higher the absolute value, the closed loop response will
-        # be faster for that state, the four states of that are used for
-        # Linearization of the lateral dynamics are:
-        # [lateral error, heading error, yaw_rate, side_slip angle]
-        desired_poles = np.array(
-            [
-                cls.lateral_error,
-                cls.heading_error,
-                cls.yaw_rate,
-                cls.side_slip_angle,
-            ]
+        near_min_curvature_location = (
+            np.hypot(*(position - min_curvature_location).T) < 2
         )
-
-        LaneFollowingController.calculate_lateral_gains(
-            sim, state, vehicle, desired_poles, target_speed
+        reference_heading = np.where(
+            near_min_curvature_location, look_ahead_wp_heading, reference_heading
         )
+
         # LOOK AHEAD CONTROLLER
-        controller_lat_error = wp_path[look_ahead_wp_num].signed_lateral_error(
-            vehicle_look_ahead_pt
+        # The signed lateral distance of the look ahead point from the line through
+        # the look ahead waypoint along its heading, positive on the left.
+        controller_lat_error = -(
+            (vehicle_look_ahead_x - look_ahead_wp_position[:, 0])
+            * np.cos(look_ahead_wp_heading)
+            + (vehicle_look_ahead_y - look_ahead_wp_position[:, 1])
+            * np.sin(look_ahead_wp_heading)
         )
 
-        abs_heading_error = min(
-            abs((vehicle.heading % (2 * math.pi)) - reference_heading),
-            abs(
-                2 * math.pi - abs((vehicle.heading % (2 * math.pi)) - reference_heading)
-            ),
+        curvature_radius = cls._curvature_radii(
+            step_lengths, step_headings, num_trajectory_points
         )
-
-        curvature_radius = TrajectoryTrackingController.curvature_calculation(
-            trajectory
+        # The term involving absolute value of the lateral speed is
+        # added as a traction control strategy, The traction controller
+        # gain is set to 4.5, the lower the value, the vehicle becomes
+        # more agile but may result in instability in harsh curves
+        # with high speeds.
+        traction_gain = np.where(
+            (speed > 70 / 3.6) & (np.abs(curvature_radius) <= 1e3),
+            4.5,
+            np.where(
+                (40 / 3.6 <= speed)
+                & (speed <= 70 / 3.6)
+                & (np.abs(curvature_radius) <= 3),
+                2.5,
+                0.5,
+            ),
         )
-        brake_norm = 0
-        if raw_throttle < 0:
-            brake_norm = np.clip(-raw_throttle, 0, 1)
-            throttle_norm = 0
-        else:
-            # The term involving absolute value of the lateral speed is
-            # added as a traction control strategy, The traction controller
-            # gain is set to 4.5, the lower the value, the vehicle becomes
-            # more agile but may result in instability in harsh curves
-            # with high speeds.
-            if vehicle.speed > 70 / 3.6 and abs(curvature_radius) <= 1e3:
-                traction_gain = 4.5
-            elif 40 / 3.6 <= vehicle.speed <= 70 / 3.6 and abs(curvature_radius) <= 3:
-                traction_gain = 2.5
-            else:
-                traction_gain = 0.5
-
-            throttle_norm = np.clip(
+        braking = raw_throttle < 0
+        brake_norm = np.where(braking, np.clip(-raw_throttle, 0, 1), 0)
+        throttle_norm = np.where(
+            braking,
+            0,
+            np.clip(
                 raw_throttle
-                - traction_gain
-                * METER_PER_SECOND_TO_KM_PER_HR
-                * abs(vehicle.chassis.longitudinal_lateral_speed[1]),
+                - traction_gain * METER_PER_SECOND_TO_KM_PER_HR * np.abs(lateral_speed),
                 0,
                 1,
-            )
+            ),
+        )
         # The feedback term involving yaw rate is added to reduce
         # the oscillation in vehicle heading, the proportional gain for
         # yaw rate is set to 2.75, the higher value results in less
@@ -287,45 +383,40 @@ class LaneFollowingController:
         # gain for lateral error. The feedforward term based on the
         # curvature is added to enhance the transient performance when
         # the road curvature changes locally.
-        state.lateral_integral_error += sim.last_dt * controller_lat_error
+        lateral_integral_error += dt * controller_lat_error
         # The feed forward term for the  steering controller. This
         # term is proportionate to Ux^2/R. The coefficient 0.15 is
         # chosen to enhance the transient tracking performance.
         # This coefficient also depends on the inertia properties
         # and the cornering stiffness of the tires. See:
         # https://www.tandfonline.com/doi/full/10.1080/00423114.2015.1055279
-        steering_feed_forward_gain = 0.15
-
-        if abs(curvature_radius) < 7:
-            steering_feed_forward_gain = 0.45
+        steering_feed_forward_gain = np.where(np.abs(curvature_radius) < 7, 0.45, 0.15)
 
         steering_controller_feed_forward = (
-            1
-            * steering_feed_forward_gain
-            * (1 / curvature_radius)
-            * (vehicle.speed) ** 2
+            steering_feed_forward_gain * (1 / curvature_radius) * speed ** 2
+        )
+        normalized_speed = np.clip(speed * 3.6 / 100, 0, 1)
+        heading_speed_gain = -(0.5 * (1 - normalized_speed) + 14 * normalized_speed)
+        yaw_rate_speed_gain = 5.75 * (1 - normalized_speed) + 11.75 * normalized_speed
+        lateral_speed_gain = np.clip(
+            -1 * (1 - normalized_speed) + 14 * normalized_speed, 1, 2
         )
-        normalized_speed = np.clip(vehicle.speed * 3.6 / 100, 0, 1)
-        heading_speed_gain = -lerp(0.5, 14, normalized_speed)
-        yaw_rate_speed_gain = lerp(5.75, 11.75, normalized_speed)
-        lateral_speed_gain = np.clip(lerp(-1, 14, normalized_speed), 1, 2)
-
-        max_steering_nomralized = 1
-        if abs(curvature_radius) > 1e7 and lane_change != 0:
-            heading_speed_gain = -4.95
-            yaw_rate_speed_gain = 1
-            lateral_speed_gain = 0.22
-            max_steering_nomralized = 0.12
-
-        z_yaw = vehicle.chassis.velocity_vectors[1][2]
+
+        max_steering_nomralized = np.ones(count)
+        straight_lane_change = (np.abs(curvature_radius) > 1e7) & (lane_change != 0)
+        heading_speed_gain[straight_lane_change] = -4.95
+        yaw_rate_speed_gain[straight_lane_change] = 1
+        lateral_speed_gain[straight_lane_change] = 0.22
+        max_steering_nomralized[straight_lane_change] = 0.12
+
         heading_error = min_angles_difference_signed(
-            (vehicle.heading % (2 * math.pi)), reference_heading
+            heading % (2 * math.pi), reference_heading
         )
         steering_norm = np.clip(
-            -heading_speed_gain * math.degrees(state.heading_error_gain) * heading_error
-            + lateral_speed_gain * state.lateral_error_gain * (controller_lat_error)
+            -heading_speed_gain * np.degrees(heading_error_gain) * heading_error
+            + lateral_speed_gain * lateral_error_gain * controller_lat_error
             + yaw_rate_speed_gain * z_yaw
-            + 0.3 * state.lateral_integral_error
+            + 0.3 * lateral_integral_error
             - steering_controller_feed_forward,
             -max_steering_nomralized,
             max_steering_nomralized,
@@ -334,11 +425,11 @@ class LaneFollowingController:
         # first order linear low pass filter.
         steering_filter_constant = 5.5
 
-        state.steering_state = low_pass_filter(
+        steering_state = low_pass_filter(
             steering_norm,
-            state.steering_state,
+            steering_state,
             steering_filter_constant,
-            sim.last_dt,
+            dt,
         )
 
         # The Throttle low pass filter, 2 is the constant of the
@@ -346,23 +437,62 @@ class LaneFollowingController:
         # TODO: Add low pass filter for brake.
         throttle_filter_constant = 2
 
-        state.throttle_state = low_pass_filter(
+        throttle_state = low_pass_filter(
             throttle_norm,
-            state.throttle_state,
+            throttle_state,
             throttle_filter_constant,
-            sim.last_dt,
+            dt,
             lower_bound=0,
         )
-        # Applying control actions to the vehicle
-        vehicle.control(
-            throttle=state.throttle_state,
-            brake=brake_norm,
-            steering=state.steering_state,
-        )
 
-        LaneFollowingController._update_target_lane_if_reached_end_of_lane(
-            agent_id, vehicle, controller_state, sensor_state
+        for i, (agent_id, vehicle, state, sensor_state) in enumerate(
+            zip(agent_ids, vehicles, controller_states, sensor_states)
+        ):
+            if curvature_location_updated[i]:
+                state.min_curvature_location = tuple(min_curvature_location[i])
+            state.integral_speed_error = integral_speed_error[i]
+            state.speed_error = speed_error[i]
+            state.lateral_integral_error = lateral_integral_error[i]
+            state.steering_state = steering_state[i]
+            state.throttle_state = throttle_state[i]
+            # Applying control actions to the vehicle
+            vehicle.control(
+                throttle=throttle_state[i],
+                brake=brake_norm[i],
+                steering=steering_state[i],
+            )
+
+            LaneFollowingController._update_target_lane_if_reached_end_of_lane(
+                agent_id, vehicle, state, sensor_state
+            )
+
+    @staticmethod
+    def _curvature_radii(
+        step_lengths, step_headings, wp_counts, offset=0, num_points=5
+    ):
+        """Approximates the curvature radius of many paths from the length and the
+        heading change of their steps, see
+        `TrajectoryTrackingController.curvature_calculation`.
+        """
+        count, num_steps = step_headings.shape
+        if num_steps < num_points + offset:
+            # Like the scalar calculation, all the paths are too short.
+            return np.full(count, 1e20)
+
+        segment = slice(offset, offset + num_points)
+        relative_heading_sum = np.sum(step_headings[:, segment], axis=1)
+        relative_distant_sum = np.sum(step_lengths[:, segment], axis=1)
+        # If relative_heading_sum is zero, then the local radius
+        # of curvature is infinite, i.e. the local trajectory is
+        # similar to a straight line.
+        curvature_radius = np.full(count, 1e20)
+        np.divide(
+            relative_distant_sum,
+            relative_heading_sum,
+            out=curvature_radius,
+            where=(wp_counts > num_points + offset) & (relative_heading_sum != 0),
         )
+        return curvature_radius
 
     @staticmethod
     def find_current_lane(wp_paths, vehicle_position):
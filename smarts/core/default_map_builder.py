@@ -18,40 +18,148 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import hashlib
+import logging
 import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
 from dataclasses import replace
 from pathlib import Path
 from typing import NamedTuple, Optional, Tuple
 
 from smarts.core.road_map import RoadMap
-from smarts.core.utils.file import file_md5_hash, path2hash
+from smarts.core.utils.file import file_md5_hash, make_dir_in_smarts_log_dir, path2hash
 
-_existing_map = None
 
+class RoadMapCacheInfo(NamedTuple):
+    """Statistics of the road map cache."""
 
-def _cache_result(map_spec, road_map, road_map_hash: str):
-    global _existing_map
-    from smarts.sstudio.types import MapSpec
+    hits: int
+    """Number of requests served from the cache."""
+    misses: int
+    """Number of requests that required loading or building a map."""
+    maps: int
+    """Number of road maps currently cached."""
+    resident_bytes: int
+    """Estimated memory used by the cached road maps."""
 
-    class _RoadMapInfo(NamedTuple):
-        map_spec: MapSpec
-        obj: RoadMap
-        map_hash: str
 
-    _existing_map = _RoadMapInfo(map_spec, road_map, road_map_hash)
+class _RoadMapInfo(NamedTuple):
+    obj: RoadMap
+    map_hash: str
+    size: int
 
 
-def _clear_cache():
-    global _existing_map
-    if _existing_map:
+# Cached road maps, from least to most recently used.
+_existing_maps: "OrderedDict[int, _RoadMapInfo]" = OrderedDict()
+_DEFAULT_MAX_MAPS = 4
+_DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+_max_maps = _DEFAULT_MAX_MAPS
+_max_bytes = _DEFAULT_MAX_BYTES
+_hits = 0
+_misses = 0
+
+# Bump when changes to the road map classes invalidate previously compiled maps.
+_COMPILED_MAP_VERSION = 2
+# The road map object graph is deeply linked, pickling it recurses accordingly.
+_COMPILED_MAP_RECURSION_LIMIT = 100000
+_COMPILED_MAP_STACK_SIZE = 512 * 1024 * 1024
+# Serializes changes to the above process wide settings.
+_dump_lock = threading.Lock()
+# Disk space used by maps compiled when they are first loaded, in MiB. Defaults to 0,
+# which only compiles maps in explicit build steps (see `compile_road_map`).
+_DEFAULT_MAX_COMPILED_BYTES = (
+    int(os.environ.get("SMARTS_COMPILED_MAP_CACHE_MB", 0)) * 1024 * 1024
+)
+_max_compiled_bytes = _DEFAULT_MAX_COMPILED_BYTES
+
+
+def set_road_map_cache_limits(
+    max_maps: int = _DEFAULT_MAX_MAPS, max_bytes: Optional[int] = _DEFAULT_MAX_BYTES
+):
+    """Configures how many road maps are kept in memory for reuse. The least recently
+    used maps are evicted first. The memory used by a road map is estimated by the
+    size of its pickled snapshot, measured once when it is cached.
+
+    Args:
+        max_maps (int, optional): Maximum number of cached maps. Defaults to 4.
+        max_bytes (Optional[int], optional): Maximum estimated memory used by the cached
+            maps. The most recently used map is kept regardless. None does not bound
+            memory use. Defaults to 512MiB.
+    """
+    global _max_maps, _max_bytes
+    assert max_maps > 0
+    _max_maps = max_maps
+    _max_bytes = max_bytes
+    _evict()
+
+
+def set_compiled_map_cache_limit(
+    max_bytes: Optional[int] = _DEFAULT_MAX_COMPILED_BYTES,
+):
+    """Configures the disk space used by compiled road map snapshots. Above 0, maps
+    are also compiled when they are first loaded and the least recently used
+    snapshots are deleted first.
+
+    Args:
+        max_bytes (Optional[int], optional): Maximum size of the snapshots on disk.
+            0 only compiles maps in explicit build steps and does not delete
+            snapshots. None compiles maps on load without bounding their size.
+            Defaults to the `SMARTS_COMPILED_MAP_CACHE_MB` environment variable or 0.
+    """
+    global _max_compiled_bytes
+    _max_compiled_bytes = max_bytes
+    if max_bytes:
+        _prune_compiled_maps()
+
+
+def road_map_cache_info() -> RoadMapCacheInfo:
+    """Reports the hits, misses and resident size of the road map cache."""
+    return RoadMapCacheInfo(
+        hits=_hits,
+        misses=_misses,
+        maps=len(_existing_maps),
+        resident_bytes=_resident_bytes(),
+    )
+
+
+def _resident_bytes() -> int:
+    return sum(info.size for info in _existing_maps.values())
+
+
+def _cache_result(road_map, road_map_hash: str, size: int):
+    _existing_maps[id(road_map)] = _RoadMapInfo(road_map, road_map_hash, size)
+    _evict()
+
+
+def _evict():
+    evicted = False
+    # Keep at least the most recently used map.
+    while len(_existing_maps) > 1 and (
+        len(_existing_maps) > _max_maps
+        or (_max_bytes is not None and _resident_bytes() > _max_bytes)
+    ):
+        _existing_maps.popitem(last=False)
+        evicted = True
+
+    if evicted:
         import gc
 
-        # Try to only keep one map around at a time...
-        del _existing_map
-        _existing_map = None
         gc.collect()
 
 
+def _clear_cache():
+    global _hits, _misses
+    _existing_maps.clear()
+    _hits = _misses = 0
+    import gc
+
+    gc.collect()
+
+
 _UNKNOWN_MAP = 0
 _SUMO_MAP = 1
 _OPENDRIVE_MAP = 2
@@ -78,6 +186,30 @@ def _find_mapfile_in_dir(map_dir: str) -> Tuple[int, str]:
     return map_type, map_path
 
 
+def _map_class_and_source(map_spec):
+    if os.path.isdir(map_spec.source):
+        map_type, map_source = _find_mapfile_in_dir(map_spec.source)
+    else:
+        map_type = _UNKNOWN_MAP
+        map_source = map_spec.source
+        if map_source.endswith(".net.xml"):
+            map_type = _SUMO_MAP
+        elif map_source.endswith(".xodr"):
+            map_type = _OPENDRIVE_MAP
+
+    if map_type == _SUMO_MAP:
+        from smarts.core.sumo_road_network import SumoRoadNetwork
+
+        return SumoRoadNetwork, map_source
+
+    if map_type == _OPENDRIVE_MAP:
+        from smarts.core.opendrive_road_network import OpenDriveRoadNetwork
+
+        return OpenDriveRoadNetwork, map_source
+
+    return None, map_source
+
+
 # This function should be re-callable (although caching is up to the implementation).
 # The idea here is that anything in SMARTS that needs to use a RoadMap
 # can call this builder to get or create one of default type.
@@ -97,41 +229,225 @@ def get_road_map(map_spec) -> Tuple[Optional[RoadMap], Optional[str]]:
     assert map_spec, "A road map spec must be specified"
     assert map_spec.source, "A road map source must be specified"
 
-    if os.path.isdir(map_spec.source):
-        map_type, map_source = _find_mapfile_in_dir(map_spec.source)
+    map_class, map_source = _map_class_and_source(map_spec)
+    if map_class is None:
+        return None, None
+
+    global _hits, _misses
+    for key, info in _existing_maps.items():
+        if isinstance(info.obj, map_class) and info.obj.is_same_map(map_spec):
+            _existing_maps.move_to_end(key)
+            _hits += 1
+            return info.obj, info.map_hash
+    _misses += 1
+
+    road_map, size = _load_or_build_map(map_class, map_spec, map_source)
+    if os.path.isfile(road_map.source):
+        road_map_hash = file_md5_hash(road_map.source)
     else:
-        map_type = _UNKNOWN_MAP
-        map_source = map_spec.source
-        if map_source.endswith(".net.xml"):
-            map_type = _SUMO_MAP
-        elif map_source.endswith(".xodr"):
-            map_type = _OPENDRIVE_MAP
+        road_map_hash = path2hash(road_map.source)
+    _cache_result(road_map, road_map_hash, size)
 
-    if map_type == _SUMO_MAP:
-        from smarts.core.sumo_road_network import SumoRoadNetwork
+    return road_map, road_map_hash
 
-        map_class = SumoRoadNetwork
 
-    elif map_type == _OPENDRIVE_MAP:
-        from smarts.core.opendrive_road_network import OpenDriveRoadNetwork
+def _compiled_map_dir() -> str:
+    compiled_dir = make_dir_in_smarts_log_dir("compiled_maps")
+    os.makedirs(compiled_dir, exist_ok=True)
+    return compiled_dir
 
-        map_class = OpenDriveRoadNetwork
 
-    else:
-        return None, None
+def compile_road_map(map_spec) -> bool:
+    """Compiles a snapshot of the road map of the given spec, which is then loaded
+    instead of building the road map. This is meant for build steps, such as
+    `scl scenario build`.
+
+    Returns:
+        bool: Whether a snapshot of the road map exists.
+    """
+    map_class, map_source = _map_class_and_source(map_spec)
+    if map_class is None:
+        return False
+    compiled_path = _compiled_map_path(map_class, map_spec, map_source)
+    if not compiled_path:
+        return False
+    if _read_compiled_map_header(map_class, compiled_path) is None:
+        _compile_map(map_class.from_spec(map_spec), compiled_path)
+        _prune_compiled_maps()
+    return True
 
-    if _existing_map:
-        if isinstance(_existing_map.obj, map_class) and _existing_map.obj.is_same_map(
-            map_spec
-        ):
-            return _existing_map.obj, _existing_map.map_hash
-        _clear_cache()
+
+def _compiled_map_path(map_class, map_spec, map_source: str) -> Optional[str]:
+    if not os.path.isfile(map_source):
+        return None
+    key = ":".join(
+        str(k)
+        for k in (
+            _COMPILED_MAP_VERSION,
+            map_class.__name__,
+            os.path.abspath(map_spec.source),
+            file_md5_hash(map_source),
+            map_spec.lanepoint_spacing,
+            map_spec.default_lane_width,
+            map_spec.shift_to_origin,
+        )
+    )
+    return os.path.join(
+        _compiled_map_dir(), hashlib.md5(key.encode()).hexdigest() + ".pkl"
+    )
+
+
+def _load_or_build_map(map_class, map_spec, map_source: str) -> Tuple[RoadMap, int]:
+    """Loads the compiled snapshot of the road map if one exists for the current
+    contents of the map source, otherwise builds the road map and compiles the
+    built road map. Also returns the size of the road map's snapshot as an estimate of its memory
+    use."""
+    log = logging.getLogger(__name__)
+    compiled_path = _compiled_map_path(map_class, map_spec, map_source)
+    road_map = _load_compiled_map(map_class, compiled_path)
+    if road_map is not None:
+        return road_map, os.path.getsize(compiled_path)
 
     road_map = map_class.from_spec(map_spec)
-    if os.path.isfile(road_map.source):
-        road_map_hash = file_md5_hash(road_map.source)
-    else:
-        road_map_hash = path2hash(road_map.source)
-    _cache_result(map_spec, road_map, road_map_hash)
+    if compiled_path and _max_compiled_bytes != 0:
+        try:
+            _compile_map(road_map, compiled_path)
+            _prune_compiled_maps()
+            if os.path.isfile(compiled_path):
+                return road_map, os.path.getsize(compiled_path)
+        except Exception as e:
+            log.warning(f"Failed to compile map {map_source}: {e}")
+    try:
+        return road_map, _snapshot_size(road_map)
+    except Exception as e:
+        log.warning(f"Failed to estimate the size of map {map_source}: {e}")
+        return (
+            road_map,
+            os.path.getsize(map_source) if os.path.isfile(map_source) else 0,
+        )
 
-    return road_map, road_map_hash
+
+def _read_header(map_class, f) -> Optional[dict]:
+    # A compiled map starts with a small pickled header, so that it can be checked
+    # without loading the road map which follows it.
+    header = pickle.load(f)
+    if not isinstance(header, dict) or header.get("map_class") != map_class.__name__:
+        return None
+    # Maps may be built from a generated file (e.g. a shifted SUMO network)
+    # which has to be regenerated if it was deleted since.
+    if not os.path.exists(header["source"]):
+        return None
+    return header
+
+
+def _read_compiled_map_header(map_class, compiled_path: str) -> Optional[dict]:
+    if not os.path.isfile(compiled_path):
+        return None
+    try:
+        with open(compiled_path, "rb") as f:
+            return _read_header(map_class, f)
+    except Exception as e:
+        logging.getLogger(__name__).warning(
+            f"Ignoring unreadable compiled map {compiled_path}: {e}"
+        )
+        return None
+
+
+def _load_compiled_map(map_class, compiled_path: Optional[str]) -> Optional[RoadMap]:
+    if not compiled_path or not os.path.isfile(compiled_path):
+        return None
+    try:
+        with open(compiled_path, "rb") as f:
+            if _read_header(map_class, f) is None:
+                return None
+            road_map = pickle.load(f)
+    except Exception as e:
+        logging.getLogger(__name__).warning(
+            f"Ignoring unreadable compiled map {compiled_path}: {e}"
+        )
+        return None
+    if not isinstance(road_map, map_class):
+        return None
+    # Mark as recently used.
+    os.utime(compiled_path)
+    return road_map
+
+
+def _prune_compiled_maps():
+    if not _max_compiled_bytes:
+        return
+    compiled_dir = _compiled_map_dir()
+    snapshots = []
+    for entry in os.scandir(compiled_dir):
+        if entry.name.endswith(".pkl"):
+            stat = entry.stat()
+            snapshots.append((stat.st_mtime, stat.st_size, entry.path))
+    snapshots.sort()
+    total = sum(size for _, size, _ in snapshots)
+    # Keep at least the most recently used snapshot.
+    for _, size, path in snapshots[:-1]:
+        if total <= _max_compiled_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Already removed by another process.
+            pass
+        total -= size
+
+
+def _compile_map(road_map: RoadMap, compiled_path: str):
+    # Write atomically since other processes may be loading the same map.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(compiled_path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            _dump_compiled_map(road_map, f)
+        os.replace(tmp_path, compiled_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class _ByteCounter:
+    """A file-like sink that only counts the bytes written to it."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += memoryview(data).nbytes
+
+
+def _snapshot_size(road_map: RoadMap) -> int:
+    counter = _ByteCounter()
+    _dump_compiled_map(road_map, counter)
+    return counter.size
+
+
+def _dump_compiled_map(road_map: RoadMap, f):
+    errors = []
+
+    def dump():
+        try:
+            header = {"map_class": type(road_map).__name__, "source": road_map.source}
+            pickle.dump(header, f)
+            pickle.dump(road_map, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            errors.append(e)
+
+    # Pickle in a thread with a large enough stack for the raised recursion limit.
+    # Both are process wide settings, which are restored afterwards.
+    with _dump_lock:
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(recursion_limit, _COMPILED_MAP_RECURSION_LIMIT))
+        stack_size = threading.stack_size(_COMPILED_MAP_STACK_SIZE)
+        try:
+            thread = threading.Thread(target=dump)
+            thread.start()
+        finally:
+            threading.stack_size(stack_size)
+        thread.join()
+        sys.setrecursionlimit(recursion_limit)
+
+    if errors:
+        raise errors[0]
@@ -101,6 +101,52 @@ class LanePoints:
             for edge_id, l_lps in self._lanepoints_by_edge_id.items()
         }
 
+    def __getstate__(self):
+        # Linked lanepoints form long chains through their `nexts`, which pickle
+        # would follow recursively. Store the links as indices instead.
+        linked_lps = list(self._linked_lanepoints)
+        index = {id(l_lp): i for i, l_lp in enumerate(linked_lps)}
+        i = 0
+        while i < len(linked_lps):
+            for next_lp in linked_lps[i].nexts:
+                if id(next_lp) not in index:
+                    index[id(next_lp)] = len(linked_lps)
+                    linked_lps.append(next_lp)
+            i += 1
+
+        state = self.__dict__.copy()
+        state["_linked_lanepoints"] = len(self._linked_lanepoints)
+        state["_lanepoint_links"] = [
+            (l_lp.lp, l_lp.is_inferred, [index[id(n)] for n in l_lp.nexts])
+            for l_lp in linked_lps
+        ]
+        for key in ("_lanepoints_by_lane_id", "_lanepoints_by_edge_id"):
+            state[key] = {
+                k: [index[id(l_lp)] for l_lp in l_lps]
+                for k, l_lps in state[key].items()
+            }
+        return state
+
+    def __setstate__(self, state):
+        links = state.pop("_lanepoint_links")
+        linked_lps = [
+            LinkedLanePoint(lp=lp, is_inferred=is_inferred, nexts=[])
+            for lp, is_inferred, _ in links
+        ]
+        for l_lp, (_, _, nexts) in zip(linked_lps, links):
+            l_lp.nexts.extend(linked_lps[i] for i in nexts)
+
+        state["_linked_lanepoints"] = linked_lps[: state["_linked_lanepoints"]]
+        for key in ("_lanepoints_by_lane_id", "_lanepoints_by_edge_id"):
+            state[key] = defaultdict(
+                list,
+                {
+                    k: [linked_lps[i] for i in indices]
+                    for k, indices in state[key].items()
+                },
+            )
+        self.__dict__.update(state)
+
     @classmethod
     def from_sumo(
         cls,
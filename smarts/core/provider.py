@@ -17,12 +17,16 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from enum import IntFlag
-from typing import List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
 
 from .controllers import ActionSpaceType
+from .coordinates import Dimensions, Heading, Pose
 from .scenario import Scenario
+from .utils.math import fast_quaternion_from_angle
 from .vehicle import VehicleState
 
 
@@ -40,31 +44,273 @@ class ProviderRecoveryFlags(IntFlag):
 
 
 @dataclass
+class VehicleStateColumns:
+    """A structure-of-arrays block of vehicle states. Providers that generate many
+    vehicles at once can fill this in bulk instead of constructing a `VehicleState` per
+    vehicle. Individual `VehicleState` objects are only built on request.
+    """
+
+    vehicle_ids: List[str]
+    positions: np.ndarray  # (N, 3) center positions
+    headings: np.ndarray  # (N,) radians, 0 is facing north, counter-clockwise
+    speeds: np.ndarray  # (N,)
+    dimensions: np.ndarray  # (N, 3) as (length, width, height)
+    vehicle_config_types: List[Optional[str]]
+    source: Optional[str] = None  # the source of truth for these vehicle states
+    updated: Optional[np.ndarray] = None  # (N,) bool
+    vehicle_types: Optional[List[Optional[str]]] = None
+
+    def __post_init__(self):
+        count = len(self.vehicle_ids)
+        if self.vehicle_types is None:
+            self.vehicle_types = [None] * count
+        self.positions = np.asarray(self.positions, dtype=np.float64).reshape(-1, 3)
+        self.headings = np.asarray(self.headings, dtype=np.float64).reshape(-1)
+        self.speeds = np.asarray(self.speeds, dtype=np.float64).reshape(-1)
+        self.dimensions = np.asarray(self.dimensions, dtype=np.float64).reshape(-1, 3)
+        if self.updated is None:
+            self.updated = np.zeros(count, dtype=bool)
+        self.updated = np.asarray(self.updated, dtype=bool).reshape(-1)
+        assert (
+            len(self.positions)
+            == len(self.headings)
+            == len(self.speeds)
+            == len(self.dimensions)
+            == len(self.vehicle_config_types)
+            == len(self.updated)
+            == len(self.vehicle_types)
+            == count
+        ), "All vehicle state columns must be the same length"
+        self._states: List[Optional[VehicleState]] = [None] * count
+        self._index: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.vehicle_ids)
+
+    @classmethod
+    def empty(cls, source: Optional[str] = None) -> "VehicleStateColumns":
+        """Create a block that contains no vehicles."""
+        return cls(
+            vehicle_ids=[],
+            positions=np.empty((0, 3)),
+            headings=np.empty(0),
+            speeds=np.empty(0),
+            dimensions=np.empty((0, 3)),
+            vehicle_config_types=[],
+            source=source,
+        )
+
+    @classmethod
+    def from_vehicle_states(
+        cls, vehicle_states: Sequence[VehicleState], source: Optional[str] = None
+    ) -> "VehicleStateColumns":
+        """Pack the given vehicle states into columns."""
+        if not vehicle_states:
+            return cls.empty(source)
+        return cls(
+            vehicle_ids=[v.vehicle_id for v in vehicle_states],
+            positions=[v.pose.position for v in vehicle_states],
+            headings=[float(v.pose.heading) for v in vehicle_states],
+            speeds=[v.speed for v in vehicle_states],
+            dimensions=[v.dimensions.as_lwh for v in vehicle_states],
+            vehicle_config_types=[v.vehicle_config_type for v in vehicle_states],
+            source=source,
+            updated=[v.updated for v in vehicle_states],
+            vehicle_types=[v.vehicle_type for v in vehicle_states],
+        )
+
+    def index_of(self, vehicle_id: str) -> Optional[int]:
+        """The row of the given vehicle or `None` if it is not in this block."""
+        if self._index is None:
+            self._index = {v_id: i for i, v_id in enumerate(self.vehicle_ids)}
+        return self._index.get(vehicle_id)
+
+    def pose(self, index: int) -> Pose:
+        """Build the pose of a single row."""
+        heading = Heading(self.headings[index])
+        return Pose(
+            position=self.positions[index].copy(),
+            orientation=fast_quaternion_from_angle(heading),
+            heading_=heading,
+        )
+
+    def poses(self, indices: Sequence[int]) -> List[Pose]:
+        """Build the poses of the given rows with the quaternions computed in bulk."""
+        indices = np.asarray(indices, dtype=np.int64)
+        positions = self.positions[indices]
+        half_headings = self.headings[indices] * 0.5
+        orientations = np.zeros((len(indices), 4))
+        orientations[:, 2] = np.sin(half_headings)
+        orientations[:, 3] = np.cos(half_headings)
+        return [
+            Pose(position=position, orientation=orientation, heading_=Heading(heading))
+            for position, orientation, heading in zip(
+                positions, orientations, self.headings[indices].tolist()
+            )
+        ]
+
+    def vehicle_state(self, index: int) -> VehicleState:
+        """Get the `VehicleState` of a single row. The object is built on first access
+        and reused afterwards.
+        """
+        state = self._states[index]
+        if state is None:
+            length, width, height = self.dimensions[index]
+            state = VehicleState(
+                vehicle_id=self.vehicle_ids[index],
+                vehicle_type=self.vehicle_types[index],
+                vehicle_config_type=self.vehicle_config_types[index],
+                pose=self.pose(index),
+                dimensions=Dimensions(
+                    length=float(length), width=float(width), height=float(height)
+                ),
+                speed=float(self.speeds[index]),
+                updated=bool(self.updated[index]),
+                source=self.source,
+            )
+            self._states[index] = state
+        return state
+
+    def to_vehicle_states(self) -> List[VehicleState]:
+        """Unpack all rows into `VehicleState` objects."""
+        return [self.vehicle_state(i) for i in range(len(self))]
+
+    def mark_updated(self, index: int):
+        """Flag the given row as having been applied to its vehicle."""
+        self.updated[index] = True
+        state = self._states[index]
+        if state is not None:
+            state.updated = True
+
+    def take(self, indices: Sequence[int]) -> "VehicleStateColumns":
+        """Create a new block containing only the given rows."""
+        indices = np.asarray(indices, dtype=np.int64)
+        taken = VehicleStateColumns(
+            vehicle_ids=[self.vehicle_ids[i] for i in indices],
+            positions=self.positions[indices],
+            headings=self.headings[indices],
+            speeds=self.speeds[indices],
+            dimensions=self.dimensions[indices],
+            vehicle_config_types=[self.vehicle_config_types[i] for i in indices],
+            source=self.source,
+            updated=self.updated[indices],
+            vehicle_types=[self.vehicle_types[i] for i in indices],
+        )
+        taken._states = [self._states[i] for i in indices]
+        return taken
+
+
 class ProviderState:
-    """State information from a provider."""
+    """State information from a provider.
+
+    Vehicle states can either be given as individual `VehicleState` objects or in bulk
+    as `VehicleStateColumns`. Accessing `vehicles` unpacks any columns into objects;
+    performance sensitive consumers should use `individual_vehicles` and `columns`.
+    """
 
-    vehicles: List[VehicleState] = field(default_factory=list)
-    dt: Optional[float] = None  # most Providers can leave this blank
+    def __init__(
+        self,
+        vehicles: Optional[List[VehicleState]] = None,
+        dt: Optional[float] = None,  # most Providers can leave this blank
+        columns: Optional[List[VehicleStateColumns]] = None,
+    ):
+        self._vehicles: List[VehicleState] = list(vehicles or [])
+        self.dt: Optional[float] = dt
+        self._columns: List[VehicleStateColumns] = [
+            c for c in (columns or []) if len(c)
+        ]
+
+    def __eq__(self, other):
+        if not isinstance(other, ProviderState):
+            return NotImplemented
+        # Compares like `vehicles` without unpacking the columns in place.
+        return self.dt == other.dt and self._all_vehicles() == other._all_vehicles()
+
+    def _all_vehicles(self) -> List[VehicleState]:
+        vehicles = list(self._vehicles)
+        for columns in self._columns:
+            vehicles += columns.to_vehicle_states()
+        return vehicles
+
+    def __repr__(self):
+        return (
+            f"ProviderState(vehicles={self._vehicles}, dt={self.dt}, "
+            f"columns={[c.vehicle_ids for c in self._columns]})"
+        )
+
+    @property
+    def vehicles(self) -> List[VehicleState]:
+        """All vehicle states as objects. This unpacks bulk vehicle state columns."""
+        if self._columns:
+            for columns in self._columns:
+                self._vehicles += columns.to_vehicle_states()
+            self._columns = []
+        return self._vehicles
+
+    @vehicles.setter
+    def vehicles(self, vehicles: List[VehicleState]):
+        self._vehicles = list(vehicles)
+        self._columns = []
+
+    @property
+    def individual_vehicles(self) -> List[VehicleState]:
+        """The vehicle states that were not given in bulk as columns."""
+        return self._vehicles
+
+    @property
+    def columns(self) -> List[VehicleStateColumns]:
+        """The vehicle states that were given in bulk as columns."""
+        return self._columns
+
+    @property
+    def vehicle_ids(self) -> Set[str]:
+        """The ids of all vehicles in this state."""
+        vehicle_ids = {v.vehicle_id for v in self._vehicles}
+        for columns in self._columns:
+            vehicle_ids.update(columns.vehicle_ids)
+        return vehicle_ids
+
+    def vehicle_state(self, vehicle_id: str) -> Optional[VehicleState]:
+        """Find the state of a single vehicle."""
+        for vehicle in self._vehicles:
+            if vehicle.vehicle_id == vehicle_id:
+                return vehicle
+        for columns in self._columns:
+            index = columns.index_of(vehicle_id)
+            if index is not None:
+                return columns.vehicle_state(index)
+        return None
 
     def merge(self, other: "ProviderState"):
         """Merge state with another provider's state."""
-        our_vehicles = {v.vehicle_id for v in self.vehicles}
-        other_vehicles = {v.vehicle_id for v in other.vehicles}
+        our_vehicles = self.vehicle_ids
+        other_vehicles = other.vehicle_ids
         assert our_vehicles.isdisjoint(other_vehicles)
 
-        self.vehicles += other.vehicles
+        self._vehicles += other.individual_vehicles
+        self._columns += other.columns
         self.dt = max(self.dt, other.dt, key=lambda x: x if x else 0)
 
     def filter(self, vehicle_ids):
         """Filter vehicle states down to the given vehicles."""
-        provider_vehicle_ids = [v.vehicle_id for v in self.vehicles]
-        for v_id in vehicle_ids:
-            try:
-                index = provider_vehicle_ids.index(v_id)
-                del provider_vehicle_ids[index]
-                del self.vehicles[index]
-            except ValueError:
-                continue
+        vehicle_ids = set(vehicle_ids)
+        if not vehicle_ids:
+            return
+        self._vehicles[:] = [
+            v for v in self._vehicles if v.vehicle_id not in vehicle_ids
+        ]
+        filtered_columns = []
+        for columns in self._columns:
+            keep = [
+                i
+                for i, v_id in enumerate(columns.vehicle_ids)
+                if v_id not in vehicle_ids
+            ]
+            if len(keep) == len(columns):
+                filtered_columns.append(columns)
+            elif keep:
+                filtered_columns.append(columns.take(keep))
+        self._columns = filtered_columns
 
 
 class Provider:
@@ -102,6 +348,20 @@ class Provider:
         """Clean up provider resources."""
         raise NotImplementedError
 
+    def snapshot(self) -> Any:
+        """Capture the state of the provider so that it can be returned to it later with
+        `restore()`. Providers that are cheap to set up can keep the default, which
+        captures nothing.
+        """
+        return None
+
+    def restore(self, scenario: Scenario, snapshot: Any) -> ProviderState:
+        """Return the provider to a state captured by `snapshot()` for the given
+        (current) scenario. By default the provider is torn down and set up again.
+        """
+        self.teardown()
+        return self.setup(scenario)
+
     def recover(
         self, scenario, elapsed_sim_time: float, error: Optional[Exception] = None
     ) -> Tuple[ProviderState, bool]:
@@ -17,15 +17,25 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
+import collections
 import logging
+import queue
+import threading
 import time
+import uuid
 from concurrent import futures
-from typing import Tuple
+from typing import Any, List, Sequence, Tuple
 
 import cloudpickle
 import grpc
 
-from smarts.zoo import manager_pb2, manager_pb2_grpc, worker_pb2, worker_pb2_grpc
+from smarts.zoo import (
+    manager_pb2,
+    manager_pb2_grpc,
+    serialization,
+    worker_pb2,
+    worker_pb2_grpc,
+)
 from smarts.zoo.agent_spec import AgentSpec
 
 
@@ -43,6 +53,7 @@ class RemoteAgent:
         manager_address: Tuple[str, int],
         worker_address: Tuple[str, int],
         timeout: float = 10,
+        stream: bool = True,
     ):
         """Executes an agent in a worker (i.e., a gRPC server).
 
@@ -51,15 +62,29 @@ class RemoteAgent:
             worker_address (Tuple[str,int]): Worker's server address (ip, port).
             timeout (float, optional): Time (seconds) to wait for startup or response from
                 server. Defaults to 10.
+            stream (bool, optional): Exchange observations and actions over a single
+                long-lived bidirectional stream instead of one call per step.
+                Defaults to True.
 
         Raises:
             RemoteAgentException: If timeout occurs while connecting to the manager or worker.
         """
         self._log = logging.getLogger(self.__class__.__name__)
 
+        # Key of this agent within the worker, which may host other agents as well.
+        self._agent_id = uuid.uuid4().hex
+
         # Track the last action future.
         self._act_future = None
 
+        self._stream = stream
+        # Requests for the open `act_stream` call, and the futures waiting on its
+        # responses in the order the requests were sent.
+        self._stream_requests = None
+        self._stream_futures = collections.deque()
+        self._stream_call = None
+        self._stream_lock = threading.Lock()
+
         self._manager_channel = grpc.insecure_channel(
             f"{manager_address[0]}:{manager_address[1]}"
         )
@@ -79,18 +104,156 @@ class RemoteAgent:
         self._worker_stub = worker_pb2_grpc.WorkerStub(self._worker_channel)
 
     def act(self, obs):
-        """Call the agent's act function asynchronously and return a Future."""
-        self._act_future = self._worker_stub.act.future(
-            worker_pb2.Observation(payload=cloudpickle.dumps(obs))
+        """Call the agent's act function asynchronously and return a Future resolving
+        to the agent's action."""
+        payload, buffers = serialization.dumps(obs)
+        request = worker_pb2.Observation(
+            payload=payload,
+            buffers=serialization.as_bytes(buffers),
+            agent_id=self._agent_id,
         )
 
+        if self._stream:
+            self._act_future = futures.Future()
+            self._act_future.set_running_or_notify_cancel()
+            with self._stream_lock:
+                if self._stream_call is None:
+                    self._open_stream()
+                self._stream_futures.append(self._act_future)
+                self._stream_requests.put(request)
+        else:
+            self._act_future = futures.Future()
+            self._act_future.set_running_or_notify_cancel()
+            self._worker_stub.act.future(request).add_done_callback(
+                self._resolve_act_future(self._act_future)
+            )
+
         return self._act_future
 
-    def start(self, agent_spec: AgentSpec):
-        """Send the AgentSpec to the agent runner."""
+    @staticmethod
+    def act_batch(
+        remote_agents: Sequence["RemoteAgent"], observations: Sequence[Any]
+    ) -> List[futures.Future]:
+        """Call the act function of several agents asynchronously, sending the
+        observations of agents hosted by the same worker in a single batch.
+
+        Returns:
+            List[futures.Future]: A Future resolving to each agent's action.
+        """
+        by_worker = {}
+        for remote_agent, obs in zip(remote_agents, observations):
+            by_worker.setdefault(remote_agent._worker_address, []).append(
+                (remote_agent, obs)
+            )
+
+        act_futures = {}
+        for batch in by_worker.values():
+            if len(batch) == 1:
+                remote_agent, obs = batch[0]
+                act_futures[remote_agent] = remote_agent.act(obs)
+                continue
+
+            requests = []
+            for remote_agent, obs in batch:
+                payload, buffers = serialization.dumps(obs)
+                requests.append(
+                    worker_pb2.Observation(
+                        payload=payload,
+                        buffers=serialization.as_bytes(buffers),
+                        agent_id=remote_agent._agent_id,
+                    )
+                )
+                remote_agent._act_future = futures.Future()
+                remote_agent._act_future.set_running_or_notify_cancel()
+                act_futures[remote_agent] = remote_agent._act_future
+
+            batch_futures = [act_futures[remote_agent] for remote_agent, _ in batch]
+            batch[0][0]._worker_stub.act_batch.future(
+                worker_pb2.Observations(observations=requests)
+            ).add_done_callback(RemoteAgent._resolve_act_batch(batch_futures))
+
+        return [act_futures[remote_agent] for remote_agent in remote_agents]
+
+    def _open_stream(self):
+        self._stream_requests = queue.Queue()
+        # The request stream ends when `None` is queued.
+        self._stream_call = self._worker_stub.act_stream(
+            iter(self._stream_requests.get, None)
+        )
+        threading.Thread(
+            target=self._receive_stream,
+            args=(self._stream_call,),
+            name=f"RemoteAgent-{self._worker_address[1]}",
+            daemon=True,
+        ).start()
+
+    def _receive_stream(self, call):
+        error = RemoteAgentException("The action stream to the worker was closed.")
+        try:
+            for response in call:
+                act_future = self._stream_futures.popleft()
+                if not act_future.done():
+                    act_future.set_result(
+                        serialization.loads(response.action, response.buffers)
+                    )
+        except grpc.RpcError as e:
+            error = e
+
+        # The stream is dead, fail the actions still waiting on it. The next `act`
+        # opens a new stream.
+        with self._stream_lock:
+            if self._stream_call is call:
+                self._stream_call = None
+            while self._stream_futures:
+                act_future = self._stream_futures.popleft()
+                if not act_future.done():
+                    act_future.set_exception(error)
+
+    @staticmethod
+    def _resolve_act_future(act_future):
+        def resolve(call_future):
+            try:
+                response = call_future.result()
+                act_future.set_result(
+                    serialization.loads(response.action, response.buffers)
+                )
+            except Exception as e:
+                act_future.set_exception(e)
+
+        return resolve
+
+    @staticmethod
+    def _resolve_act_batch(act_futures):
+        def resolve(call_future):
+            try:
+                actions = call_future.result().actions
+                for act_future, response in zip(act_futures, actions):
+                    act_future.set_result(
+                        serialization.loads(response.action, response.buffers)
+                    )
+            except Exception as e:
+                for act_future in act_futures:
+                    if not act_future.done():
+                        act_future.set_exception(e)
+
+        return resolve
+
+    def start(self, agent_spec: AgentSpec, group: str = ""):
+        """Send the AgentSpec to the agent runner.
+
+        Args:
+            agent_spec (AgentSpec): The specification of the agent to build.
+            group (str, optional): Policy group of the agent. Batchable agents of the
+                same group hosted by one worker share a policy instance. Defaults to
+                "", i.e., no sharing.
+        """
         # Cloudpickle used only for the agent_spec to allow for serialization of lambdas.
         self._worker_stub.build(
-            worker_pb2.Specification(payload=cloudpickle.dumps(agent_spec))
+            worker_pb2.Specification(
+                payload=cloudpickle.dumps(agent_spec),
+                agent_id=self._agent_id,
+                group=group,
+            )
         )
 
     def terminate(self):
@@ -99,8 +262,17 @@ class RemoteAgent:
         if (self._act_future is not None) and (not self._act_future.done()):
             self._act_future.cancel()
 
+        with self._stream_lock:
+            if self._stream_call is not None:
+                self._stream_requests.put(None)
+                self._stream_call.cancel()
+                self._stream_call = None
+
         try:
-            # Stop the remote worker process
+            # Free this agent's slot in the worker and close the worker channel
+            self._worker_stub.release(worker_pb2.Agent(agent_id=self._agent_id))
+            self._worker_channel.close()
+            # Stop (or return to the manager's pool) the remote worker process
             self._manager_stub.stop_worker(
                 manager_pb2.Port(num=self._worker_address[1])
             )
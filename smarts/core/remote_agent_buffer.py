@@ -18,12 +18,16 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import collections
+import itertools
 import logging
+import math
 import pathlib
 import random
 import signal
 import subprocess
 import sys
+import threading
 import time
 from concurrent import futures
 from typing import Optional, Tuple
@@ -44,6 +48,10 @@ class RemoteAgentBuffer:
         buffer_size: int = 3,
         max_workers: int = 4,
         timeout: float = 10,
+        max_buffer_size: Optional[int] = None,
+        worker_pool_size: Optional[int] = None,
+        agents_per_worker: int = 1,
+        group_idle_timeout: float = 60,
     ):
         """Creates a local manager (if `zoo_manager_addrs=None`) or connects to a remote manager, to create and manage workers
         which execute agents.
@@ -55,8 +63,22 @@ class RemoteAgentBuffer:
                 non-zero. Defaults to 3.
             max_workers (int, optional): Maximum number of threads used for creation of workers. Defaults to 4.
             timeout (float, optional): Time (seconds) to wait for startup or response from server. Defaults to 10.
+            max_buffer_size (Optional[int], optional): Upper bound of the buffer, which grows beyond `buffer_size`
+                when agents are acquired faster than they can be started. Defaults to `4 * buffer_size`.
+            worker_pool_size (Optional[int], optional): Number of worker processes the local manager starts ahead of
+                time and keeps warm for reuse. Defaults to `buffer_size`.
+            agents_per_worker (int, optional): Number of agents each worker process hosts at a time. Above 1, agents
+                acquired with the same `group` are placed on the same worker so that they can act in a batch.
+                Defaults to 1.
+            group_idle_timeout (float, optional): Time (seconds) after which the buffer of a group that is no longer
+                acquired from is released, which returns its workers to the pool. Defaults to 60.
         """
         assert buffer_size > 0
+        if max_buffer_size is None:
+            max_buffer_size = 4 * buffer_size
+        assert max_buffer_size >= buffer_size
+        if worker_pool_size is None:
+            worker_pool_size = buffer_size
 
         self._log = logging.getLogger(self.__class__.__name__)
         self._timeout = timeout
@@ -86,7 +108,9 @@ class RemoteAgentBuffer:
             self._zoo_manager_conns = [
                 {
                     "address": ("localhost", port),
-                    "process": spawn_local_zoo_manager(port),
+                    "process": spawn_local_zoo_manager(
+                        port, worker_pool_size, agents_per_worker
+                    ),
                 }
             ]
         else:
@@ -98,11 +122,25 @@ class RemoteAgentBuffer:
                 conn["address"], self._timeout
             )
 
+        self._agents_per_worker = agents_per_worker
         self._buffer_size = buffer_size
+        self._max_buffer_size = max_buffer_size
+        # Recent acquisition times and a running average of the time taken to build
+        # a remote agent, from which the buffer size is adapted. Builds run in the
+        # replenish threads, so both are guarded by `self._stats_lock`.
+        self._stats_lock = threading.Lock()
+        self._acquire_times = collections.deque(maxlen=10)
+        self._build_time = 0.0
         self._replenish_threadpool = futures.ThreadPoolExecutor(max_workers=max_workers)
         self._agent_buffer = [
             self._remote_agent_future() for _ in range(self._buffer_size)
         ]
+        # Buffers of agents placed next to their co-location group, keyed by group.
+        # They are started on the first acquisition of each group and released once
+        # the group has not been acquired from for `group_idle_timeout`.
+        self._group_buffers = {}
+        self._group_acquire_times = {}
+        self._group_idle_timeout = group_idle_timeout
 
         # Catch abrupt terminate signals
         signal.signal(signal.SIGTERM, self._stop_servers)
@@ -116,7 +154,9 @@ class RemoteAgentBuffer:
 
     def destroy(self):
         """Teardown any remaining remote agents and the local zoo manager (if it exists.)"""
-        for remote_agent_future in self._agent_buffer:
+        for remote_agent_future in itertools.chain(
+            self._agent_buffer, *self._group_buffers.values()
+        ):
             try:
                 remote_agent = remote_agent_future.result()
                 remote_agent.terminate()
@@ -132,16 +172,23 @@ class RemoteAgentBuffer:
             self._zoo_manager_conns[0]["process"].terminate()
             self._zoo_manager_conns[0]["process"].wait()
 
-    def _build_remote_agent(self, zoo_manager_conns):
-        # Get a random zoo manager connection.
-        zoo_manager_conn = random.choice(zoo_manager_conns)
+    def _build_remote_agent(self, zoo_manager_conns, group: str = ""):
+        if group:
+            # Agents of a group go through the same zoo manager to be co-located.
+            index = hash(group) % len(zoo_manager_conns)
+            zoo_manager_conn = zoo_manager_conns[index]
+        else:
+            # Get a random zoo manager connection.
+            zoo_manager_conn = random.choice(zoo_manager_conns)
 
         # Spawn remote worker and get its port.
         retries = 3
         worker_port = None
         for retry in range(retries):
             try:
-                response = zoo_manager_conn["stub"].spawn_worker(manager_pb2.Machine())
+                response = zoo_manager_conn["stub"].spawn_worker(
+                    manager_pb2.Machine(group=group)
+                )
                 worker_port = response.num
                 break
             except grpc.RpcError as e:
@@ -159,39 +206,109 @@ class RemoteAgentBuffer:
             zoo_manager_conn["address"], (zoo_manager_conn["address"][0], worker_port)
         )
 
-    def _remote_agent_future(self):
+    def _timed_build_remote_agent(self, zoo_manager_conns, group: str = ""):
+        start = time.time()
+        remote_agent = self._build_remote_agent(zoo_manager_conns, group)
+        with self._stats_lock:
+            self._build_time = 0.8 * self._build_time + 0.2 * (time.time() - start)
+        return remote_agent
+
+    def _remote_agent_future(self, group: str = ""):
         return self._replenish_threadpool.submit(
-            self._build_remote_agent, self._zoo_manager_conns
+            self._timed_build_remote_agent, self._zoo_manager_conns, group
         )
 
-    def _try_to_acquire_remote_agent(self, timeout: float):
-        assert len(self._agent_buffer) == self._buffer_size
+    def _release_remote_agent(self, remote_agent_future):
+        try:
+            remote_agent_future.result().terminate()
+        except Exception as e:
+            self._log.debug(f"Failed to release an idle remote agent. {repr(e)}")
+
+    def _record_acquisition(self):
+        with self._stats_lock:
+            self._acquire_times.append(time.time())
+
+    def _target_buffer_size(self):
+        with self._stats_lock:
+            if len(self._acquire_times) < 2:
+                return self._buffer_size
+
+            elapsed = self._acquire_times[-1] - self._acquire_times[0]
+            acquire_rate = (len(self._acquire_times) - 1) / max(elapsed, 1e-6)
+            build_time = self._build_time
+        # Keep enough agents in flight to cover the acquisitions expected while a
+        # replacement is being built.
+        target = math.ceil(acquire_rate * build_time) + 1
+        return min(max(target, self._buffer_size), self._max_buffer_size)
+
+    def _group_buffer(self, group: str):
+        if not group:
+            return self._agent_buffer
+
+        if group not in self._group_buffers:
+            # Start the agents of a new group together rather than one at a time.
+            self._group_buffers[group] = [
+                self._remote_agent_future(group) for _ in range(self._buffer_size)
+            ]
+        return self._group_buffers[group]
+
+    def _release_idle_groups(self, group: str):
+        now = time.time()
+        if group:
+            self._group_acquire_times[group] = now
+        for idle_group, acquire_time in list(self._group_acquire_times.items()):
+            if now - acquire_time <= self._group_idle_timeout:
+                continue
+            del self._group_acquire_times[idle_group]
+            for remote_agent_future in self._group_buffers.pop(idle_group):
+                self._replenish_threadpool.submit(
+                    self._release_remote_agent, remote_agent_future
+                )
+
+    def _try_to_acquire_remote_agent(self, timeout: float, group: str = ""):
+        self._release_idle_groups(group)
+        agent_buffer = self._group_buffer(group)
+        assert len(agent_buffer) > 0
 
         # Check if we have any done remote agent futures.
         done_future_indices = [
-            idx
-            for idx, agent_future in enumerate(self._agent_buffer)
-            if agent_future.done()
+            idx for idx, agent_future in enumerate(agent_buffer) if agent_future.done()
         ]
 
         if len(done_future_indices) > 0:
             # If so, prefer one of these done ones to avoid sim delays.
-            future = self._agent_buffer.pop(done_future_indices[0])
+            future = agent_buffer.pop(done_future_indices[0])
         else:
             # Otherwise, we will block, waiting on a remote agent future.
             self._log.debug(
                 "No ready remote agents, simulation will block until one is available."
             )
-            future = self._agent_buffer.pop(0)
-
-        # Schedule the next remote agent and add it to the buffer.
-        self._agent_buffer.append(self._remote_agent_future())
+            future = agent_buffer.pop(0)
+
+        # Schedule the next remote agents, growing or shrinking the buffer to match
+        # the observed rate of acquisitions.
+        self._record_acquisition()
+        target_buffer_size = self._target_buffer_size()
+        while len(agent_buffer) < target_buffer_size:
+            agent_buffer.append(self._remote_agent_future(group))
+        while len(agent_buffer) > target_buffer_size:
+            # Release idle remote agents, which returns their workers to the pool.
+            idle_futures = [f for f in agent_buffer if f.done()]
+            if not idle_futures:
+                break
+            agent_buffer.remove(idle_futures[-1])
+            self._replenish_threadpool.submit(
+                self._release_remote_agent, idle_futures[-1]
+            )
 
         remote_agent = future.result(timeout=timeout)
         return remote_agent
 
     def acquire_remote_agent(
-        self, retries: int = 3, timeout: Optional[float] = None
+        self,
+        retries: int = 3,
+        timeout: Optional[float] = None,
+        group: Optional[str] = None,
     ) -> RemoteAgent:
         """Creates RemoteAgent objects.
 
@@ -200,6 +317,9 @@ class RemoteAgentBuffer:
                 RemoteAgent. Defaults to 3.
             timeout (Optional[float], optional): Time (seconds) to wait in acquiring a RemoteAgent.
                 Defaults to None, which does not timeout.
+            group (Optional[str], optional): Co-location group of the agent, e.g. the policy it runs. Only used
+                when workers host several agents, in which case agents of each group are taken from a buffer of
+                their own. Defaults to None.
 
         Raises:
             RemoteAgentException: If fail to acquire a RemoteAgent.
@@ -209,10 +329,12 @@ class RemoteAgentBuffer:
         """
         if timeout == None:
             timeout = self._timeout
+        if self._agents_per_worker == 1:
+            group = None
 
         for retry in range(retries):
             try:
-                return self._try_to_acquire_remote_agent(timeout)
+                return self._try_to_acquire_remote_agent(timeout, group or "")
             except Exception as e:
                 self._log.debug(
                     f"Failed {retry+1}/{retries} times in acquiring remote agent. {repr(e)}"
@@ -222,7 +344,7 @@ class RemoteAgentBuffer:
         raise RemoteAgentException("Failed to acquire remote agent.")
 
 
-def spawn_local_zoo_manager(port):
+def spawn_local_zoo_manager(port, pool_size: int = 0, agents_per_worker: int = 1):
     """Generates a local manager subprocess."""
     cmd = [
         sys.executable,  # Path to the current Python binary.
@@ -233,6 +355,10 @@ def spawn_local_zoo_manager(port):
         ),
         "--port",
         str(port),
+        "--pool-size",
+        str(pool_size),
+        "--agents-per-worker",
+        str(agents_per_worker),
     ]
 
     manager = subprocess.Popen(cmd)
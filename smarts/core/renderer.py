@@ -30,6 +30,7 @@ from threading import Lock
 from typing import NamedTuple
 
 import gltf
+import numpy as np
 from direct.showbase.ShowBase import ShowBase
 
 # pytype: disable=import-error
@@ -171,6 +172,11 @@ class _ShowBaseInstance(ShowBase):
                 np.show()
 
 
+# The channels of the formats read from the graphics buffer, which is stored in
+# BGRA order.
+_BGRA_CHANNELS = {"RGB": slice(2, None, -1), "A": slice(3, 4)}
+
+
 class Renderer:
     """The utility used to render simulation geometry."""
 
@@ -300,6 +306,31 @@ class Renderer:
 
         def wait_for_ram_image(self, img_format: str, retries=100):
             """Attempt to acquire a graphics buffer."""
+            self._wait_for_render(retries)
+            ram_image = self.tex.getRamImageAs(img_format)
+            assert ram_image is not None
+            return ram_image
+
+        def read_image(self, img_format: str, retries=100) -> np.ndarray:
+            """Copy the rendered image out of the graphics buffer, with its rows
+            ordered from top to bottom and its channels in the given format, e.g.
+            "RGB" or "A". This is the only copy made of the image.
+            """
+            channels = _BGRA_CHANNELS.get(img_format)
+            if self.tex.getNumComponents() != 4 or channels is None:
+                ram_image = self.wait_for_ram_image(img_format, retries)
+                image = np.frombuffer(memoryview(ram_image), np.uint8)
+                image.shape = (self.tex.getYSize(), self.tex.getXSize(), -1)
+                return np.flipud(image)
+
+            self._wait_for_render(retries)
+            # The graphics buffer is overwritten by the next render, so only the
+            # requested channels are copied out of it, into a contiguous array.
+            ram_image = np.frombuffer(memoryview(self.tex.getRamImage()), np.uint8)
+            ram_image.shape = (self.tex.getYSize(), self.tex.getXSize(), 4)
+            return np.flipud(ram_image)[:, :, channels].copy()
+
+        def _wait_for_render(self, retries: int):
             # Rarely, we see dropped frames where an image is not available
             # for our observation calculations.
             #
@@ -318,9 +349,6 @@ class Renderer:
                 region.window.engine.renderFrame()
 
             assert self.tex.mightHaveRamImage()
-            ram_image = self.tex.getRamImageAs(img_format)
-            assert ram_image is not None
-            return ram_image
 
         def update(self, pose: Pose, height: float):
             """Update the location of the camera.
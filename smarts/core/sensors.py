@@ -20,9 +20,9 @@
 import logging
 import time
 from collections import deque, namedtuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import lru_cache
-from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 
 import numpy as np
 
@@ -201,6 +201,9 @@ class Observation:
     top_down_rgb: Optional[TopDownRGB]
     road_waypoints: Optional[RoadWaypoints]
     via_data: Vias
+    observed_at: Dict[str, float] = field(default_factory=dict)
+    """The simulation time each sensor field was last updated at. Sensors that update
+    less often than every step repeat their last value in between."""
 
 
 @dataclass
@@ -237,43 +240,190 @@ class Sensors:
     @staticmethod
     def observe(sim, agent_id, sensor_state, vehicle) -> Tuple[Observation, bool]:
         """Generate observations for the given agent around the given vehicle."""
+        interface = sim.agent_manager.agent_interface_for_agent_id(agent_id)
+        observed_at = {}
+
+        def observe_every(observation_field, update_every, sensor):
+            value, observed_at[observation_field] = Sensors._observe_every(
+                sim, sensor_state, observation_field, update_every, sensor
+            )
+            return value
+
         neighborhood_vehicles = None
-        if vehicle.subscribed_to_neighborhood_vehicles_sensor:
-            neighborhood_vehicles = []
-            for nv in vehicle.neighborhood_vehicles_sensor():
-                nv_lane = sim.road_map.nearest_lane(
-                    nv.pose.point, radius=vehicle.length
-                )
-                if nv_lane:
-                    nv_road_id = nv_lane.road.road_id
-                    nv_lane_id = nv_lane.lane_id
-                    nv_lane_index = nv_lane.index
-                else:
-                    nv_road_id = None
-                    nv_lane_id = None
-                    nv_lane_index = None
-                neighborhood_vehicles.append(
-                    VehicleObservation(
-                        id=nv.vehicle_id,
-                        position=nv.pose.position,
-                        bounding_box=nv.dimensions,
-                        heading=nv.pose.heading,
-                        speed=nv.speed,
-                        road_id=nv_road_id,
-                        lane_id=nv_lane_id,
-                        lane_index=nv_lane_index,
-                    )
-                )
+        if vehicle.subscribed_to_neighborhood_vehicles_sensor and interface.requires(
+            "neighborhood_vehicle_states"
+        ):
+            neighborhood_vehicles = observe_every(
+                "neighborhood_vehicle_states",
+                interface.neighborhood_vehicles.update_every,
+                lambda: Sensors._neighborhood_vehicle_observations(sim, vehicle),
+            )
+
+        waypoint_paths = None
+        if vehicle.subscribed_to_waypoints_sensor and interface.requires(
+            "waypoint_paths"
+        ):
+            waypoint_paths = observe_every(
+                "waypoint_paths",
+                interface.waypoints.update_every,
+                vehicle.waypoints_sensor,
+            )
+
+        ego_vehicle = None
+        if interface.requires("ego_vehicle_state"):
+            ego_vehicle = Sensors._ego_vehicle_observation(sim, vehicle, sensor_state)
+
+        road_waypoints = None
+        if vehicle.subscribed_to_road_waypoints_sensor and interface.requires(
+            "road_waypoints"
+        ):
+            road_waypoints = observe_every(
+                "road_waypoints",
+                interface.road_waypoints.update_every,
+                vehicle.road_waypoints_sensor,
+            )
 
-        if vehicle.subscribed_to_waypoints_sensor:
-            waypoint_paths = vehicle.waypoints_sensor()
+        via_data = None
+        if interface.requires("via_data"):
+            near_via_points = []
+            hit_via_points = []
+            if vehicle.subscribed_to_via_sensor:
+                (
+                    near_via_points,
+                    hit_via_points,
+                ) = vehicle.via_sensor()
+            via_data = Vias(
+                near_via_points=near_via_points,
+                hit_via_points=hit_via_points,
+            )
+
+        # The trip meter is always updated as it is also used for the agent scores.
+        if waypoint_paths and observed_at["waypoint_paths"] == sim.elapsed_sim_time:
+            trip_waypoint_paths = waypoint_paths
         else:
-            waypoint_paths = sim.road_map.waypoint_paths(
+            trip_waypoint_paths = sim.road_map.waypoint_paths(
                 vehicle.pose,
                 lookahead=1,
                 within_radius=vehicle.length,
             )
+        if trip_waypoint_paths:
+            vehicle.trip_meter_sensor.append_waypoint_if_new(trip_waypoint_paths[0][0])
+        distance_travelled = (
+            vehicle.trip_meter_sensor(sim)
+            if interface.requires("distance_travelled")
+            else None
+        )
+
+        if Sensors._observes_all_events(sim, interface) or (
+            interface.done_criteria.not_moving
+        ):
+            vehicle.driven_path_sensor.track_latest_driven_path(sim)
+
+        drivable_area_grid_map = None
+        if vehicle.subscribed_to_drivable_area_grid_map_sensor and interface.requires(
+            "drivable_area_grid_map"
+        ):
+            drivable_area_grid_map = observe_every(
+                "drivable_area_grid_map",
+                interface.drivable_area_grid_map.update_every,
+                vehicle.drivable_area_grid_map_sensor,
+            )
+        ogm = None
+        if vehicle.subscribed_to_ogm_sensor and interface.requires(
+            "occupancy_grid_map"
+        ):
+            ogm = observe_every(
+                "occupancy_grid_map", interface.ogm.update_every, vehicle.ogm_sensor
+            )
+        rgb = None
+        if vehicle.subscribed_to_rgb_sensor and interface.requires("top_down_rgb"):
+            rgb = observe_every(
+                "top_down_rgb", interface.rgb.update_every, vehicle.rgb_sensor
+            )
+        lidar = None
+        if vehicle.subscribed_to_lidar_sensor and interface.requires(
+            "lidar_point_cloud"
+        ):
+            lidar = observe_every(
+                "lidar_point_cloud", interface.lidar.update_every, vehicle.lidar_sensor
+            )
+
+        done, events = Sensors._is_done_with_events(
+            sim, agent_id, vehicle, sensor_state
+        )
+
+        if (
+            done
+            and sensor_state.steps_completed == 1
+            and agent_id in sim.agent_manager.ego_agent_ids
+        ):
+            logger.warning(f"Agent Id: {agent_id} is done on the first step")
+
+        return (
+            Observation(
+                dt=sim.last_dt,
+                step_count=sim.step_count,
+                elapsed_sim_time=sim.elapsed_sim_time,
+                events=events,
+                ego_vehicle_state=ego_vehicle,
+                neighborhood_vehicle_states=neighborhood_vehicles,
+                waypoint_paths=waypoint_paths,
+                distance_travelled=distance_travelled,
+                top_down_rgb=rgb,
+                occupancy_grid_map=ogm,
+                drivable_area_grid_map=drivable_area_grid_map,
+                lidar_point_cloud=lidar,
+                road_waypoints=road_waypoints,
+                via_data=via_data,
+                observed_at=observed_at,
+            ),
+            done,
+        )
+
+    @staticmethod
+    def _observe_every(sim, sensor_state, observation_field, update_every, sensor):
+        """Runs the sensor every `update_every` steps and otherwise reuses its last
+        observation. Returns the observation and the simulation time it was made at."""
+        step = sensor_state.steps_completed
+        last_observation = sensor_state.last_observation(observation_field)
+        if last_observation is None or step - last_observation[2] >= update_every:
+            last_observation = (sensor(), sim.elapsed_sim_time, step)
+            sensor_state.set_last_observation(observation_field, *last_observation)
+
+        if isinstance(sensor, CameraSensor):
+            # Only render the camera for the steps it is observed on
+            sensor.set_active(step + 1 - last_observation[2] >= update_every)
+        return last_observation[:2]
+
+    @staticmethod
+    def _neighborhood_vehicle_observations(sim, vehicle) -> List[VehicleObservation]:
+        neighborhood_vehicles = []
+        for nv in vehicle.neighborhood_vehicles_sensor():
+            nv_lane = sim.road_map.nearest_lane(nv.pose.point, radius=vehicle.length)
+            if nv_lane:
+                nv_road_id = nv_lane.road.road_id
+                nv_lane_id = nv_lane.lane_id
+                nv_lane_index = nv_lane.index
+            else:
+                nv_road_id = None
+                nv_lane_id = None
+                nv_lane_index = None
+            neighborhood_vehicles.append(
+                VehicleObservation(
+                    id=nv.vehicle_id,
+                    position=nv.pose.position,
+                    bounding_box=nv.dimensions,
+                    heading=nv.pose.heading,
+                    speed=nv.speed,
+                    road_id=nv_road_id,
+                    lane_id=nv_lane_id,
+                    lane_index=nv_lane_index,
+                )
+            )
+        return neighborhood_vehicles
 
+    @staticmethod
+    def _ego_vehicle_observation(sim, vehicle, sensor_state) -> EgoVehicleObservation:
         closest_lane = sim.road_map.nearest_lane(vehicle.pose.point)
         if closest_lane:
             ego_lane_id = closest_lane.lane_id
@@ -311,7 +461,7 @@ class Sensors:
                 )
             )
 
-        ego_vehicle = EgoVehicleObservation(
+        return EgoVehicleObservation(
             id=ego_vehicle_state.vehicle_id,
             position=np.array(ego_vehicle_state.pose.position),
             bounding_box=ego_vehicle_state.dimensions,
@@ -328,73 +478,6 @@ class Sensors:
             **acceleration_params,
         )
 
-        road_waypoints = (
-            vehicle.road_waypoints_sensor()
-            if vehicle.subscribed_to_road_waypoints_sensor
-            else None
-        )
-
-        near_via_points = []
-        hit_via_points = []
-        if vehicle.subscribed_to_via_sensor:
-            (
-                near_via_points,
-                hit_via_points,
-            ) = vehicle.via_sensor()
-        via_data = Vias(
-            near_via_points=near_via_points,
-            hit_via_points=hit_via_points,
-        )
-
-        if waypoint_paths:
-            vehicle.trip_meter_sensor.append_waypoint_if_new(waypoint_paths[0][0])
-        distance_travelled = vehicle.trip_meter_sensor(sim)
-
-        vehicle.driven_path_sensor.track_latest_driven_path(sim)
-
-        if not vehicle.subscribed_to_waypoints_sensor:
-            waypoint_paths = None
-
-        drivable_area_grid_map = (
-            vehicle.drivable_area_grid_map_sensor()
-            if vehicle.subscribed_to_drivable_area_grid_map_sensor
-            else None
-        )
-        ogm = vehicle.ogm_sensor() if vehicle.subscribed_to_ogm_sensor else None
-        rgb = vehicle.rgb_sensor() if vehicle.subscribed_to_rgb_sensor else None
-        lidar = vehicle.lidar_sensor() if vehicle.subscribed_to_lidar_sensor else None
-
-        done, events = Sensors._is_done_with_events(
-            sim, agent_id, vehicle, sensor_state
-        )
-
-        if (
-            done
-            and sensor_state.steps_completed == 1
-            and agent_id in sim.agent_manager.ego_agent_ids
-        ):
-            logger.warning(f"Agent Id: {agent_id} is done on the first step")
-
-        return (
-            Observation(
-                dt=sim.last_dt,
-                step_count=sim.step_count,
-                elapsed_sim_time=sim.elapsed_sim_time,
-                events=events,
-                ego_vehicle_state=ego_vehicle,
-                neighborhood_vehicle_states=neighborhood_vehicles,
-                waypoint_paths=waypoint_paths,
-                distance_travelled=distance_travelled,
-                top_down_rgb=rgb,
-                occupancy_grid_map=ogm,
-                drivable_area_grid_map=drivable_area_grid_map,
-                lidar_point_cloud=lidar,
-                road_waypoints=road_waypoints,
-                via_data=via_data,
-            ),
-            done,
-        )
-
     @staticmethod
     def step(sim, sensor_state):
         """Step the sensor state."""
@@ -446,18 +529,32 @@ class Sensors:
         done_criteria = interface.done_criteria
         event_config = interface.event_configuration
 
+        # Checks the done criteria do not need are skipped unless the events are read.
+        all_events = cls._observes_all_events(sim, interface)
+
         # TODO:  the following calls nearest_lanes (expensive) 6 times
         reached_goal = cls._agent_reached_goal(sim, vehicle)
         collided = sim.vehicle_did_collide(vehicle.id)
-        is_off_road = cls._vehicle_is_off_road(sim, vehicle)
-        is_on_shoulder = cls._vehicle_is_on_shoulder(sim, vehicle)
-        is_not_moving = cls._vehicle_is_not_moving(
-            sim, vehicle, event_config.not_moving_time, event_config.not_moving_distance
+        is_off_road = (all_events or done_criteria.off_road) and (
+            cls._vehicle_is_off_road(sim, vehicle)
         )
-        reached_max_episode_steps = sensor_state.reached_max_episode_steps
-        is_off_route, is_wrong_way = cls._vehicle_is_off_route_and_wrong_way(
-            sim, vehicle
+        is_on_shoulder = (all_events or done_criteria.on_shoulder) and (
+            cls._vehicle_is_on_shoulder(sim, vehicle)
+        )
+        is_not_moving = (all_events or done_criteria.not_moving) and (
+            cls._vehicle_is_not_moving(
+                sim,
+                vehicle,
+                event_config.not_moving_time,
+                event_config.not_moving_distance,
+            )
         )
+        reached_max_episode_steps = sensor_state.reached_max_episode_steps
+        is_off_route, is_wrong_way = False, False
+        if all_events or done_criteria.off_route or done_criteria.wrong_way:
+            is_off_route, is_wrong_way = cls._vehicle_is_off_route_and_wrong_way(
+                sim, vehicle
+            )
         agents_alive_done = cls._agents_alive_done_check(
             sim.agent_manager, done_criteria.agents_alive
         )
@@ -488,6 +585,11 @@ class Sensors:
 
         return done, events
 
+    @staticmethod
+    def _observes_all_events(sim, interface) -> bool:
+        # Envision shows the events of every agent
+        return interface.requires("events") or sim.envision is not None
+
     @classmethod
     def _agent_reached_goal(cls, sim, vehicle):
         sensor_state = sim.vehicle_index.sensor_state_for_vehicle_id(vehicle.id)
@@ -613,11 +715,25 @@ class SensorState:
         self._max_episode_steps = max_episode_steps
         self._plan = plan
         self._step = 0
+        self._last_observations = {}
 
     def step(self):
         """Update internal state."""
         self._step += 1
 
+    def last_observation(
+        self, observation_field: str
+    ) -> Optional[Tuple[Any, float, int]]:
+        """The last observation made for the given field with the simulation time and
+        the step it was made at, or None if the field has not been observed yet."""
+        return self._last_observations.get(observation_field)
+
+    def set_last_observation(
+        self, observation_field: str, value, observed_at: float, step: int
+    ):
+        """Record the observation made for the given field."""
+        self._last_observations[observation_field] = (value, observed_at, step)
+
     @property
     def reached_max_episode_steps(self):
         """Inbuilt sensor information that describes if episode step limit has been reached."""
@@ -667,6 +783,11 @@ class CameraSensor(Sensor):
     def step(self):
         self._follow_vehicle()
 
+    def set_active(self, active: bool):
+        """Sets whether the render pipeline renders this sensor. An inactive sensor
+        keeps its last image."""
+        self._camera.buffer.setActive(active)
+
     def _follow_vehicle(self):
         largest_dim = max(self._vehicle._chassis.dimensions.as_lwh)
         self._camera.update(self._vehicle.pose, 20 * largest_dim)
@@ -699,11 +820,7 @@ class DrivableAreaGridMapSensor(CameraSensor):
             self._camera is not None
         ), "Drivable area grid map has not been initialized"
 
-        ram_image = self._camera.wait_for_ram_image(img_format="A")
-        mem_view = memoryview(ram_image)
-        image = np.frombuffer(mem_view, np.uint8)
-        image.shape = (self._camera.tex.getYSize(), self._camera.tex.getXSize(), 1)
-        image = np.flipud(image)
+        image = self._camera.read_image(img_format="A")
 
         metadata = GridMapMetadata(
             created_at=int(time.time()),
@@ -741,11 +858,7 @@ class OGMSensor(CameraSensor):
     def __call__(self) -> OccupancyGridMap:
         assert self._camera is not None, "OGM has not been initialized"
 
-        ram_image = self._camera.wait_for_ram_image(img_format="A")
-        mem_view = memoryview(ram_image)
-        grid = np.frombuffer(mem_view, np.uint8)
-        grid.shape = (self._camera.tex.getYSize(), self._camera.tex.getXSize(), 1)
-        grid = np.flipud(grid)
+        grid = self._camera.read_image(img_format="A")
 
         metadata = GridMapMetadata(
             created_at=int(time.time()),
@@ -770,18 +883,20 @@ class RGBSensor(CameraSensor):
         renderer,  # type Renderer or None
     ):
         super().__init__(
-            vehicle, renderer, "rgb", RenderMasks.RGB_HIDE, width, height, resolution
+            vehicle,
+            renderer,
+            "rgb",
+            RenderMasks.RGB_HIDE,
+            width,
+            height,
+            resolution,
         )
         self._resolution = resolution
 
     def __call__(self) -> TopDownRGB:
         assert self._camera is not None, "RGB has not been initialized"
 
-        ram_image = self._camera.wait_for_ram_image(img_format="RGB")
-        mem_view = memoryview(ram_image)
-        image = np.frombuffer(mem_view, np.uint8)
-        image.shape = (self._camera.tex.getYSize(), self._camera.tex.getXSize(), 3)
-        image = np.flipud(image)
+        image = self._camera.read_image(img_format="RGB")
 
         metadata = GridMapMetadata(
             created_at=int(time.time()),
@@ -20,8 +20,10 @@
 import importlib.resources as pkg_resources
 import logging
 import os
+import random
 import warnings
 from collections import defaultdict
+from dataclasses import dataclass
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 import numpy as np
@@ -30,7 +32,7 @@ from scipy.spatial.distance import cdist
 from envision import types as envision_types
 from envision.client import Client as EnvisionClient
 from smarts import VERSION
-from smarts.core.chassis import BoxChassis
+from smarts.core.chassis import AckermannChassis, BoxChassis
 from smarts.core.plan import Plan
 
 from . import models
@@ -51,6 +53,7 @@ from .traffic_history_provider import TrafficHistoryProvider
 from .trajectory_interpolation_provider import TrajectoryInterpolationProvider
 from .trap_manager import TrapManager
 from .utils import pybullet
+from .utils.collision import collisions_with
 from .utils.id import Id
 from .utils.math import rounder_for_dt
 from .utils.pybullet import bullet_client as bc
@@ -79,6 +82,20 @@ class SMARTSDestroyedError(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class SimulationSnapshot:
+    """The state of a simulation captured by `SMARTS.snapshot()`."""
+
+    scenario: Scenario
+    """The scenario the snapshot was taken in."""
+    provider_snapshots: Dict[Provider, Any]
+    """The state captured by each provider."""
+    random_state: Any
+    """The state of the python random number generator."""
+    np_random_state: Any
+    """The state of the numpy random number generator."""
+
+
 class SMARTS:
     """The core SMARTS simulator. This is the direct interface to all parts of the simulation.
     Args:
@@ -89,7 +106,10 @@ class SMARTS:
         fixed_timestep_sec: The fixed timestep that will be default if time is not otherwise specified at step.
         reset_agents_only: When specified the simulation will continue use of the current scenario.
         zoo_addrs: The (ip:port) values of remote agent workers for externally hosted agents.
+        zoo_agents_per_worker: The number of social agents each remote agent worker hosts. Above 1, social agents running the same policy are co-located and act in batches.
         external_provider: Creates a special provider `SMARTS.external_provider` that allows for inserting state.
+        kinematic: When specified only vehicles controlled with a dynamic action space are physically simulated. Other vehicles have no physics body and collisions are found geometrically between their oriented bounding boxes. Lidar rays are cast against physics bodies, so lidar does not detect vehicles without one.
+        cross_check_collisions: When specified, and not kinematic, the collisions found by the physics engine are compared every step to the geometric collisions between oriented bounding boxes and any disagreement is logged.
         config: The simulation configuration file for unexposed configuration.
     """
 
@@ -103,6 +123,9 @@ class SMARTS:
         reset_agents_only: bool = False,
         zoo_addrs: Optional[Tuple[str, int]] = None,
         external_provider: bool = False,
+        zoo_agents_per_worker: int = 1,
+        kinematic: bool = False,
+        cross_check_collisions: bool = False,
     ):
         self._log = logging.getLogger(self.__class__.__name__)
         self._sim_id = Id.new("smarts")
@@ -154,6 +177,15 @@ class SMARTS:
         # We buffer provider state between steps to compensate for TRACI's timestep delay
         self._last_provider_state = None
         self._reset_agents_only = reset_agents_only  # a.k.a "teleportation"
+        self._kinematic = kinematic
+        self._cross_check_collisions = cross_check_collisions
+        if kinematic and any(
+            interface.lidar for interface in agent_interfaces.values()
+        ):
+            self._log.warning(
+                "Lidar does not detect vehicles without a physics body. In kinematic "
+                "mode, only vehicles controlled with a dynamic action space are seen."
+            )
         self._imitation_learning_mode = False
 
         # For macOS GUI. See our `BulletClient` docstring for details.
@@ -171,7 +203,9 @@ class SMARTS:
         }
 
         # Set up indices
-        self._agent_manager = AgentManager(agent_interfaces, zoo_addrs)
+        self._agent_manager = AgentManager(
+            agent_interfaces, zoo_addrs, zoo_agents_per_worker
+        )
         self._vehicle_index = VehicleIndex()
 
         # TODO: Should not be stored in SMARTS
@@ -410,6 +444,9 @@ class SMARTS:
             self.teardown()
             self.setup(scenario)
 
+        return self._start_episode(scenario)
+
+    def _start_episode(self, scenario: Scenario):
         # Tell history provide to ignore vehicles if we have assigned mission to them
         self._traffic_history_provider.set_replaced_ids(
             m.vehicle_spec.veh_id
@@ -459,6 +496,79 @@ class SMARTS:
 
         self._is_setup = True
 
+    def snapshot(self) -> SimulationSnapshot:
+        """Capture the state of the simulation so that later episodes of the current
+        scenario can start from it with `restore()`. Take the snapshot right after
+        `setup()` to restore the start of the scenario.
+        """
+        if not self._is_setup:
+            raise SMARTSNotSetupError("Must call reset() or setup() before snapshot().")
+        self._check_valid()
+        return SimulationSnapshot(
+            scenario=self._scenario,
+            provider_snapshots={
+                provider: provider.snapshot() for provider in self.providers
+            },
+            random_state=random.getstate(),
+            np_random_state=np.random.get_state(),
+        )
+
+    def restore(self, snapshot: SimulationSnapshot) -> Dict[str, Observation]:
+        """Reset the simulation to a snapshot of the current scenario without tearing
+        the scenario down and setting it up again. Agents start again through their
+        missions and, as with `reset()`, the simulation is progressed up to the first
+        time an agent returns an observation.
+        Args:
+            snapshot:
+                A snapshot taken with `snapshot()` in the current scenario.
+        Returns:
+            Agent observations, as returned by `reset()`.
+        """
+        if not self._is_setup:
+            raise SMARTSNotSetupError("Must call reset() or setup() before restore().")
+        self._check_valid()
+        if snapshot.scenario is not self._scenario:
+            raise ValueError(
+                "Can only restore a snapshot of the current scenario, use reset() to "
+                "change the scenario."
+            )
+
+        self._resetting = True
+        try:
+            self._restore(snapshot)
+            return self._start_episode(self._scenario)
+        finally:
+            self._resetting = False
+
+    def _restore(self, snapshot: SimulationSnapshot):
+        # Vehicles are rebuilt from the restored provider states instead of restoring
+        # the bullet world, which only holds the ground plane once they are removed.
+        self._agent_manager.teardown()
+        self._teardown_vehicles(self._vehicle_index.vehicle_ids())
+
+        random.setstate(snapshot.random_state)
+        np.random.set_state(snapshot.np_random_state)
+
+        scenario = self._scenario
+        self._bubble_manager.teardown()
+        self._bubble_manager = BubbleManager(scenario.bubbles, scenario.road_map)
+        self._trap_manager.init_traps(scenario.road_map, scenario.missions)
+
+        provider_state = ProviderState()
+        for provider in self.providers:
+            try:
+                new_provider_state = provider.restore(
+                    scenario, snapshot.provider_snapshots.get(provider)
+                )
+            except Exception as provider_error:
+                new_provider_state = self._handle_provider(provider, provider_error)
+            provider_state.merge(new_provider_state)
+
+        self._agent_manager.setup_agents(self)
+
+        self._harmonize_providers(provider_state)
+        self._last_provider_state = provider_state
+
     def add_provider(
         self,
         provider: Provider,
@@ -775,6 +885,11 @@ class SMARTS:
         """The stiffness of the road."""
         return self._bullet_client.getDynamicsInfo(self._ground_bullet_id, -1)[9]
 
+    @property
+    def kinematic(self) -> bool:
+        """If only vehicles that use dynamics are physically simulated."""
+        return self._kinematic
+
     @property
     def dynamic_action_spaces(self) -> Set[ActionSpaceType]:
         """The set of vehicle action spaces that use dynamics."""
@@ -866,7 +981,7 @@ class SMARTS:
         self.teardown_agents_without_vehicles(shadow_and_controlling_agents)
 
     def _pybullet_provider_sync(self, provider_state: ProviderState):
-        current_vehicle_ids = {v.vehicle_id for v in provider_state.vehicles}
+        current_vehicle_ids = provider_state.vehicle_ids
         previous_sv_ids = self._vehicle_index.social_vehicle_ids()
         exited_vehicles = previous_sv_ids - current_vehicle_ids
         self._teardown_vehicles_and_agents(exited_vehicles)
@@ -874,53 +989,95 @@ class SMARTS:
         # Update our pybullet world given this provider state
         dt = provider_state.dt or self._last_dt
         agent_vehicle_ids = self._vehicle_index.agent_vehicle_ids()
-        for vehicle in provider_state.vehicles:
-            vehicle_id = vehicle.vehicle_id
-            # either this is a pybullet agent vehicle, or it is a social vehicle
-            if vehicle_id in agent_vehicle_ids:
-                if not vehicle.updated:
-                    # this is an agent vehicle
-                    agent_id = self._vehicle_index.actor_id_from_vehicle_id(vehicle_id)
-                    agent_interface = self._agent_manager.agent_interface_for_agent_id(
-                        agent_id
+        for vehicle in provider_state.individual_vehicles:
+            self._sync_vehicle_state(vehicle, agent_vehicle_ids, dt)
+
+        # Bulk vehicle states are only unpacked for vehicles that need a new avatar
+        # or are agent vehicles; existing social vehicles are updated from the columns
+        # with their poses built in bulk.
+        social_vehicle_ids = self._vehicle_index.social_vehicle_ids()
+        for columns in provider_state.columns:
+            bulk_indices = []
+            for index, vehicle_id in enumerate(columns.vehicle_ids):
+                if vehicle_id in agent_vehicle_ids or (
+                    vehicle_id not in social_vehicle_ids
+                ):
+                    self._sync_vehicle_state(
+                        columns.vehicle_state(index), agent_vehicle_ids, dt
                     )
-                    agent_action_space = agent_interface.action_space
-                    if agent_action_space not in self._dynamic_action_spaces:
-                        # This is not a pybullet agent, but it has an avatar in this world
-                        # to make it's observations. Update the avatar to match the new
-                        # state of this vehicle
-                        # XXX: this needs to be disentangled from pybullet.
-                        pybullet_vehicle = self._vehicle_index.vehicle_by_id(vehicle_id)
-                        assert isinstance(pybullet_vehicle.chassis, BoxChassis)
-                        pybullet_vehicle.update_state(vehicle, dt=dt)
-            else:
-                # This vehicle is a social vehicle
-                if vehicle_id in self._vehicle_index.social_vehicle_ids():
-                    social_vehicle = self._vehicle_index.vehicle_by_id(vehicle_id)
                 else:
-                    # It is a new social vehicle we have not seen yet.
-                    # Create it's avatar.
-                    # XXX: this needs to be disentangled from pybullet.
-                    # XXX: (adding social vehicles to the vehicle index should not require pybullet to be present)
-                    social_vehicle = self._vehicle_index.build_social_vehicle(
-                        sim=self,
-                        vehicle_state=vehicle,
-                        actor_id=vehicle_id,
-                        vehicle_id=vehicle_id,
-                        vehicle_config_type=vehicle.vehicle_config_type,
-                    )
+                    bulk_indices.append(index)
+            if not bulk_indices:
+                continue
 
-                # Update social vehicle pose when no active agents are present
+            speeds = columns.speeds[bulk_indices].tolist()
+            poses = columns.poses(bulk_indices)
+            for index, pose, speed in zip(bulk_indices, poses, speeds):
+                social_vehicle = self._vehicle_index.vehicle_by_id(
+                    columns.vehicle_ids[index]
+                )
                 if not agent_vehicle_ids:
-                    social_vehicle.chassis.state_override(
-                        dt=dt, force_pose=vehicle.pose
-                    )
+                    social_vehicle.chassis.state_override(dt=dt, force_pose=pose)
+                if not columns.updated[index]:
+                    columns.mark_updated(index)
+                    social_vehicle.control(pose=pose, speed=speed, dt=dt)
 
-                if not vehicle.updated:
-                    # Note: update_state() happens *after* pybullet has been stepped.
-                    social_vehicle.update_state(vehicle, dt=dt)
+    def _sync_vehicle_state(
+        self, vehicle: VehicleState, agent_vehicle_ids: Set[str], dt: float
+    ):
+        vehicle_id = vehicle.vehicle_id
+        # either this is a pybullet agent vehicle, or it is a social vehicle
+        if vehicle_id in agent_vehicle_ids:
+            if not vehicle.updated:
+                # this is an agent vehicle
+                agent_id = self._vehicle_index.actor_id_from_vehicle_id(vehicle_id)
+                agent_interface = self._agent_manager.agent_interface_for_agent_id(
+                    agent_id
+                )
+                agent_action_space = agent_interface.action_space
+                if agent_action_space not in self._dynamic_action_spaces:
+                    # This is not a pybullet agent, but it has an avatar in this world
+                    # to make it's observations. Update the avatar to match the new
+                    # state of this vehicle
+                    # XXX: this needs to be disentangled from pybullet.
+                    pybullet_vehicle = self._vehicle_index.vehicle_by_id(vehicle_id)
+                    assert isinstance(pybullet_vehicle.chassis, BoxChassis)
+                    pybullet_vehicle.update_state(vehicle, dt=dt)
+        else:
+            # This vehicle is a social vehicle
+            if vehicle_id in self._vehicle_index.social_vehicle_ids():
+                social_vehicle = self._vehicle_index.vehicle_by_id(vehicle_id)
+            else:
+                # It is a new social vehicle we have not seen yet.
+                # Create it's avatar.
+                # XXX: this needs to be disentangled from pybullet.
+                # XXX: (adding social vehicles to the vehicle index should not require pybullet to be present)
+                social_vehicle = self._vehicle_index.build_social_vehicle(
+                    sim=self,
+                    vehicle_state=vehicle,
+                    actor_id=vehicle_id,
+                    vehicle_id=vehicle_id,
+                    vehicle_config_type=vehicle.vehicle_config_type,
+                )
+
+            # Update social vehicle pose when no active agents are present
+            if not agent_vehicle_ids:
+                social_vehicle.chassis.state_override(dt=dt, force_pose=vehicle.pose)
+
+            if not vehicle.updated:
+                # Note: update_state() happens *after* pybullet has been stepped.
+                social_vehicle.update_state(vehicle, dt=dt)
 
     def _step_pybullet(self):
+        if self._kinematic and not any(
+            isinstance(vehicle.chassis, AckermannChassis)
+            for vehicle in self._vehicle_index.vehicles
+        ):
+            # Nothing but the ground plane is physically simulated.
+            for vehicle in self._vehicle_index.vehicles:
+                vehicle.step(self._elapsed_sim_time)
+            return
+
         self._bullet_client.stepSimulation()
         pybullet_substeps = max(1, round(self._last_dt / self._pybullet_period)) - 1
         for _ in range(pybullet_substeps):
@@ -1231,6 +1388,7 @@ class SMARTS:
             self._vehicle_collisions.pop(vehicle_id, None)
 
     def _perform_agent_actions(self, agent_actions):
+        vehicle_actions = []
         for agent_id, action in agent_actions.items():
             agent_vehicles = self._vehicle_index.vehicles_by_actor_id(agent_id)
             if len(agent_vehicles) == 0:
@@ -1250,18 +1408,20 @@ class SMARTS:
                 sensor_state = self._vehicle_index.sensor_state_for_vehicle_id(
                     vehicle.id
                 )
-                # TODO: Support performing batched actions
-                Controllers.perform_action(
-                    self,
-                    agent_id,
-                    vehicle,
-                    vehicle_action,
-                    controller_state,
-                    sensor_state,
-                    agent_interface.action_space,
-                    agent_interface.vehicle_type,
+                vehicle_actions.append(
+                    (
+                        agent_id,
+                        vehicle,
+                        vehicle_action,
+                        controller_state,
+                        sensor_state,
+                        agent_interface.action_space,
+                        agent_interface.vehicle_type,
+                    )
                 )
 
+        Controllers.perform_actions(self, vehicle_actions)
+
     def _sync_vehicles_to_renderer(self):
         assert self._renderer
         for vehicle in self._vehicle_index.vehicles:
@@ -1270,7 +1430,27 @@ class SMARTS:
     def _process_collisions(self):
         self._vehicle_collisions = defaultdict(list)  # list of `Collision` instances
 
-        for vehicle_id in self._vehicle_index.agent_vehicle_ids():
+        agent_vehicle_ids = self._vehicle_index.agent_vehicle_ids()
+        if self._kinematic:
+            collidees_by_vehicle_id = self._box_collisions(agent_vehicle_ids)
+        else:
+            collidees_by_vehicle_id = self._bullet_collisions(agent_vehicle_ids)
+            if self._cross_check_collisions:
+                self._cross_check_box_collisions(
+                    collidees_by_vehicle_id, self._box_collisions(agent_vehicle_ids)
+                )
+
+        for vehicle_id, collidees in collidees_by_vehicle_id.items():
+            for collidee in collidees:
+                actor_id = self._vehicle_index.actor_id_from_vehicle_id(collidee.id)
+                # TODO: Should we specify the collidee as the vehicle ID instead of
+                #       the agent/social ID?
+                collision = Collision(collidee_id=actor_id)
+                self._vehicle_collisions[vehicle_id].append(collision)
+
+    def _bullet_collisions(self, vehicle_ids) -> Dict[str, List[Vehicle]]:
+        collidees_by_vehicle_id = {}
+        for vehicle_id in vehicle_ids:
             vehicle = self._vehicle_index.vehicle_by_id(vehicle_id)
             # We are only concerned with vehicle-vehicle collisions
             collidee_bullet_ids = set(
@@ -1282,13 +1462,50 @@ class SMARTS:
             if not collidee_bullet_ids:
                 continue
 
-            for bullet_id in collidee_bullet_ids:
-                collidee = self._bullet_id_to_vehicle(bullet_id)
-                actor_id = self._vehicle_index.actor_id_from_vehicle_id(collidee.id)
-                # TODO: Should we specify the collidee as the vehicle ID instead of
-                #       the agent/social ID?
-                collision = Collision(collidee_id=actor_id)
-                self._vehicle_collisions[vehicle_id].append(collision)
+            collidees_by_vehicle_id[vehicle_id] = [
+                self._bullet_id_to_vehicle(bullet_id)
+                for bullet_id in collidee_bullet_ids
+            ]
+        return collidees_by_vehicle_id
+
+    def _box_collisions(self, vehicle_ids) -> Dict[str, List[Vehicle]]:
+        if not vehicle_ids:
+            return {}
+
+        vehicles = list(self._vehicle_index.vehicles)
+        index_by_id = {vehicle.id: index for index, vehicle in enumerate(vehicles)}
+        poses = [vehicle.chassis.pose for vehicle in vehicles]
+        pairs = collisions_with(
+            [index_by_id[vehicle_id] for vehicle_id in vehicle_ids],
+            centers=[pose.position[:2] for pose in poses],
+            headings=[float(pose.heading) for pose in poses],
+            dimensions=[vehicle.chassis.dimensions.as_lwh[:2] for vehicle in vehicles],
+            # The same leeway as the bullet contact point query
+            margin=0.05,
+        )
+
+        collidees_by_vehicle_id = defaultdict(list)
+        for index, other in pairs.tolist():
+            collidees_by_vehicle_id[vehicles[index].id].append(vehicles[other])
+        return collidees_by_vehicle_id
+
+    def _cross_check_box_collisions(
+        self,
+        bullet_collidees: Dict[str, List[Vehicle]],
+        box_collidees: Dict[str, List[Vehicle]],
+    ):
+        for vehicle_id in set(bullet_collidees) | set(box_collidees):
+            bullet_ids = {v.id for v in bullet_collidees.get(vehicle_id, [])}
+            box_ids = {v.id for v in box_collidees.get(vehicle_id, [])}
+            if bullet_ids != box_ids:
+                self._log.warning(
+                    "Collisions of vehicle=%s at time=%s disagree, "
+                    "only found by physics=%s, only found by boxes=%s",
+                    vehicle_id,
+                    self._elapsed_sim_time,
+                    sorted(bullet_ids - box_ids),
+                    sorted(box_ids - bullet_ids),
+                )
 
     def _bullet_id_to_vehicle(self, bullet_id):
         for vehicle in self._vehicle_index.vehicles:
@@ -1335,13 +1552,20 @@ class SMARTS:
         if not self._envision:
             return
 
+        frame_time = self._rounder(self._elapsed_sim_time + self._total_sim_time)
+        if not self._envision.should_emit(frame_time):
+            return
+        detail = self._envision.detail
+
         traffic = {}
         position = {}
         speed = {}
         heading = {}
         lane_ids = {}
         agent_vehicle_ids = self._vehicle_index.agent_vehicle_ids()
-        for v in provider_state.vehicles:
+        social_vehicle_ids = self._vehicle_index.social_vehicle_ids()
+
+        def add_vehicle(v: VehicleState):
             if v.vehicle_id in agent_vehicle_ids:
                 # this is an agent controlled vehicle
                 agent_id = self._vehicle_index.actor_id_from_vehicle_id(v.vehicle_id)
@@ -1360,21 +1584,30 @@ class SMARTS:
                     actor_type = envision_types.TrafficActorType.SocialAgent
                     mission_route_geometry = None
 
-                point_cloud = vehicle_obs.lidar_point_cloud or ([], [], [])
-                point_cloud = point_cloud[0]  # (points, hits, rays), just want points
-
-                # TODO: driven path should be read from vehicle_obs
-                driven_path = self._vehicle_index.vehicle_by_id(
-                    v.vehicle_id
-                ).driven_path_sensor()
-
-                road_waypoints = []
-                if vehicle_obs.road_waypoints:
-                    road_waypoints = [
-                        path
-                        for paths in vehicle_obs.road_waypoints.lanes.values()
-                        for path in paths
+                point_cloud = []
+                if detail.point_clouds and vehicle_obs.lidar_point_cloud:
+                    # (points, hits, rays), just want points
+                    point_cloud = vehicle_obs.lidar_point_cloud[0]
+
+                driven_path = []
+                if detail.driven_path_stride:
+                    # TODO: driven path should be read from vehicle_obs
+                    driven_path = self._vehicle_index.vehicle_by_id(
+                        v.vehicle_id
+                    ).driven_path_sensor()[:: detail.driven_path_stride]
+
+                waypoint_paths = []
+                if detail.waypoint_stride:
+                    waypoint_paths = [
+                        path[:: detail.waypoint_stride]
+                        for path in vehicle_obs.waypoint_paths or []
                     ]
+                    if vehicle_obs.road_waypoints:
+                        waypoint_paths += [
+                            path[:: detail.waypoint_stride]
+                            for paths in vehicle_obs.road_waypoints.lanes.values()
+                            for path in paths
+                        ]
                 traffic[v.vehicle_id] = envision_types.TrafficActorState(
                     name=self._agent_manager.agent_name(agent_id),
                     actor_type=actor_type,
@@ -1388,7 +1621,7 @@ class SMARTS:
                         is_multi=is_boid_agent,
                     ),
                     events=vehicle_obs.events,
-                    waypoint_paths=(vehicle_obs.waypoint_paths or []) + road_waypoints,
+                    waypoint_paths=waypoint_paths,
                     point_cloud=point_cloud,
                     driven_path=driven_path,
                     mission_route_geometry=mission_route_geometry,
@@ -1401,7 +1634,7 @@ class SMARTS:
                     and len(vehicle_obs.waypoint_paths[0]) > 0
                 ):
                     lane_ids[agent_id] = vehicle_obs.waypoint_paths[0][0].lane_id
-            elif v.vehicle_id in self._vehicle_index.social_vehicle_ids():
+            elif v.vehicle_id in social_vehicle_ids:
                 # this is a social vehicle
                 veh_type = (
                     v.vehicle_config_type if v.vehicle_config_type else v.vehicle_type
@@ -1414,6 +1647,27 @@ class SMARTS:
                     speed=v.speed,
                 )
 
+        for v in provider_state.individual_vehicles:
+            add_vehicle(v)
+
+        for columns in provider_state.columns:
+            for index, vehicle_id in enumerate(columns.vehicle_ids):
+                if vehicle_id in agent_vehicle_ids:
+                    add_vehicle(columns.vehicle_state(index))
+                elif vehicle_id in social_vehicle_ids:
+                    # this is a social vehicle, read directly from the columns
+                    traffic[vehicle_id] = envision_types.TrafficActorState(
+                        actor_type=envision_types.TrafficActorType.SocialVehicle,
+                        vehicle_type=(
+                            columns.vehicle_config_types[index]
+                            if columns.vehicle_config_types[index]
+                            else columns.vehicle_types[index]
+                        ),
+                        position=tuple(columns.positions[index]),
+                        heading=float(columns.headings[index]),
+                        speed=float(columns.speeds[index]),
+                    )
+
         bubble_geometry = [
             list(bubble.geometry.exterior.coords)
             for bubble in self._bubble_manager.bubbles
@@ -1437,7 +1691,7 @@ class SMARTS:
             speed=speed,
             heading=heading,
             lane_ids=lane_ids,
-            frame_time=self._rounder(self._elapsed_sim_time + self._total_sim_time),
+            frame_time=frame_time,
         )
         self._envision.send(state)
 
@@ -25,9 +25,12 @@ from subprocess import check_output
 from typing import List, Optional, Sequence, Set, Tuple
 
 import numpy as np
+import shapely
 import trimesh
 import trimesh.scene
 from cached_property import cached_property
+from scipy.spatial import KDTree
+from shapely.geometry import LineString
 from shapely.geometry import Point as shPoint
 from shapely.geometry import Polygon
 from shapely.ops import nearest_points, snap
@@ -38,7 +41,12 @@ from smarts.sstudio.types import MapSpec
 from .coordinates import BoundingBox, Heading, Point, Pose, RefLinePoint
 from .lanepoints import LanePoints, LinkedLanePoint
 from .road_map import RoadMap, Waypoint
-from .utils.geometry import buffered_shape, generate_mesh_from_polygons
+from .utils.geometry import (
+    HAS_VECTORIZED_SHAPELY,
+    buffered_shape,
+    buffered_shapes,
+    generate_mesh_from_polygons,
+)
 from .utils.math import inplace_unwrap, radians_to_vec, vec_2d
 
 from smarts.core.utils.sumo import sumolib  # isort:skip
@@ -115,7 +123,6 @@ class SumoRoadNetwork(RoadMap):
         return os.path.join(net_file_folder, cls.shifted_net_file_name)
 
     @classmethod
-    @lru_cache(maxsize=1)
     def _shift_coordinates(cls, net_file_path, shifted_path):
         assert shifted_path != net_file_path
         logger = logging.getLogger(cls.__name__)
@@ -985,21 +992,28 @@ class SumoRoadNetwork(RoadMap):
 
     def _compute_road_polygons(self):
         lane_to_poly = {}
-        for edge in self._graph.getEdges():
-            for lane in edge.getLanes():
-                shape = buffered_shape(lane.getShape(), lane.getWidth())
-                # Check if "shape" is just a point.
-                if len(set(shape.exterior.coords)) == 1:
-                    logging.debug(
-                        f"Lane:{lane.getID()} has provided non-shape values {lane.getShape()}"
-                    )
-                    continue
+        lanes = [lane for edge in self._graph.getEdges() for lane in edge.getLanes()]
+        shapes = buffered_shapes(
+            [lane.getShape() for lane in lanes], [lane.getWidth() for lane in lanes]
+        )
+        for lane, shape in zip(lanes, shapes):
+            # Check if "shape" is just a point.
+            if len(set(shape.exterior.coords)) == 1:
+                logging.debug(
+                    f"Lane:{lane.getID()} has provided non-shape values {lane.getShape()}"
+                )
+                continue
 
-                lane_to_poly[lane.getID()] = shape
+            lane_to_poly[lane.getID()] = shape
 
         # Remove holes created at tight junctions due to crude map geometry
-        self._snap_internal_holes(lane_to_poly)
-        self._snap_external_holes(lane_to_poly)
+        if HAS_VECTORIZED_SHAPELY:
+            snap_candidates = self._snap_candidates_finder()
+            self._snap_internal_holes(lane_to_poly, snap_candidates=snap_candidates)
+            self._snap_external_holes(lane_to_poly, snap_candidates=snap_candidates)
+        else:
+            self._snap_internal_holes(lane_to_poly)
+            self._snap_external_holes(lane_to_poly)
 
         # Remove break in visible lane connections created when lane enters an intersection
         self._snap_internal_edges(lane_to_poly)
@@ -1042,47 +1056,22 @@ class SumoRoadNetwork(RoadMap):
                 lane_shape = Polygon(snap(lane_shape, outgoing_shape, snap_threshold))
                 lane_to_poly[lane_id] = lane_shape
 
-    def _snap_internal_holes(self, lane_to_poly, snap_threshold=2):
+    def _snap_internal_holes(
+        self, lane_to_poly, snap_threshold=2, snap_candidates=None
+    ):
         for lane_id in lane_to_poly:
             lane = self._graph.getLane(lane_id)
 
             # Only do snapping for internal edge lane holes
             if not lane.getEdge().isSpecial():
                 continue
-            lane_shape = lane_to_poly[lane_id]
-            new_coords = []
-            last_added = None
-            for x, y in lane_shape.exterior.coords:
-                p = shPoint(x, y)
-                snapped_to = set()
-                moved = True
-                thresh = snap_threshold
-                while moved:
-                    moved = False
-                    for nl, dist in self.nearest_lanes(
-                        Point(p.x, p.y),
-                        include_junctions=False,
-                    ):
-                        if not nl or nl.lane_id == lane_id or nl in snapped_to:
-                            continue
-                        nl_shape = lane_to_poly.get(nl.lane_id)
-                        if nl_shape:
-                            _, np = nearest_points(p, nl_shape)
-                            if p.distance(np) < thresh:
-                                p = np  # !!!! :)
-                                # allow vertices to snap to more than one thing, but
-                                # try to avoid infinite loops and making things worse instead of better here...
-                                # (so reduce snap dist threshold by an arbitrary amount each pass.)
-                                moved = True
-                                snapped_to.add(nl)
-                                thresh *= 0.75
-                if p != last_added:
-                    new_coords.append(p)
-                    last_added = p
-            if new_coords:
-                lane_to_poly[lane_id] = Polygon(new_coords)
-
-    def _snap_external_holes(self, lane_to_poly, snap_threshold=2):
+            self._snap_lane_vertices(
+                lane_id, lane_to_poly, snap_threshold, snap_candidates
+            )
+
+    def _snap_external_holes(
+        self, lane_to_poly, snap_threshold=2, snap_candidates=None
+    ):
         for lane_id in lane_to_poly:
             lane = self._graph.getLane(lane_id)
 
@@ -1100,43 +1089,105 @@ class SumoRoadNetwork(RoadMap):
                 if outgoing_lane.getEdge().isSpecial():
                     continue
 
-            lane_shape = lane_to_poly[lane_id]
-            new_coords = []
-            last_added = None
-            for x, y in lane_shape.exterior.coords:
-                p = shPoint(x, y)
-                snapped_to = set()
-                moved = True
-                thresh = snap_threshold
-                while moved:
-                    moved = False
-                    for nl, dist in self.nearest_lanes(
-                        Point(p.x, p.y),
-                        include_junctions=False,
-                    ):
-                        if (
-                            not nl
-                            or nl.in_junction
-                            or nl.lane_id == lane_id
-                            or nl in snapped_to
-                        ):
-                            continue
-                        nl_shape = lane_to_poly.get(nl.lane_id)
-                        if nl_shape:
-                            _, np = nearest_points(p, nl_shape)
-                            if p.distance(np) < thresh:
-                                p = np  # !!!! :)
-                                # allow vertices to snap to more than one thing, but
-                                # try to avoid infinite loops and making things worse instead of better here...
-                                # (so reduce snap dist threshold by an arbitrary amount each pass.)
-                                moved = True
-                                snapped_to.add(nl)
-                                thresh *= 0.75
-                if p != last_added:
-                    new_coords.append(p)
-                    last_added = p
-            if new_coords:
-                lane_to_poly[lane_id] = Polygon(new_coords)
+            self._snap_lane_vertices(
+                lane_id, lane_to_poly, snap_threshold, snap_candidates
+            )
+
+    def _snap_candidates_finder(self):
+        """Returns a function which finds, for an array of points, the ids of the
+        lanes that `nearest_lanes(point, include_junctions=False)` may return, using
+        vectorized queries of a spatial index."""
+        # Pad the radius slightly so floating point differences can only add lanes.
+        radius = max(10, 2 * self._default_lane_width) + 1e-6
+        lanes = [
+            lane
+            for edge in self._graph.getEdges()
+            if not edge.isSpecial()
+            for lane in edge.getLanes()
+        ]
+        lane_ids = [lane.getID() for lane in lanes]
+        # Same geometry as used for distances by `getNeighboringLanes()`
+        lines = np.empty(len(lanes), dtype=object)
+        for i, lane in enumerate(lanes):
+            shape = lane.getShape(True)
+            lines[i] = LineString(shape) if len(shape) > 1 else shPoint(shape[0])
+        tree = shapely.STRtree(lines)
+
+        def find(points):
+            candidates = [[] for _ in range(len(points))]
+            if not candidates:
+                return candidates
+            point_index, line_index = tree.query(
+                shapely.points(np.asarray(points, dtype=float)),
+                predicate="dwithin",
+                distance=radius,
+            )
+            for i, j in zip(point_index, line_index):
+                candidates[i].append(lane_ids[j])
+            return candidates
+
+        return find
+
+    def _snap_lane_vertices(
+        self, lane_id, lane_to_poly, snap_threshold, snap_candidates=None
+    ):
+        lane_shape = lane_to_poly[lane_id]
+        coords = list(lane_shape.exterior.coords)
+
+        if snap_candidates is None:
+            needs_snapping = [True] * len(coords)
+        else:
+            # A vertex can only move if it starts within the threshold of one of its
+            # neighbouring lanes, find those with bulk queries and skip the others.
+            pairs = [
+                (i, lane_to_poly[nl_id])
+                for i, nl_ids in enumerate(snap_candidates(coords))
+                for nl_id in nl_ids
+                if nl_id != lane_id and nl_id in lane_to_poly
+            ]
+            needs_snapping = np.zeros(len(coords), dtype=bool)
+            if pairs:
+                indices, nl_shapes = zip(*pairs)
+                nl_shapes_array = np.empty(len(nl_shapes), dtype=object)
+                nl_shapes_array[:] = nl_shapes
+                distances = shapely.distance(
+                    shapely.points(np.asarray(coords)[list(indices)]), nl_shapes_array
+                )
+                needs_snapping[np.asarray(indices)[distances < snap_threshold]] = True
+
+        new_coords = []
+        last_added = None
+        for (x, y), needs_snap in zip(coords, needs_snapping):
+            p = shPoint(x, y)
+            snapped_to = set()
+            moved = needs_snap
+            thresh = snap_threshold
+            while moved:
+                moved = False
+                for nl, dist in self.nearest_lanes(
+                    Point(p.x, p.y), include_junctions=False
+                ):
+                    if not nl:
+                        continue
+                    nl_id = nl.lane_id
+                    if nl_id == lane_id or nl_id in snapped_to:
+                        continue
+                    nl_shape = lane_to_poly.get(nl_id)
+                    if nl_shape:
+                        _, np_ = nearest_points(p, nl_shape)
+                        if p.distance(np_) < thresh:
+                            p = np_  # !!!! :)
+                            # allow vertices to snap to more than one thing, but
+                            # try to avoid infinite loops and making things worse instead of better here...
+                            # (so reduce snap dist threshold by an arbitrary amount each pass.)
+                            moved = True
+                            snapped_to.add(nl_id)
+                            thresh *= 0.75
+            if p != last_added:
+                new_coords.append(p)
+                last_added = p
+        if new_coords:
+            lane_to_poly[lane_id] = Polygon(new_coords)
 
     def _make_glb_from_polys(self, polygons):
         scene = trimesh.Scene()
@@ -1188,8 +1239,16 @@ class SumoRoadNetwork(RoadMap):
                     lane_dividers.append(left_side)
 
         # The edge borders that overlapped in positions form an edge divider
+        if not edge_borders:
+            return lane_dividers, edge_dividers
+        # Only borders starting near where another one ends can overlap it, find
+        # those pairs with a spatial index instead of comparing all pairs.
+        border_ends = KDTree(np.array([border[-1] for border in edge_borders]))
+        candidates = border_ends.query_ball_point(
+            np.array([border[0] for border in edge_borders]), r=threshold
+        )
         for i in range(len(edge_borders) - 1):
-            for j in range(i + 1, len(edge_borders)):
+            for j in sorted(j for j in candidates[i] if j > i):
                 edge_border_i = np.array(
                     [edge_borders[i][0], edge_borders[i][-1]]
                 )  # start and end position
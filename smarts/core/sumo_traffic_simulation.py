@@ -19,11 +19,15 @@
 # THE SOFTWARE.
 
 import logging
+import math
 import os
 import random
 import subprocess
+import tempfile
 import time
-from typing import List, Optional, Sequence, Tuple
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Sequence, Tuple
 
 import numpy as np
 from shapely.affinity import rotate as shapely_rotate
@@ -32,18 +36,33 @@ from shapely.geometry import box as shapely_box
 
 from smarts.core import gen_id
 from smarts.core.colors import SceneColors
-from smarts.core.coordinates import Dimensions, Heading, Pose
-from smarts.core.provider import Provider, ProviderRecoveryFlags, ProviderState
+from smarts.core.coordinates import Dimensions, Heading
+from smarts.core.provider import (
+    Provider,
+    ProviderRecoveryFlags,
+    ProviderState,
+    VehicleStateColumns,
+)
 from smarts.core.sumo_road_network import SumoRoadNetwork
 from smarts.core.utils import networking
 from smarts.core.utils.logging import suppress_output
-from smarts.core.vehicle import VEHICLE_CONFIGS, VehicleState
+from smarts.core.vehicle import VEHICLE_CONFIGS
 
 from smarts.core.utils.sumo import SUMO_PATH, traci  # isort:skip
 from traci.exceptions import FatalTraCIError, TraCIException  # isort:skip
 import traci.constants as tc  # isort:skip
 
 
+@dataclass(frozen=True)
+class _SumoSnapshot:
+    scenario: Any
+    state: bytes  # the SUMO state file contents
+    cumulative_sim_seconds: float
+    non_sumo_vehicle_ids: FrozenSet[str]
+    num_dynamic_ids_used: int
+    to_be_teleported: Dict[str, Dict[str, Any]]
+
+
 class SumoTrafficSimulation(Provider):
     """
     Args:
@@ -239,6 +258,7 @@ class SumoTrafficSimulation(Provider):
             "--no-step-log",
             "--no-warnings=1",
             "--seed=%s" % random.randint(0, 2147483648),
+            "--save-state.rng",  # restore the traffic randomness with `restore()`
             "--time-to-teleport=%s" % -1,
             "--collision.check-junctions=true",
             "--collision.action=none",
@@ -367,6 +387,73 @@ class SumoTrafficSimulation(Provider):
         self._to_be_teleported = dict()
         self._reserved_areas = dict()
 
+    def snapshot(self) -> Optional[_SumoSnapshot]:
+        """Save the SUMO state, including its random number generators."""
+        if not self._is_setup or not self.connected:
+            return None
+
+        fd, path = tempfile.mkstemp(suffix=".xml")
+        os.close(fd)
+        try:
+            self._traci_conn.simulation.saveState(path)
+            with open(path, "rb") as state_file:
+                state = state_file.read()
+        finally:
+            os.remove(path)
+
+        return _SumoSnapshot(
+            scenario=self._scenario,
+            state=state,
+            cumulative_sim_seconds=self._cumulative_sim_seconds,
+            non_sumo_vehicle_ids=frozenset(self._non_sumo_vehicle_ids),
+            num_dynamic_ids_used=self._num_dynamic_ids_used,
+            to_be_teleported=deepcopy(self._to_be_teleported),
+        )
+
+    def restore(self, scenario, snapshot: Optional[_SumoSnapshot]) -> ProviderState:
+        """Load a SUMO state saved with `snapshot()` without restarting or reloading
+        SUMO. Vehicles that did not belong to SUMO are removed, SMARTS recreates them.
+        """
+        if (
+            snapshot is None
+            or snapshot.scenario is not scenario
+            or scenario is not self._scenario
+            or not self._is_setup
+            or not self.connected
+        ):
+            return super().restore(scenario, snapshot)
+
+        fd, path = tempfile.mkstemp(suffix=".xml")
+        try:
+            with os.fdopen(fd, "wb") as state_file:
+                state_file.write(snapshot.state)
+            self._traci_conn.simulation.loadState(path)
+        finally:
+            os.remove(path)
+
+        self._cumulative_sim_seconds = snapshot.cumulative_sim_seconds
+        self._non_sumo_vehicle_ids = set()
+        self._num_dynamic_ids_used = snapshot.num_dynamic_ids_used
+        self._to_be_teleported = deepcopy(snapshot.to_be_teleported)
+        self._reserved_areas = dict()
+
+        # Subscriptions survive loading the state but the cached results do not
+        # match it until the next step, so we subscribe again to read them.
+        sumo_vehicle_state = {}
+        for vehicle_id in self._traci_conn.vehicle.getIDList():
+            if vehicle_id in snapshot.non_sumo_vehicle_ids:
+                self._traci_conn.vehicle.remove(vehicle_id)
+                continue
+            self._subscribe_to_vehicle(vehicle_id)
+            sumo_vehicle_state[
+                vehicle_id
+            ] = self._traci_conn.vehicle.getSubscriptionResults(vehicle_id)
+        self._sumo_vehicle_ids = set(sumo_vehicle_state)
+
+        return ProviderState(
+            columns=[self._traffic_vehicle_columns(sumo_vehicle_state)]
+        )
+
     @property
     def connected(self):
         return self._traci_conn is not None
@@ -413,9 +500,16 @@ class SumoTrafficSimulation(Provider):
         return self._sync(provider_state)
 
     def _sync(self, provider_state: ProviderState):
-        provider_vehicles = {v.vehicle_id: v for v in provider_state.vehicles}
-        external_vehicles = [v for v in provider_state.vehicles if v.source != "SUMO"]
-        external_vehicle_ids = {v.vehicle_id for v in external_vehicles}
+        # Our own (bulk) vehicle states are not unpacked here, only external ones.
+        provider_vehicles = {
+            v.vehicle_id: v for v in provider_state.individual_vehicles
+        }
+        external_vehicle_ids = {
+            v_id for v_id, v in provider_vehicles.items() if v.source != "SUMO"
+        }
+        for columns in provider_state.columns:
+            if columns.source != "SUMO":
+                external_vehicle_ids.update(columns.vehicle_ids)
 
         # Represents current state
         traffic_vehicle_states = self._traci_conn.vehicle.getAllSubscriptionResults()
@@ -459,7 +553,9 @@ class SumoTrafficSimulation(Provider):
             self._traci_conn.vehicle.remove(vehicle_id)
 
         for vehicle_id in external_vehicles_that_have_joined:
-            vehicle_state = provider_vehicles[vehicle_id]
+            vehicle_state = provider_vehicles.get(
+                vehicle_id
+            ) or provider_state.vehicle_state(vehicle_id)
             dimensions = Dimensions.copy_with_defaults(
                 vehicle_state.dimensions,
                 VEHICLE_CONFIGS[vehicle_state.vehicle_config_type].dimensions,
@@ -470,7 +566,9 @@ class SumoTrafficSimulation(Provider):
 
         # update the state of all current managed vehicles
         for vehicle_id in self._non_sumo_vehicle_ids:
-            provider_vehicle = provider_vehicles[vehicle_id]
+            provider_vehicle = provider_vehicles.get(
+                vehicle_id
+            ) or provider_state.vehicle_state(vehicle_id)
 
             pos, sumo_heading = provider_vehicle.pose.as_sumo(
                 provider_vehicle.dimensions.length, Heading(0)
@@ -598,14 +696,14 @@ class SumoTrafficSimulation(Provider):
 
     def _compute_provider_state(self) -> ProviderState:
         return ProviderState(
-            vehicles=self._compute_traffic_vehicles(),
+            columns=[self._compute_traffic_vehicles()],
         )
 
-    def _compute_traffic_vehicles(self) -> List[VehicleState]:
+    def _compute_traffic_vehicles(self) -> VehicleStateColumns:
         sub_results = self._traci_conn.simulation.getSubscriptionResults()
 
         if sub_results is None or sub_results == {}:
-            return []
+            return VehicleStateColumns.empty(source="SUMO")
 
         # New social vehicles that have entered the map
         newly_departed_sumo_traffic = [
@@ -618,20 +716,7 @@ class SumoTrafficSimulation(Provider):
 
         # Subscribe to all vehicles to reduce repeated traci calls
         for vehicle_id in newly_departed_sumo_traffic:
-            self._traci_conn.vehicle.subscribe(
-                vehicle_id,
-                [
-                    tc.VAR_POSITION,  # Decimal=66,  Hex=0x42
-                    tc.VAR_ANGLE,  # Decimal=67,  Hex=0x43
-                    tc.VAR_SPEED,  # Decimal=64,  Hex=0x40
-                    tc.VAR_VEHICLECLASS,  # Decimal=73,  Hex=0x49
-                    tc.VAR_ROUTE_INDEX,  # Decimal=105, Hex=0x69
-                    tc.VAR_EDGES,  # Decimal=84,  Hex=0x54
-                    tc.VAR_TYPE,  # Decimal=79,  Hex=0x4F
-                    tc.VAR_LENGTH,  # Decimal=68,  Hex=0x44
-                    tc.VAR_WIDTH,  # Decimal=77,  Hex=0x4d
-                ],
-            )
+            self._subscribe_to_vehicle(vehicle_id)
 
         sumo_vehicle_state = self._traci_conn.vehicle.getAllSubscriptionResults()
 
@@ -666,43 +751,81 @@ class SumoTrafficSimulation(Provider):
         self._sumo_vehicle_ids = (
             set(sumo_vehicle_state.keys()) - self._non_sumo_vehicle_ids
         )
-        provider_vehicles = []
+        return self._traffic_vehicle_columns(sumo_vehicle_state)
 
-        # batched conversion of positions to numpy arrays
-        front_bumper_positions = np.array(
+    def _subscribe_to_vehicle(self, vehicle_id):
+        self._traci_conn.vehicle.subscribe(
+            vehicle_id,
             [
-                sumo_vehicle[tc.VAR_POSITION]
-                for sumo_vehicle in sumo_vehicle_state.values()
-            ]
-        ).reshape(-1, 2)
+                tc.VAR_POSITION,  # Decimal=66,  Hex=0x42
+                tc.VAR_ANGLE,  # Decimal=67,  Hex=0x43
+                tc.VAR_SPEED,  # Decimal=64,  Hex=0x40
+                tc.VAR_VEHICLECLASS,  # Decimal=73,  Hex=0x49
+                tc.VAR_ROUTE_INDEX,  # Decimal=105, Hex=0x69
+                tc.VAR_EDGES,  # Decimal=84,  Hex=0x54
+                tc.VAR_TYPE,  # Decimal=79,  Hex=0x4F
+                tc.VAR_LENGTH,  # Decimal=68,  Hex=0x44
+                tc.VAR_WIDTH,  # Decimal=77,  Hex=0x4d
+            ],
+        )
 
-        for i, (sumo_id, sumo_vehicle) in enumerate(sumo_vehicle_state.items()):
-            # XXX: We can safely rely on iteration order over dictionaries being
-            #      stable on py3.7.
-            #      See: https://www.python.org/downloads/release/python-370/
-            #      "The insertion-order preservation nature of dict objects is now an
-            #      official part of the Python language spec."
-            front_bumper_pos = front_bumper_positions[i]
-            heading = Heading.from_sumo(sumo_vehicle[tc.VAR_ANGLE])
-            speed = sumo_vehicle[tc.VAR_SPEED]
-            vehicle_config_type = sumo_vehicle[tc.VAR_VEHICLECLASS]
-            dimensions = VEHICLE_CONFIGS[vehicle_config_type].dimensions
-            provider_vehicles.append(
-                VehicleState(
-                    # XXX: In the case of the SUMO traffic provider, the vehicle ID is
-                    #      the sumo ID is the actor ID.
-                    vehicle_id=sumo_id,
-                    vehicle_config_type=vehicle_config_type,
-                    pose=Pose.from_front_bumper(
-                        front_bumper_pos, heading, dimensions.length
-                    ),
-                    dimensions=dimensions,
-                    speed=speed,
-                    source="SUMO",
-                )
-            )
+    def _traffic_vehicle_columns(self, sumo_vehicle_state) -> VehicleStateColumns:
+        sumo_ids = list(sumo_vehicle_state.keys())
+        if not sumo_ids:
+            return VehicleStateColumns.empty(source="SUMO")
+
+        # XXX: We can safely rely on iteration order over dictionaries being
+        #      stable on py3.7.
+        #      See: https://www.python.org/downloads/release/python-370/
+        #      "The insertion-order preservation nature of dict objects is now an
+        #      official part of the Python language spec."
+        sumo_vehicles = sumo_vehicle_state.values()
+        front_bumper_positions = np.array(
+            [sumo_vehicle[tc.VAR_POSITION] for sumo_vehicle in sumo_vehicles],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+        sumo_angles = np.array(
+            [sumo_vehicle[tc.VAR_ANGLE] for sumo_vehicle in sumo_vehicles],
+            dtype=np.float64,
+        )
+        speeds = np.array(
+            [sumo_vehicle[tc.VAR_SPEED] for sumo_vehicle in sumo_vehicles],
+            dtype=np.float64,
+        )
+        vehicle_config_types = [
+            sumo_vehicle[tc.VAR_VEHICLECLASS] for sumo_vehicle in sumo_vehicles
+        ]
+        dimensions = np.array(
+            [
+                VEHICLE_CONFIGS[vehicle_config_type].dimensions.as_lwh
+                for vehicle_config_type in vehicle_config_types
+            ],
+            dtype=np.float64,
+        )
 
-        return provider_vehicles
+        # Batched equivalent of `Heading.from_sumo()`: SUMO uses degrees, 0 faces
+        # north and turns clockwise. `Heading` uses radians in (-pi, pi],
+        # counter-clockwise.
+        headings = (2 * math.pi - np.radians(sumo_angles)) % (2 * math.pi)
+        headings[headings > math.pi] -= 2 * math.pi
+
+        # Batched equivalent of `Pose.from_front_bumper()`
+        half_lengths = 0.5 * dimensions[:, 0]
+        positions = np.zeros((len(sumo_ids), 3))
+        positions[:, 0] = front_bumper_positions[:, 0] + np.sin(headings) * half_lengths
+        positions[:, 1] = front_bumper_positions[:, 1] - np.cos(headings) * half_lengths
+
+        # XXX: In the case of the SUMO traffic provider, the vehicle ID is
+        #      the sumo ID is the actor ID.
+        return VehicleStateColumns(
+            vehicle_ids=sumo_ids,
+            positions=positions,
+            headings=headings,
+            speeds=speeds,
+            dimensions=dimensions,
+            vehicle_config_types=vehicle_config_types,
+            source="SUMO",
+        )
 
     def _teleport_exited_vehicles(self):
         sub_results = self._traci_conn.simulation.getSubscriptionResults()
@@ -314,8 +314,8 @@ def scenarios():
         )
 
 
-@pytest.fixture
-def smarts():
+@pytest.fixture(params=[False, True], ids=["physics", "kinematic"])
+def smarts(request):
     laner = AgentInterface(
         max_episode_steps=1000,
         action=ActionSpaceType.Lane,
@@ -329,6 +329,8 @@ def smarts():
         agents,
         traffic_sim=SumoTrafficSimulation(headless=True),
         envision=None,
+        kinematic=request.param,
+        cross_check_collisions=not request.param,
     )
 
     yield smarts
@@ -350,3 +352,32 @@ def test_sim_level_collision(smarts, scenarios):
 
     assert len(collisions) > 0
     assert any(agent_dones)
+
+
+def test_kinematic_box_chassis():
+    chassis = BoxChassis(
+        Pose.from_center([0, 0, 0], Heading(0)),
+        speed=0,
+        dimensions=VEHICLE_CONFIGS["passenger"].dimensions,
+        bullet_client=None,
+    )
+    pose = Pose.from_center([1, 2, 0], Heading(0.5))
+    chassis.control(pose, speed=3, dt=0.1)
+
+    assert chassis.pose == pose
+    assert chassis.speed == 3
+    assert chassis.bullet_id is None
+    assert chassis.contact_points == []
+    chassis.teardown()
+
+
+def test_kinematic_warns_about_lidar(caplog):
+    agents = {
+        AGENT_1: AgentInterface(
+            max_episode_steps=1000, action=ActionSpaceType.Lane, lidar=True
+        )
+    }
+    smarts = SMARTS(agents, traffic_sim=None, envision=None, kinematic=True)
+    smarts.destroy()
+
+    assert "Lidar does not detect vehicles" in caplog.text
@@ -19,6 +19,8 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
+import copy
+
 import pytest
 
 import smarts.sstudio.types as t
@@ -145,3 +147,69 @@ def test_lane_following_controller(smarts, agent_spec, scenarios):
     assert (
         sum(lateral_error) / len(lateral_error) < 1
     ), "Average lateral error exceeded maximum (1)"
+
+
+# Each vehicle of a batch gets waypoint paths cut to its own length, like at the end
+# of a route.
+@pytest.mark.parametrize(
+    "path_lengths", [(None, None, None, None), (12, 10, 9, 5), (1, None, 5, 10)]
+)
+def test_lane_following_batch_matches_single_vehicle(
+    scenarios, path_lengths, monkeypatch
+):
+    interface = AgentInterface.from_type(AgentType.Laner, max_episode_steps=5000)
+    smarts = SMARTS(
+        agent_interfaces={AGENT_ID: interface},
+        traffic_sim=SumoTrafficSimulation(),
+    )
+    smarts.reset(next(scenarios))
+    waypoint_paths = smarts.road_map.waypoint_paths
+    path_length_per_call = iter(())
+
+    def cut_waypoint_paths(*args, **kwargs):
+        path_length = next(path_length_per_call)
+        return [path[:path_length] for path in waypoint_paths(*args, **kwargs)]
+
+    vehicle_index = smarts.vehicle_index
+    (vehicle,) = vehicle_index.vehicles_by_actor_id(AGENT_ID)
+    controller_state = vehicle_index.controller_state_for_vehicle_id(vehicle.id)
+    sensor_state = vehicle_index.sensor_state_for_vehicle_id(vehicle.id)
+    targets = [(15, 0), (5, 0), (12.5, 1), (0, 0)]
+
+    for _ in range(8):
+        for _ in range(10):
+            smarts.step({AGENT_ID: "keep_lane"})
+
+        monkeypatch.setattr(smarts.road_map, "waypoint_paths", cut_waypoint_paths)
+        controls = []
+        vehicle.control = lambda **control: controls.append(control)
+        path_length_per_call = iter(path_lengths)
+        for target_speed, lane_change in targets:
+            LaneFollowingController.perform_lane_following(
+                smarts,
+                AGENT_ID,
+                vehicle,
+                copy.deepcopy(controller_state),
+                sensor_state,
+                target_speed,
+                lane_change,
+            )
+        single_vehicle_controls, controls = controls, []
+
+        path_length_per_call = iter(path_lengths)
+        LaneFollowingController.perform_lane_following_batch(
+            smarts,
+            [AGENT_ID] * len(targets),
+            [vehicle] * len(targets),
+            [copy.deepcopy(controller_state) for _ in targets],
+            [sensor_state] * len(targets),
+            [target_speed for target_speed, _ in targets],
+            [lane_change for _, lane_change in targets],
+        )
+        del vehicle.control
+        monkeypatch.undo()
+
+        assert len(controls) == len(single_vehicle_controls) == len(targets)
+        for control, single_vehicle_control in zip(controls, single_vehicle_controls):
+            assert control == pytest.approx(single_vehicle_control)
+    smarts.destroy()
@@ -20,14 +20,17 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 import math
+import subprocess
 
 import numpy as np
 import pytest
 
+from smarts.core import default_map_builder
 from smarts.core.coordinates import Point
 from smarts.core.opendrive_road_network import OpenDriveRoadNetwork
 from smarts.core.scenario import Scenario
 from smarts.core.sumo_road_network import SumoRoadNetwork
+from smarts.sstudio.types import MapSpec
 
 
 @pytest.fixture
@@ -666,3 +669,187 @@ def test_opendrive_map_merge(opendrive_scenario_merge):
     r0_lp_path = lanepoints.paths_starting_at_lanepoint(r0_linked_lane_point, 5, ())
     assert len(r0_lp_path) == 1
     assert [llp.lp.lane.lane_id for llp in r0_lp_path[0]].count("1_0_L_1") == 6
+
+
+def test_compiled_map(tmp_path, monkeypatch):
+    monkeypatch.setattr(default_map_builder, "_compiled_map_dir", lambda: tmp_path)
+    # Compile maps when they are first loaded.
+    monkeypatch.setattr(default_map_builder, "_max_compiled_bytes", None)
+    map_spec = MapSpec(source="scenarios/od_4lane", lanepoint_spacing=1.0)
+    map_source = "scenarios/od_4lane/map.xodr"
+
+    builds = []
+    from_spec = OpenDriveRoadNetwork.from_spec
+
+    def build(map_spec):
+        builds.append(map_spec)
+        return from_spec(map_spec)
+
+    monkeypatch.setattr(OpenDriveRoadNetwork, "from_spec", build)
+    built_map, _ = default_map_builder._load_or_build_map(
+        OpenDriveRoadNetwork, map_spec, map_source
+    )
+    # The built map is compiled, not built again.
+    assert len(builds) == 1
+    assert len(list(tmp_path.iterdir())) == 1
+    loaded_map, _ = default_map_builder._load_or_build_map(
+        OpenDriveRoadNetwork, map_spec, map_source
+    )
+    assert loaded_map is not built_map
+    assert len(builds) == 1
+
+    route = loaded_map.generate_routes(
+        loaded_map.road_by_id("52_0_R"), loaded_map.road_by_id("56_0_R")
+    )[0]
+    lp_pose = loaded_map._lanepoints._lanepoints_by_lane_id["52_0_R_-1"][-1].lp.pose
+    assert loaded_map.waypoint_paths(
+        lp_pose, 170, route=route
+    ) == built_map.waypoint_paths(lp_pose, 170, route=route)
+
+
+def test_compiled_map_with_shifted_source(tmp_path, monkeypatch):
+    compiled_dir = tmp_path / "compiled"
+    compiled_dir.mkdir()
+    monkeypatch.setattr(default_map_builder, "_compiled_map_dir", lambda: compiled_dir)
+    monkeypatch.setattr(default_map_builder, "_max_compiled_bytes", None)
+    scenario_dir = tmp_path / "scenario"
+    scenario_dir.mkdir()
+    subprocess.check_call(
+        [
+            "netconvert",
+            "-s",
+            "scenarios/figure_eight/map.net.xml",
+            "--offset.x=1000",
+            "--offset.y=1000",
+            "-o",
+            str(scenario_dir / "map.net.xml"),
+        ]
+    )
+    map_spec = MapSpec(source=str(scenario_dir / "map.net.xml"), shift_to_origin=True)
+    map_source = map_spec.source
+
+    built_map, _ = default_map_builder._load_or_build_map(
+        SumoRoadNetwork, map_spec, map_source
+    )
+    shifted_path = scenario_dir / SumoRoadNetwork.shifted_net_file_name
+    assert built_map.source == str(shifted_path)
+
+    # e.g. `scl scenario clean` deletes the generated network.
+    shifted_path.unlink()
+    loaded_map, _ = default_map_builder._load_or_build_map(
+        SumoRoadNetwork, map_spec, map_source
+    )
+    assert loaded_map.source == str(shifted_path)
+    assert shifted_path.is_file()
+
+
+def test_compile_road_map(tmp_path, monkeypatch):
+    monkeypatch.setattr(default_map_builder, "_compiled_map_dir", lambda: tmp_path)
+    map_spec = MapSpec(source="scenarios/figure_eight")
+    map_source = "scenarios/figure_eight/map.net.xml"
+
+    # By default maps are not compiled when they are loaded.
+    default_map_builder._load_or_build_map(SumoRoadNetwork, map_spec, map_source)
+    assert list(tmp_path.iterdir()) == []
+
+    assert default_map_builder.compile_road_map(map_spec)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    def build(map_spec):
+        assert False, "The compiled map should be loaded"
+
+    monkeypatch.setattr(SumoRoadNetwork, "from_spec", build)
+
+    def fail(*args):
+        assert False, "An existing compiled map is only checked by its header"
+
+    with monkeypatch.context() as m:
+        m.setattr(default_map_builder, "_load_compiled_map", fail)
+        m.setattr(default_map_builder, "_compile_map", fail)
+        assert default_map_builder.compile_road_map(map_spec)
+
+    loaded_map, _ = default_map_builder._load_or_build_map(
+        SumoRoadNetwork, map_spec, map_source
+    )
+    assert loaded_map.road_by_id("gneE20") is not None
+
+
+def test_compiled_map_cache_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(default_map_builder, "_compiled_map_dir", lambda: tmp_path)
+    sources = ["scenarios/figure_eight", "scenarios/loop"]
+    try:
+        default_map_builder.set_compiled_map_cache_limit(max_bytes=1)
+        for source in sources:
+            map_spec = MapSpec(source=source)
+            default_map_builder._load_or_build_map(
+                SumoRoadNetwork, map_spec, f"{source}/map.net.xml"
+            )
+        # Only the most recently compiled map is kept.
+        assert len(list(tmp_path.iterdir())) == 1
+
+        default_map_builder.set_compiled_map_cache_limit(max_bytes=0)
+        default_map_builder._load_or_build_map(
+            SumoRoadNetwork, MapSpec(source=sources[0]), f"{sources[0]}/map.net.xml"
+        )
+        assert len(list(tmp_path.iterdir())) == 1
+    finally:
+        default_map_builder.set_compiled_map_cache_limit()
+
+
+def test_road_map_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(default_map_builder, "_compiled_map_dir", lambda: tmp_path)
+    default_map_builder._clear_cache()
+    default_map_builder.set_road_map_cache_limits(max_maps=2)
+    try:
+        sources = ["scenarios/od_4lane", "scenarios/od_merge", "scenarios/od_4lane"]
+        road_maps = []
+        resident_bytes = []
+        for source in sources:
+            road_maps.append(
+                default_map_builder.get_road_map(MapSpec(source=source))[0]
+            )
+            resident_bytes.append(
+                default_map_builder.road_map_cache_info().resident_bytes
+            )
+        assert road_maps[0] is road_maps[2]
+        info = default_map_builder.road_map_cache_info()
+        assert (info.hits, info.misses, info.maps) == (1, 2, 2)
+        # Sizes are measured once, when a map is cached.
+        assert 0 < resident_bytes[0] < resident_bytes[1] == resident_bytes[2]
+
+        default_map_builder.set_road_map_cache_limits(max_maps=1)
+        info = default_map_builder.road_map_cache_info()
+        assert info.maps == 1
+        # The least recently used map is evicted.
+        assert info.resident_bytes == resident_bytes[0]
+
+        default_map_builder.set_road_map_cache_limits(max_bytes=1)
+        default_map_builder.get_road_map(MapSpec(source=sources[1]))
+        info = default_map_builder.road_map_cache_info()
+        # The most recently used map is kept regardless of its size.
+        assert (info.maps, info.resident_bytes) == (
+            1,
+            resident_bytes[1] - resident_bytes[0],
+        )
+    finally:
+        default_map_builder.set_road_map_cache_limits()
+        default_map_builder._clear_cache()
+
+
+def test_sumo_map_glb(tmp_path, monkeypatch):
+    from smarts.core import sumo_road_network
+    from smarts.core.utils import geometry
+
+    if not geometry.HAS_VECTORIZED_SHAPELY:
+        pytest.skip("The vectorized map export requires shapely 2")
+
+    road_map = SumoRoadNetwork.from_spec(MapSpec(source="scenarios/figure_eight"))
+    road_map.to_glb(tmp_path / "vectorized.glb")
+
+    monkeypatch.setattr(sumo_road_network, "HAS_VECTORIZED_SHAPELY", False)
+    monkeypatch.setattr(geometry, "HAS_VECTORIZED_SHAPELY", False)
+    road_map.to_glb(tmp_path / "sequential.glb")
+
+    assert (tmp_path / "vectorized.glb").read_bytes() == (
+        tmp_path / "sequential.glb"
+    ).read_bytes()
@@ -34,6 +34,7 @@ from smarts.core.agent_interface import (
     DrivableAreaGridMap,
     NeighborhoodVehicles,
     RoadWaypoints,
+    Waypoints,
 )
 from smarts.core.colors import SceneColors
 from smarts.core.controllers import ActionSpaceType
@@ -231,3 +232,87 @@ def test_observations(env, agent_spec):
             assert np.count_nonzero(
                 drivable_area.data[drivable_area_last_wp_x, drivable_area_last_wp_y, :]
             )
+
+
+def test_observation_fields():
+    agent_spec = AgentSpec(
+        interface=AgentInterface(
+            neighborhood_vehicles=True,
+            waypoints=True,
+            rgb=True,
+            action=ActionSpaceType.Lane,
+            observation_fields={"ego_vehicle_state", "waypoint_paths"},
+        ),
+        agent_builder=lambda: Agent.from_function(lambda _: "keep_lane"),
+    )
+    env = gym.make(
+        "smarts.env:hiway-v0",
+        scenarios=["scenarios/loop"],
+        agent_specs={AGENT_ID: agent_spec},
+        headless=True,
+        visdom=False,
+        fixed_timestep_sec=0.1,
+        seed=42,
+    )
+
+    agent = agent_spec.build_agent()
+    observations = env.reset()
+    # The camera of an unread field is not attached, so it is not rendered.
+    (vehicle,) = env.unwrapped._smarts.vehicle_index.vehicles_by_actor_id(AGENT_ID)
+    assert not vehicle.subscribed_to_rgb_sensor
+    for _ in range(NUM_STEPS):
+        agent_obs = observations[AGENT_ID]
+        assert agent_obs.ego_vehicle_state.lane_id is not None
+        assert len(agent_obs.waypoint_paths) > 0
+        assert agent_obs.events is not None
+        # Subscribed to, but not read by the agent
+        assert agent_obs.neighborhood_vehicle_states is None
+        assert agent_obs.top_down_rgb is None
+        assert agent_obs.distance_travelled is None
+        assert agent_obs.via_data is None
+        observations, _, _, _ = env.step({AGENT_ID: agent.act(agent_obs)})
+    env.close()
+
+
+def test_unknown_observation_fields():
+    with pytest.raises(ValueError):
+        AgentInterface(observation_fields={"ego_vehicle_state", "ego_state"})
+
+
+def test_sensor_update_every():
+    agent_spec = AgentSpec(
+        interface=AgentInterface(
+            waypoints=Waypoints(update_every=2),
+            rgb=RGB(width=64, height=64, update_every=3),
+            action=ActionSpaceType.Lane,
+        ),
+        agent_builder=lambda: Agent.from_function(lambda _: "keep_lane"),
+    )
+    env = gym.make(
+        "smarts.env:hiway-v0",
+        scenarios=["scenarios/loop"],
+        agent_specs={AGENT_ID: agent_spec},
+        headless=True,
+        visdom=False,
+        fixed_timestep_sec=0.1,
+        seed=42,
+    )
+
+    agent = agent_spec.build_agent()
+    observations = env.reset()
+    last_rgb = None
+    for step in range(NUM_STEPS):
+        agent_obs = observations[AGENT_ID]
+        waypoints_step = step - step % 2
+        rgb_step = step - step % 3
+        assert agent_obs.observed_at["waypoint_paths"] == pytest.approx(
+            agent_obs.elapsed_sim_time - (step - waypoints_step) * 0.1
+        )
+        assert agent_obs.observed_at["top_down_rgb"] == pytest.approx(
+            agent_obs.elapsed_sim_time - (step - rgb_step) * 0.1
+        )
+        if step != rgb_step:
+            assert agent_obs.top_down_rgb is last_rgb
+        last_rgb = agent_obs.top_down_rgb
+        observations, _, _, _ = env.step({AGENT_ID: agent.act(agent_obs)})
+    env.close()
@@ -0,0 +1,133 @@
+# MIT License
+#
+# Copyright (C) 2021. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+import math
+
+import numpy as np
+import pytest
+
+from smarts.core.coordinates import Dimensions, Heading, Pose
+from smarts.core.provider import ProviderState, VehicleStateColumns
+from smarts.core.sumo_traffic_simulation import SumoTrafficSimulation
+from smarts.core.utils.sumo import traci
+from smarts.core.vehicle import VehicleState
+
+
+@pytest.fixture
+def vehicle_states():
+    return [
+        VehicleState(
+            vehicle_id=f"v{i}",
+            vehicle_type="car",
+            vehicle_config_type="passenger",
+            pose=Pose.from_center((i, 2 * i, 0), Heading(0.5 * i)),
+            dimensions=Dimensions(length=4, width=2, height=1.5),
+            speed=float(i),
+            source="TEST",
+        )
+        for i in range(5)
+    ]
+
+
+def test_columns_round_trip(vehicle_states):
+    columns = VehicleStateColumns.from_vehicle_states(vehicle_states, source="TEST")
+    assert len(columns) == len(vehicle_states)
+
+    for original, unpacked in zip(vehicle_states, columns.to_vehicle_states()):
+        assert original.vehicle_id == unpacked.vehicle_id
+        assert original.vehicle_type == unpacked.vehicle_type
+        assert original.vehicle_config_type == unpacked.vehicle_config_type
+        assert np.allclose(original.pose.position, unpacked.pose.position)
+        assert np.allclose(original.pose.orientation, unpacked.pose.orientation)
+        assert math.isclose(original.pose.heading, unpacked.pose.heading)
+        assert original.dimensions == unpacked.dimensions
+        assert original.speed == unpacked.speed
+        assert unpacked.source == "TEST"
+
+    poses = columns.poses(range(len(vehicle_states)))
+    assert np.allclose(
+        [p.orientation for p in poses], [v.pose.orientation for v in vehicle_states]
+    )
+    # Unpacked states are reused
+    assert columns.vehicle_state(3) is columns.vehicle_state(3)
+
+
+def test_provider_state_with_columns(vehicle_states):
+    columns = VehicleStateColumns.from_vehicle_states(vehicle_states[2:])
+    individual_vehicles = vehicle_states[:2]
+    provider_state = ProviderState(vehicles=individual_vehicles, dt=0.1)
+    provider_state.merge(ProviderState(columns=[columns]))
+
+    assert provider_state.vehicle_ids == {v.vehicle_id for v in vehicle_states}
+    assert provider_state.vehicle_state("v3").vehicle_id == "v3"
+    assert provider_state.vehicle_state("missing") is None
+
+    with pytest.raises(AssertionError):
+        provider_state.merge(ProviderState(columns=[columns]))
+
+    provider_state.filter({"v1", "v3"})
+    assert provider_state.vehicle_ids == {"v0", "v2", "v4"}
+    assert len(provider_state.columns) == 1
+    assert provider_state.columns[0].vehicle_ids == ["v2", "v4"]
+
+    # Accessing `vehicles` unpacks the columns
+    assert [v.vehicle_id for v in provider_state.vehicles] == ["v0", "v2", "v4"]
+    assert provider_state.columns == []
+    assert len(individual_vehicles) == 2
+
+
+def test_provider_state_equality(vehicle_states):
+    columns = VehicleStateColumns.from_vehicle_states(vehicle_states[2:])
+    provider_state = ProviderState(
+        vehicles=vehicle_states[:2], dt=0.1, columns=[columns]
+    )
+
+    assert provider_state == ProviderState(
+        vehicles=vehicle_states[:2], dt=0.1, columns=[columns]
+    )
+    assert provider_state == ProviderState(
+        vehicles=vehicle_states[:2] + columns.to_vehicle_states(), dt=0.1
+    )
+    assert provider_state != ProviderState(
+        vehicles=vehicle_states[:2], dt=0.2, columns=[columns]
+    )
+    assert provider_state != ProviderState(vehicles=vehicle_states[:2], dt=0.1)
+    # Comparing does not unpack the columns.
+    assert provider_state.columns == [columns]
+
+
+def test_sumo_headings_match_heading_from_sumo():
+    sumo_angles = [0, 45, 90, 179.9, 180, 180.1, 270, 359.9, 360]
+    sumo_vehicle_state = {
+        f"v{i}": {
+            traci.constants.VAR_POSITION: (10.0, 20.0),
+            traci.constants.VAR_ANGLE: angle,
+            traci.constants.VAR_SPEED: 5.0,
+            traci.constants.VAR_VEHICLECLASS: "passenger",
+        }
+        for i, angle in enumerate(sumo_angles)
+    }
+    columns = SumoTrafficSimulation()._traffic_vehicle_columns(sumo_vehicle_state)
+
+    for index, angle in enumerate(sumo_angles):
+        heading = Heading.from_sumo(angle)
+        assert columns.headings[index] == pytest.approx(float(heading), abs=1e-12)
+        assert columns.pose(index).heading == pytest.approx(float(heading), abs=1e-12)
@@ -0,0 +1,255 @@
+# MIT License
+#
+# Copyright (C) 2021. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+import time
+from concurrent import futures
+
+import grpc
+import numpy as np
+import pytest
+
+from smarts.core import remote_agent_buffer
+from smarts.core.agent import Agent
+from smarts.core.remote_agent import RemoteAgent, RemoteAgentException
+from smarts.core.remote_agent_buffer import RemoteAgentBuffer
+from smarts.core.utils.networking import find_free_port
+from smarts.zoo import manager_pb2, serialization, worker_pb2_grpc
+from smarts.zoo.agent_spec import AgentSpec
+from smarts.zoo.manager_servicer import ManagerServicer
+from smarts.zoo.worker_servicer import WorkerServicer
+
+
+@pytest.fixture
+def worker_address():
+    port = find_free_port()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=1))
+    worker_pb2_grpc.add_WorkerServicer_to_server(WorkerServicer(), server)
+    server.add_insecure_port(f"[::]:{port}")
+    server.start()
+    yield ("localhost", port)
+    server.stop(0)
+
+
+def test_serialization_round_trip():
+    obs = {"image": np.arange(64 * 64 * 3, dtype=np.uint8), "speed": 3.5}
+    payload, buffers = serialization.dumps(obs)
+    result = serialization.loads(payload, buffers)
+
+    assert result["speed"] == 3.5
+    assert np.array_equal(result["image"], obs["image"])
+    # The array data is not copied
+    assert np.shares_memory(result["image"], obs["image"])
+
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_remote_agent_act(worker_address, stream):
+    # The worker also answers on the manager address; only `terminate` uses it.
+    remote_agent = RemoteAgent(worker_address, worker_address, stream=stream)
+    remote_agent.start(
+        AgentSpec(agent_builder=lambda: Agent.from_function(lambda obs: obs * 2))
+    )
+
+    obs = [np.full((8, 8), i, dtype=np.float32) for i in range(5)]
+    act_futures = [remote_agent.act(o) for o in obs]
+    for o, future in zip(obs, act_futures):
+        assert np.array_equal(future.result(timeout=10), o * 2)
+
+
+def _write_in_place(obs):
+    obs["image"][0] = 255
+    return obs
+
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_remote_agent_receives_writable_arrays(worker_address, stream):
+    remote_agent = RemoteAgent(worker_address, worker_address, stream=stream)
+    remote_agent.start(
+        AgentSpec(
+            agent_builder=lambda: Agent.from_function(lambda obs: obs),
+            observation_adapter=_write_in_place,
+        )
+    )
+
+    obs = {"image": np.zeros(64 * 64 * 3, dtype=np.uint8)}
+    action = remote_agent.act(obs).result(timeout=10)
+    assert action["image"][0] == 255
+
+    # Arrays of the received action can be modified in place too.
+    action["image"][1] = 255
+    assert action["image"][1] == 255
+
+
+def test_remote_agent_stream_fails_when_worker_stops():
+    port = find_free_port()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    worker_pb2_grpc.add_WorkerServicer_to_server(WorkerServicer(), server)
+    server.add_insecure_port(f"[::]:{port}")
+    server.start()
+
+    remote_agent = RemoteAgent(("localhost", port), ("localhost", port))
+    remote_agent.start(AgentSpec(agent_builder=lambda: Agent.from_function(abs)))
+    assert remote_agent.act(-1).result(timeout=10) == 1
+
+    server.stop(0).wait()
+    # Actions on the dead stream fail instead of waiting forever.
+    for _ in range(2):
+        with pytest.raises((grpc.RpcError, RemoteAgentException)):
+            remote_agent.act(-1).result(timeout=10)
+
+
+def test_manager_reuses_pooled_workers():
+    manager = ManagerServicer(pool_size=1, agents_per_worker=2)
+    try:
+        ports = [
+            manager.spawn_worker(manager_pb2.Machine(), None).num for _ in range(3)
+        ]
+        # Two agents share the pooled worker before another worker is started.
+        assert ports[0] == ports[1] != ports[2]
+
+        for port in ports:
+            manager.stop_worker(manager_pb2.Port(num=port), None)
+
+        # Only the pooled worker is kept around for reuse.
+        assert manager.spawn_worker(manager_pb2.Machine(), None).num in ports[:2]
+    finally:
+        manager.destroy()
+
+
+def test_manager_colocates_groups():
+    manager = ManagerServicer(agents_per_worker=2)
+    try:
+        ports = [
+            manager.spawn_worker(manager_pb2.Machine(group=group), None).num
+            for group in ["a", "b", "a"]
+        ]
+        assert ports[0] == ports[2] != ports[1]
+    finally:
+        manager.destroy()
+
+
+class BatchAgent(Agent):
+    batch_sizes = []
+
+    def act(self, obs):
+        return obs * 2
+
+    def act_batch(self, observations):
+        BatchAgent.batch_sizes.append(len(observations))
+        return list(np.stack(observations) * 2)
+
+
+def test_remote_agent_act_batch(worker_address):
+    BatchAgent.batch_sizes = []
+    remote_agents = [RemoteAgent(worker_address, worker_address) for _ in range(4)]
+    for remote_agent, group in zip(remote_agents, ["a", "a", "a", ""]):
+        # Specs are built separately, so they do not need to pickle identically.
+        remote_agent.start(AgentSpec(agent_builder=BatchAgent), group=group)
+
+    obs = [np.full(4, i, dtype=np.float32) for i in range(4)]
+    act_futures = RemoteAgent.act_batch(remote_agents, obs)
+    for o, future in zip(obs, act_futures):
+        assert np.array_equal(future.result(timeout=10), o * 2)
+
+    # Agents of the same group share one policy which acts once per batch, agents
+    # without a group get their own.
+    assert sorted(BatchAgent.batch_sizes) == [1, 3]
+
+
+class ReentrancyCheckingAgent(BatchAgent):
+    acting = 0
+    max_acting = 0
+
+    def act(self, obs):
+        ReentrancyCheckingAgent.acting += 1
+        ReentrancyCheckingAgent.max_acting = max(
+            ReentrancyCheckingAgent.max_acting, ReentrancyCheckingAgent.acting
+        )
+        time.sleep(0.01)
+        ReentrancyCheckingAgent.acting -= 1
+        return obs * 2
+
+
+def test_worker_does_not_act_concurrently_with_shared_policy():
+    port = find_free_port()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+    worker_pb2_grpc.add_WorkerServicer_to_server(WorkerServicer(), server)
+    server.add_insecure_port(f"[::]:{port}")
+    server.start()
+    worker_address = ("localhost", port)
+
+    ReentrancyCheckingAgent.max_acting = 0
+    remote_agents = [RemoteAgent(worker_address, worker_address) for _ in range(4)]
+    for remote_agent in remote_agents:
+        remote_agent.start(AgentSpec(agent_builder=ReentrancyCheckingAgent), group="a")
+
+    act_futures = [
+        remote_agent.act(np.full(4, i, dtype=np.float32))
+        for _ in range(3)
+        for i, remote_agent in enumerate(remote_agents)
+    ]
+    for future in act_futures:
+        future.result(timeout=10)
+    server.stop(0)
+
+    # Each agent acts on its own stream, but they share one policy.
+    assert ReentrancyCheckingAgent.max_acting == 1
+
+
+def test_remote_agent_buffer_releases_idle_groups(monkeypatch):
+    class FakeRemoteAgent:
+        def __init__(self, group):
+            self.group = group
+            self.terminated = False
+
+        def terminate(self):
+            self.terminated = True
+
+    built = []
+
+    def build(self, zoo_manager_conns, group=""):
+        built.append(FakeRemoteAgent(group))
+        return built[-1]
+
+    monkeypatch.setattr(
+        remote_agent_buffer, "get_manager_channel_stub", lambda *args: (None, None)
+    )
+    monkeypatch.setattr(RemoteAgentBuffer, "_build_remote_agent", build)
+    buffer = RemoteAgentBuffer(
+        zoo_manager_addrs=[("localhost", 0)],
+        buffer_size=2,
+        agents_per_worker=2,
+        group_idle_timeout=0.1,
+    )
+
+    agent_a = buffer.acquire_remote_agent(group="a")
+    assert agent_a.group == "a"
+    buffer.acquire_remote_agent(group="b")
+    assert set(buffer._group_buffers) == {"a", "b"}
+
+    time.sleep(0.2)
+    buffer.acquire_remote_agent(group="b")
+    assert set(buffer._group_buffers) == {"b"}
+
+    buffer._replenish_threadpool.shutdown(wait=True)
+    idle_agents = [a for a in built if a.group == "a" and a is not agent_a]
+    assert idle_agents and all(a.terminated for a in idle_agents)
+    assert not agent_a.terminated
+    buffer.destroy()
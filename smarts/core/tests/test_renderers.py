@@ -170,3 +170,27 @@ def test_no_renderer(smarts_wo_renderer: SMARTS, scenario):
         smarts_wo_renderer.step({AGENT_ID: "keep_lane"})
 
     assert not smarts_wo_renderer.is_rendering
+
+
+def test_read_image(smarts: SMARTS, scenario):
+    smarts.reset(scenario)
+    smarts.step({AGENT_ID: "keep_lane"})
+    vehicle = smarts.vehicle_index.vehicles_by_actor_id(AGENT_ID)[0]
+
+    for sensor, img_format in [
+        (vehicle.rgb_sensor, "RGB"),
+        (vehicle.ogm_sensor, "A"),
+        (vehicle.drivable_area_grid_map_sensor, "A"),
+    ]:
+        camera = sensor._camera
+        image = camera.read_image(img_format)
+        expected = np.frombuffer(
+            memoryview(camera.wait_for_ram_image(img_format)), np.uint8
+        ).reshape(image.shape)
+        assert np.array_equal(image, np.flipud(expected))
+        assert image.flags["C_CONTIGUOUS"] and image.base is None
+
+        # The image is a copy, which the next render does not overwrite
+        image_copy = image.copy()
+        smarts.step({AGENT_ID: "keep_lane"})
+        assert np.array_equal(image, image_copy)
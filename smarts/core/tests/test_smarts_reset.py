@@ -30,7 +30,7 @@ from smarts.core.agent_interface import ActionSpaceType, AgentInterface
 from smarts.core.coordinates import Heading
 from smarts.core.plan import EndlessGoal, Mission, Start
 from smarts.core.scenario import Scenario
-from smarts.core.smarts import SMARTS
+from smarts.core.smarts import SMARTS, SimulationSnapshot
 from smarts.core.sumo_traffic_simulation import SumoTrafficSimulation
 
 
@@ -113,3 +113,43 @@ def test_only_agents_reset_if_scenario_does_not_change(smarts, scenarios):
         agent_pose_reset_to_initial
     ), "Upon reset the agent goes back to the starting position"
     assert sv_poses_reset_to_initial, "Upon reset social vehicles are unaffected"
+
+
+def test_restore_snapshot(smarts, scenarios):
+    """Restoring a snapshot taken after setup starts every episode from the same
+    state, without setting up the scenario again.
+    """
+
+    def rollout(snapshot):
+        obs = smarts.restore(snapshot)
+        poses = []
+        while "Agent-007" in obs:
+            agent_obs = obs["Agent-007"]
+            state = agent_obs.ego_vehicle_state
+            poses.append(tuple(state.position) + (state.heading,))
+            poses.extend(
+                tuple(s.position) + (s.heading,)
+                for s in sorted(
+                    agent_obs.neighborhood_vehicle_states, key=lambda s: s.id
+                )
+            )
+            obs, _, _, _ = smarts.step({"Agent-007": "keep_lane"})
+        return np.array(poses), smarts.vehicle_index.vehicle_ids()
+
+    scenario = next(scenarios)
+
+    seed(42)
+    smarts.setup(scenario)
+    snapshot = smarts.snapshot()
+
+    poses, vehicle_ids = rollout(snapshot)
+    restored_poses, restored_vehicle_ids = rollout(snapshot)
+
+    assert len(poses) > 1
+    assert restored_vehicle_ids == vehicle_ids
+    assert restored_poses.shape == poses.shape
+    assert np.all(np.isclose(restored_poses, poses))
+
+    other_scenario = Scenario(scenario_root="scenarios/loop", route="basic.rou.xml")
+    with pytest.raises(ValueError):
+        smarts.restore(SimulationSnapshot(other_scenario, {}, None, None))
@@ -0,0 +1,229 @@
+# MIT License
+#
+# Copyright (C) 2022. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""Geometric collision checks between vehicles, which are modelled as oriented boxes
+in the ground plane. These do not need vehicles to have a physics body.
+
+Candidate pairs are found with a uniform grid over the axis aligned bounding boxes of
+the vehicles (the broadphase) and are then tested with the separating axis theorem
+(the narrowphase). Both phases are vectorized over all vehicles.
+"""
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def box_axes(headings: np.ndarray):
+    """The unit forward and side axes of boxes with the given headings, where heading 0
+    faces north (+y) and headings increase counter-clockwise.
+
+    Returns:
+        The (N, 2) forward axes and the (N, 2) side axes.
+    """
+    sin, cos = np.sin(headings), np.cos(headings)
+    forward = np.stack((-sin, cos), axis=-1)
+    side = np.stack((cos, sin), axis=-1)
+    return forward, side
+
+
+def boxes_overlap(
+    centers_a: np.ndarray,
+    headings_a: np.ndarray,
+    dimensions_a: np.ndarray,
+    centers_b: np.ndarray,
+    headings_b: np.ndarray,
+    dimensions_b: np.ndarray,
+    margin: float = 0.0,
+) -> np.ndarray:
+    """Test pairs of oriented boxes for overlap with the separating axis theorem.
+
+    Args:
+        centers_a: The (M, 2) centers of the first box of every pair.
+        headings_a: The (M,) headings of the first box of every pair.
+        dimensions_a: The (M, 2) `(length, width)` of the first box of every pair.
+        centers_b: The (M, 2) centers of the second box of every pair.
+        headings_b: The (M,) headings of the second box of every pair.
+        dimensions_b: The (M, 2) `(length, width)` of the second box of every pair.
+        margin: Boxes closer than this distance are considered to overlap.
+
+    Returns:
+        A (M,) boolean array which is true for the overlapping pairs.
+    """
+    forward_a, side_a = box_axes(headings_a)
+    forward_b, side_b = box_axes(headings_b)
+    half_a = 0.5 * (np.asarray(dimensions_a, dtype=np.float64) + margin)
+    half_b = 0.5 * (np.asarray(dimensions_b, dtype=np.float64) + margin)
+    offset = np.asarray(centers_b, dtype=np.float64) - centers_a
+
+    def dot(u, v):
+        return np.einsum("ij,ij->i", u, v)
+
+    overlap = np.ones(len(offset), dtype=bool)
+    for axis in (forward_a, side_a, forward_b, side_b):
+        radius_a = half_a[:, 0] * np.abs(dot(forward_a, axis)) + half_a[:, 1] * np.abs(
+            dot(side_a, axis)
+        )
+        radius_b = half_b[:, 0] * np.abs(dot(forward_b, axis)) + half_b[:, 1] * np.abs(
+            dot(side_b, axis)
+        )
+        overlap &= np.abs(dot(offset, axis)) <= radius_a + radius_b
+    return overlap
+
+
+def _as_boxes(centers, headings, dimensions):
+    return (
+        np.asarray(centers, dtype=np.float64).reshape(-1, 2),
+        np.asarray(headings, dtype=np.float64).reshape(-1),
+        np.asarray(dimensions, dtype=np.float64).reshape(-1, 2),
+    )
+
+
+def bounding_boxes(
+    centers: np.ndarray, headings: np.ndarray, dimensions: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """The axis aligned bounding boxes of oriented boxes.
+
+    Returns:
+        The (N, 2) minimum and the (N, 2) maximum corners.
+    """
+    forward, side = box_axes(headings)
+    half = 0.5 * dimensions
+    extents = half[:, :1] * np.abs(forward) + half[:, 1:] * np.abs(side)
+    return centers - extents, centers + extents
+
+
+def grid_candidate_pairs(
+    mins: np.ndarray, maxs: np.ndarray, cell_size: Optional[float] = None
+) -> np.ndarray:
+    """Find the pairs of overlapping axis aligned bounding boxes using a uniform grid.
+
+    Args:
+        mins: The (N, 2) minimum corners of the bounding boxes.
+        maxs: The (N, 2) maximum corners of the bounding boxes.
+        cell_size: The size of the grid cells. Defaults to the largest bounding box
+            side, so that every box covers at most 2x2 cells.
+
+    Returns:
+        A (K, 2) array of unique `(i, j)` pairs with `i < j`.
+    """
+    count = len(mins)
+    if count < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    if cell_size is None:
+        cell_size = max(float(np.max(maxs - mins)), 1e-6)
+
+    # Every box is entered into all of the cells its bounding box covers.
+    cell_mins = np.floor(mins / cell_size).astype(np.int64)
+    cell_spans = np.floor(maxs / cell_size).astype(np.int64) - cell_mins + 1
+    cell_counts = cell_spans[:, 0] * cell_spans[:, 1]
+    boxes = np.repeat(np.arange(count), cell_counts)
+    local = np.arange(len(boxes)) - np.repeat(
+        np.cumsum(cell_counts) - cell_counts, cell_counts
+    )
+    spans_x = np.repeat(cell_spans[:, 0], cell_counts)
+    cells_x = np.repeat(cell_mins[:, 0], cell_counts) + local % spans_x
+    cells_y = np.repeat(cell_mins[:, 1], cell_counts) + local // spans_x
+    cells = (cells_x - cells_x.min()) * (cells_y.max() - cells_y.min() + 1) + (
+        cells_y - cells_y.min()
+    )
+
+    # Sorted by cell, every box is paired with the boxes that follow it in its cell.
+    order = np.lexsort((boxes, cells))
+    cells, boxes = cells[order], boxes[order]
+    firsts, seconds = [], []
+    for distance in range(1, len(cells)):
+        same_cell = cells[distance:] == cells[:-distance]
+        if not np.any(same_cell):
+            break
+        firsts.append(boxes[:-distance][same_cell])
+        seconds.append(boxes[distance:][same_cell])
+    if not firsts:
+        return np.empty((0, 2), dtype=np.int64)
+
+    # Boxes that share several cells are paired more than once.
+    keys = np.unique(np.concatenate(firsts) * count + np.concatenate(seconds))
+    a, b = keys // count, keys % count
+    overlap = np.all((mins[a] <= maxs[b]) & (mins[b] <= maxs[a]), axis=1)
+    return np.stack((a[overlap], b[overlap]), axis=-1)
+
+
+def colliding_pairs(
+    centers: np.ndarray,
+    headings: np.ndarray,
+    dimensions: np.ndarray,
+    margin: float = 0.0,
+    cell_size: Optional[float] = None,
+) -> np.ndarray:
+    """Find all pairs of overlapping oriented boxes.
+
+    Args:
+        centers: The (N, 2) centers of the boxes.
+        headings: The (N,) headings of the boxes.
+        dimensions: The (N, 2) `(length, width)` of the boxes.
+        margin: Boxes closer than this distance are considered to overlap.
+        cell_size: The size of the broadphase grid cells, see `grid_candidate_pairs`.
+
+    Returns:
+        A (K, 2) array of unique `(i, j)` pairs with `i < j`.
+    """
+    centers, headings, dimensions = _as_boxes(centers, headings, dimensions)
+    mins, maxs = bounding_boxes(centers, headings, dimensions + margin)
+    pairs = grid_candidate_pairs(mins, maxs, cell_size)
+    a, b = pairs[:, 0], pairs[:, 1]
+    overlap = boxes_overlap(
+        centers[a],
+        headings[a],
+        dimensions[a],
+        centers[b],
+        headings[b],
+        dimensions[b],
+        margin,
+    )
+    return pairs[overlap]
+
+
+def collisions_with(
+    indices: Sequence[int],
+    centers: np.ndarray,
+    headings: np.ndarray,
+    dimensions: np.ndarray,
+    margin: float = 0.0,
+) -> np.ndarray:
+    """Find the boxes that overlap with the boxes at the given indices.
+
+    Args:
+        indices: The boxes to find the collisions of.
+        centers: The (N, 2) centers of all boxes.
+        headings: The (N,) headings of all boxes.
+        dimensions: The (N, 2) `(length, width)` of all boxes.
+        margin: Boxes closer than this distance are considered to overlap.
+
+    Returns:
+        A (K, 2) array of `(index, other)` pairs, where `index` is one of the given
+        indices and `other` is the index of a different box that overlaps it.
+    """
+    centers, headings, dimensions = _as_boxes(centers, headings, dimensions)
+    pairs = colliding_pairs(centers, headings, dimensions, margin)
+    queried = np.zeros(len(centers), dtype=bool)
+    queried[np.asarray(indices, dtype=np.int64)] = True
+    return np.concatenate(
+        (pairs[queried[pairs[:, 0]]], pairs[queried[pairs[:, 1]]][:, ::-1])
+    )
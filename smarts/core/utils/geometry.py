@@ -19,14 +19,18 @@
 # THE SOFTWARE.
 
 import math
-from typing import List
+from typing import List, Sequence
 
 import numpy as np
+import shapely
 import trimesh
 from shapely.geometry import LineString, MultiPolygon, Polygon
 from shapely.geometry.base import CAP_STYLE, JOIN_STYLE
 from shapely.ops import triangulate
 
+# Shapely 2 provides vectorized operations over arrays of geometries.
+HAS_VECTORIZED_SHAPELY = hasattr(shapely, "distance")
+
 
 def buffered_shape(shape, width: float = 1.0) -> Polygon:
     """Generates a shape with a buffer of `width` around the original shape."""
@@ -45,6 +49,26 @@ def buffered_shape(shape, width: float = 1.0) -> Polygon:
     return ls
 
 
+def buffered_shapes(shapes: Sequence, widths: Sequence[float]) -> List[Polygon]:
+    """Generates the shapes of `buffered_shape` for many shapes at once."""
+    if not HAS_VECTORIZED_SHAPELY:
+        return [buffered_shape(shape, width) for shape, width in zip(shapes, widths)]
+
+    buffered = shapely.buffer(
+        np.array([LineString(shape) for shape in shapes], dtype=object),
+        np.asarray(widths, dtype=float) / 2,
+        quad_segs=1,
+        cap_style="flat",
+        join_style="round",
+        mitre_limit=5.0,
+    )
+    multi = shapely.get_type_id(buffered) == shapely.GeometryType.MULTIPOLYGON
+    buffered[multi] = shapely.convex_hull(buffered[multi])
+    if np.any(shapely.get_type_id(buffered) != shapely.GeometryType.POLYGON):
+        raise RuntimeError("Shapely `object.buffer` behavior may have changed.")
+    return list(buffered)
+
+
 def triangulate_polygon(polygon: Polygon):
     """Attempts to convert a polygon into triangles."""
     # XXX: shapely.ops.triangulate current creates a convex fill of triangles.
@@ -55,6 +79,26 @@ def triangulate_polygon(polygon: Polygon):
     ]
 
 
+def _triangulate_polygons(polygons: Sequence[Polygon]):
+    """The exterior coordinates of the triangles of `triangulate_polygon` for all of
+    the polygons, in order."""
+    if not HAS_VECTORIZED_SHAPELY:
+        return [
+            list(triangle.exterior.coords)
+            for polygon in polygons
+            for triangle in triangulate_polygon(polygon)
+        ]
+
+    polygons_array = np.empty(len(polygons), dtype=object)
+    polygons_array[:] = polygons
+    triangles, index = shapely.get_parts(
+        shapely.delaunay_triangles(polygons_array), return_index=True
+    )
+    inside = shapely.within(shapely.centroid(triangles), polygons_array[index])
+    coords = shapely.get_coordinates(shapely.get_exterior_ring(triangles[inside]))
+    return coords.reshape(-1, 4, 2).tolist()
+
+
 def generate_mesh_from_polygons(polygons: List[Polygon]) -> trimesh.Trimesh:
     """Creates a mesh out of a list of polygons."""
     vertices, faces = [], []
@@ -64,7 +108,6 @@ def generate_mesh_from_polygons(polygons: List[Polygon]) -> trimesh.Trimesh:
     # Trimesh's API require a list of vertices and a list of faces, where each
     # face contains three indexes into the vertices list. Ideally, the vertices
     # are all unique and the faces list references the same indexes as needed.
-    # TODO: Batch the polygon processing.
     for poly in polygons:
         # Collect all the points on the shape to reduce checks by 3 times
         for x, y in poly.exterior.coords:
@@ -73,14 +116,12 @@ def generate_mesh_from_polygons(polygons: List[Polygon]) -> trimesh.Trimesh:
                 vertices.append(p)
                 point_dict[p] = current_point_index
                 current_point_index += 1
-        triangles = triangulate_polygon(poly)
-        for triangle in triangles:
-            face = np.array(
-                [point_dict.get((x, y, 0), -1) for x, y in triangle.exterior.coords]
-            )
-            # Add face if not invalid
-            if -1 not in face:
-                faces.append(face)
+
+    for triangle_coords in _triangulate_polygons(polygons):
+        face = np.array([point_dict.get((x, y, 0), -1) for x, y in triangle_coords])
+        # Add face if not invalid
+        if -1 not in face:
+            faces.append(face)
 
     mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
 
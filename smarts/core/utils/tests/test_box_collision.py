@@ -0,0 +1,98 @@
+# MIT License
+#
+# Copyright (C) 2022. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+import numpy as np
+import pytest
+from shapely.affinity import rotate
+from shapely.geometry import box
+
+from smarts.core.utils.collision import colliding_pairs, collisions_with
+
+
+def _polygon(center, heading, dimensions):
+    length, width = dimensions
+    polygon = box(
+        center[0] - width * 0.5,
+        center[1] - length * 0.5,
+        center[0] + width * 0.5,
+        center[1] + length * 0.5,
+    )
+    return rotate(polygon, heading, use_radians=True)
+
+
+def test_collisions_with_matches_polygons():
+    rng = np.random.default_rng(42)
+    count = 200
+    centers = rng.uniform(0, 40, size=(count, 2))
+    headings = rng.uniform(-np.pi, np.pi, size=count)
+    dimensions = rng.uniform((2, 1), (8, 3), size=(count, 2))
+    indices = np.arange(0, count, 3)
+
+    pairs = collisions_with(indices, centers, headings, dimensions)
+
+    polygons = [_polygon(*box_) for box_ in zip(centers, headings, dimensions)]
+    expected = {
+        (index, other)
+        for index in indices
+        for other in range(count)
+        if other != index and polygons[index].intersects(polygons[other])
+    }
+    assert expected
+    assert set(map(tuple, pairs.tolist())) == expected
+
+
+@pytest.mark.parametrize("cell_size", [None, 0.5, 100])
+def test_colliding_pairs_matches_polygons(cell_size):
+    rng = np.random.default_rng(7)
+    count = 300
+    centers = rng.uniform(-30, 30, size=(count, 2))
+    headings = rng.uniform(-np.pi, np.pi, size=count)
+    dimensions = rng.uniform((2, 1), (12, 3), size=(count, 2))
+
+    pairs = colliding_pairs(centers, headings, dimensions, cell_size=cell_size)
+
+    polygons = [_polygon(*box_) for box_ in zip(centers, headings, dimensions)]
+    expected = {
+        (i, j)
+        for i in range(count)
+        for j in range(i + 1, count)
+        if polygons[i].intersects(polygons[j])
+    }
+    assert expected
+    assert len(pairs) == len(expected)
+    assert set(map(tuple, pairs.tolist())) == expected
+
+
+def test_colliding_pairs_of_few_boxes():
+    assert colliding_pairs([], [], []).shape == (0, 2)
+    assert colliding_pairs([(0, 0)], [0], [(5, 2)]).shape == (0, 2)
+    pairs = colliding_pairs([(0, 0), (0, 0)], [0, 1], [(5, 2), (5, 2)])
+    assert pairs.tolist() == [[0, 1]]
+
+
+def test_collisions_with_margin():
+    centers = [(0, 0), (0, 5.04), (3.6, 0)]
+    headings = [0, 0, np.pi * 0.5]
+    dimensions = [(5, 2), (5, 2), (5, 2)]
+
+    assert len(collisions_with([0], centers, headings, dimensions)) == 0
+    pairs = collisions_with([0], centers, headings, dimensions, margin=0.05)
+    assert pairs.tolist() == [[0, 1]]
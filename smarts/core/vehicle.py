@@ -262,6 +262,7 @@ class Vehicle:
     def state(self) -> VehicleState:
         """The current state of this vehicle."""
         self._assert_initialized()
+        linear_velocity, angular_velocity = self._chassis.velocity_vectors
         return VehicleState(
             vehicle_id=self.id,
             vehicle_type=self.vehicle_type,
@@ -274,8 +275,8 @@ class Vehicle:
             # pytype: enable=attribute-error
             yaw_rate=self._chassis.yaw_rate,
             source="SMARTS",
-            linear_velocity=self._chassis.velocity_vectors[0],
-            angular_velocity=self._chassis.velocity_vectors[1],
+            linear_velocity=linear_velocity,
+            angular_velocity=angular_velocity,
         )
 
     @property
@@ -427,7 +428,7 @@ class Vehicle:
                 pose=start_pose,
                 speed=initial_speed,
                 dimensions=chassis_dims,
-                bullet_client=sim.bc,
+                bullet_client=None if sim.kinematic else sim.bc,
             )
 
         vehicle = Vehicle(
@@ -450,7 +451,7 @@ class Vehicle:
             pose=vehicle_state.pose,
             speed=vehicle_state.speed,
             dimensions=dims,
-            bullet_client=sim.bc,
+            bullet_client=None if sim.kinematic else sim.bc,
         )
         return Vehicle(
             id=vehicle_id, chassis=chassis, vehicle_config_type=vehicle_config_type
@@ -504,7 +505,11 @@ class Vehicle:
                 )
             )
 
-        if agent_interface.drivable_area_grid_map:
+        # Sensors of observation fields the agent does not read are not attached, so
+        # that their cameras are not rendered.
+        if agent_interface.drivable_area_grid_map and agent_interface.requires(
+            "drivable_area_grid_map"
+        ):
             if not sim.renderer:
                 raise RendererException.required_to("add a drivable_area_grid_map")
             vehicle.attach_drivable_area_grid_map_sensor(
@@ -516,7 +521,7 @@ class Vehicle:
                     renderer=sim.renderer,
                 )
             )
-        if agent_interface.ogm:
+        if agent_interface.ogm and agent_interface.requires("occupancy_grid_map"):
             if not sim.renderer:
                 raise RendererException.required_to("add an OGM")
             vehicle.attach_ogm_sensor(
@@ -528,7 +533,7 @@ class Vehicle:
                     renderer=sim.renderer,
                 )
             )
-        if agent_interface.rgb:
+        if agent_interface.rgb and agent_interface.requires("top_down_rgb"):
             if not sim.renderer:
                 raise RendererException.required_to("add an RGB camera")
             vehicle.attach_rgb_sensor(
@@ -540,7 +545,7 @@ class Vehicle:
                     renderer=sim.renderer,
                 )
             )
-        if agent_interface.lidar:
+        if agent_interface.lidar and agent_interface.requires("lidar_point_cloud"):
             vehicle.attach_lidar_sensor(
                 LidarSensor(
                     vehicle=vehicle,
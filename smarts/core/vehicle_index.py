@@ -333,12 +333,12 @@ class VehicleIndex:
     @clear_cache
     def sync(self):
         """Update the state of the index."""
-        for vehicle_id, vehicle in self._vehicles.items():
-            v_index = self._controlled_by["vehicle_id"] == vehicle_id
-            entity = _ControlEntity(*self._controlled_by[v_index][0])
-            self._controlled_by[v_index] = tuple(
-                entity._replace(position=vehicle.position)
-            )
+        # Write the positions row by row instead of searching the rows of every vehicle.
+        positions = self._controlled_by["position"]
+        for row, vehicle_id in enumerate(self._controlled_by["vehicle_id"].tolist()):
+            vehicle = self._vehicles.get(vehicle_id)
+            if vehicle is not None:
+                positions[row] = vehicle.position
 
     @clear_cache
     def teardown(self):
@@ -437,7 +437,7 @@ class VehicleIndex:
                 pose=vehicle.pose,
                 speed=vehicle.speed,
                 dimensions=vehicle.state.dimensions,
-                bullet_client=sim.bc,
+                bullet_client=None if sim.kinematic else sim.bc,
             )
 
         vehicle.swap_chassis(chassis)
@@ -487,7 +487,7 @@ class VehicleIndex:
             pose=vehicle.chassis.pose,
             speed=vehicle.chassis.speed,
             dimensions=vehicle.chassis.dimensions,
-            bullet_client=sim.bc,
+            bullet_client=None if sim.kinematic else sim.bc,
         )
         vehicle.swap_chassis(box_chassis)
 
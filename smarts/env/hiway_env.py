@@ -61,6 +61,7 @@ class HiWayEnv(gym.Env):
         timestep_sec: Optional[
             float
         ] = None,  # for backwards compatibility (deprecated)
+        zoo_agents_per_worker: int = 1,
     ):
         """
         Args:
@@ -99,6 +100,9 @@ class HiWayEnv(gym.Env):
                 to None.
             timestep_sec (Optional[float], optional): [description]. Defaults
                 to None.
+            zoo_agents_per_worker (int, optional): Number of social agents each
+                zoo worker process hosts. Above 1, social agents running the
+                same policy are co-located and act in batches. Defaults to 1.
         """
 
         self._log = logging.getLogger(self.__class__.__name__)
@@ -170,6 +174,7 @@ class HiWayEnv(gym.Env):
             visdom=visdom_client,
             fixed_timestep_sec=fixed_timestep_sec,
             zoo_addrs=zoo_addrs,
+            zoo_agents_per_worker=zoo_agents_per_worker,
         )
 
     @property
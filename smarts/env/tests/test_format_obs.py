@@ -21,6 +21,7 @@
 import dataclasses
 
 import gym
+import numpy as np
 import pytest
 
 from smarts.core.agent import Agent
@@ -168,3 +169,41 @@ def test_observation(make_env):
         _check_observation(rcv_space[agent_id], ob)
 
     env.close()
+
+
+@pytest.mark.parametrize("make_env", _intrfcs_obs(), indirect=True)
+def test_batched_observation(make_env):
+    base_env, _ = make_env
+    env = FormatObs(env=base_env)
+    batched_env = FormatObs(env=base_env, batched=True)
+    rcv_space = batched_env.observation_space
+
+    # Test whether batched observations match the per-agent observations
+    base_obs = base_env.reset()
+    del base_obs[batched_env.agent_ids[-1]]
+    obs = env.observation(base_obs)
+    batched_obs = batched_env.observation(base_obs)
+    for field1, val1 in batched_obs.items():
+        if isinstance(val1, dict):
+            for field2, val2 in val1.items():
+                assert val2.shape == rcv_space[field1][field2].shape
+                assert val2.dtype == rcv_space[field1][field2].dtype
+        else:
+            assert val1.shape == rcv_space[field1].shape
+            assert val1.dtype == rcv_space[field1].dtype
+
+    for idx, agent_id in enumerate(batched_env.agent_ids):
+        assert batched_obs["active"][idx] == (agent_id in obs)
+        for field1, val1 in batched_obs.items():
+            if field1 == "active":
+                continue
+            if not isinstance(val1, dict):
+                val1 = {None: val1}
+            for field2, val2 in val1.items():
+                if agent_id not in obs:
+                    assert not np.any(val2[idx])
+                    continue
+                std_val = getattr(obs[agent_id], field1)
+                if field2 is not None:
+                    std_val = std_val[field2]
+                assert np.allclose(val2[idx], std_val)
@@ -65,16 +65,17 @@ def env(agent_specs):
     env.close()
 
 
-@pytest.mark.parametrize("num_stack", [1, 2])
-def test_frame_stack(env, agent_specs, num_stack):
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("num_stack", [1, 2, 3])
+def test_frame_stack(env, agent_specs, num_stack, lazy):
     # Test invalid num_stack inputs
     if num_stack <= 1:
         with pytest.raises(Exception):
-            env = FrameStack(env, num_stack)
+            env = FrameStack(env, num_stack, lazy=lazy)
         return
 
     # Wrap env with FrameStack to stack multiple observations
-    env = FrameStack(env, num_stack)
+    env = FrameStack(env, num_stack, lazy=lazy)
     agents = {
         agent_id: agent_spec.build_agent()
         for agent_id, agent_spec in agent_specs.items()
@@ -94,15 +95,55 @@ def test_frame_stack(env, agent_specs, num_stack):
     actions = {
         agent_id: agents[agent_id].act(agent_obs) for agent_id, agent_obs in obs.items()
     }
+    previous_obs = obs
     obs, _, _, _ = env.step(actions)
     assert len(obs) == len(agents)
     for agent_id, agent_obs in obs.items():
         rgb = agent_specs[agent_id].interface.rgb
         agent_obs = np.asarray(agent_obs)
         assert agent_obs.shape == (num_stack, rgb.width, rgb.height, 3)
-        for i in range(1, num_stack - 1):
+        for i in range(2, num_stack):
             assert np.allclose(agent_obs[i - 1], agent_obs[i])
         if num_stack > 1:
-            assert not np.allclose(agent_obs[-1], agent_obs[-2])
+            assert not np.allclose(agent_obs[0], agent_obs[1])
+
+    # Test whether lazy stacks share frames instead of copying them
+    for agent_id, agent_obs in obs.items():
+        assert (agent_obs[1] is previous_obs[agent_id][0]) == lazy
 
     env.close()
+
+
+class _JoiningAgentEnv(gym.Env):
+    """Observes "AGENT_001" from reset and "AGENT_002" from the first step."""
+
+    agent_specs = {"AGENT_001": None, "AGENT_002": None}
+    observation_space = None
+
+    def reset(self):
+        self._step = 0
+        return {"AGENT_001": np.zeros(1)}
+
+    def step(self, agent_actions):
+        self._step += 1
+        obs = {agent_id: np.full(1, self._step) for agent_id in self.agent_specs}
+        return obs, {}, {}, {}
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_frame_stack_agent_joining_mid_episode(lazy):
+    num_stack = 3
+    env = FrameStack(_JoiningAgentEnv(), num_stack, lazy=lazy)
+
+    for _ in range(2):
+        obs = env.reset()
+        assert list(obs) == ["AGENT_001"]
+        assert np.asarray(obs["AGENT_001"]).tolist() == [[0]] * num_stack
+
+        # A joining agent's stack is filled with its first observation
+        obs, _, _, _ = env.step({})
+        assert np.asarray(obs["AGENT_001"]).tolist() == [[1], [0], [0]]
+        assert np.asarray(obs["AGENT_002"]).tolist() == [[1]] * num_stack
+
+        obs, _, _, _ = env.step({})
+        assert np.asarray(obs["AGENT_002"]).tolist() == [[2], [1], [1]]
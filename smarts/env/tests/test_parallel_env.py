@@ -21,6 +21,7 @@
 # THE SOFTWARE.
 
 import gym
+import numpy as np
 
 gym.logger.set_level(40)
 import pytest
@@ -187,3 +188,79 @@ def test_sync_async_episodes(env_constructor, single_env_actions, auto_reset):
         assert all(dones["__all__"] == True for dones in batched_dones)
     finally:
         env.close()
+
+
+@pytest.mark.parametrize("num_env", [2])
+def test_shared_memory(env_constructor, single_env_actions, num_env):
+    env = ParallelEnv(
+        env_constructors=[env_constructor] * num_env,
+        auto_reset=True,
+        shared_memory=True,
+    )
+    try:
+        single_env = env_constructor()
+        single_observations = single_env.reset()
+        single_env.close()
+
+        batched_observations = env.reset()
+        _compare_observations(num_env, batched_observations, single_observations)
+
+        batched_observations, _, _, _ = env.step([single_env_actions] * num_env)
+        _compare_observations(num_env, batched_observations, single_observations)
+
+        buffers = env.shared_observation_buffers
+        assert buffers.keys() == {(agent_id,) for agent_id in single_observations}
+        for index, observations in enumerate(batched_observations):
+            for agent_id, obs in observations.items():
+                assert np.shares_memory(obs, buffers[(agent_id,)])
+                assert np.array_equal(obs, buffers[(agent_id,)][index])
+    finally:
+        env.close()
+
+
+def test_step_async(env_constructor, single_env_actions):
+    num_env = 3
+    env = _make_parallel_env(env_constructor, num_env)
+    try:
+        env.reset()
+        env.step_async([single_env_actions] * 2, env_indices=[0, 2])
+        with pytest.raises(ValueError):
+            env.step_async([single_env_actions], env_indices=[2])
+
+        env_indices, observations, rewards, dones, infos = env.step_wait_ready(
+            num_ready=1
+        )
+        assert 1 <= len(env_indices) <= 2
+        assert set(env_indices) <= {0, 2}
+        assert len(observations) == len(rewards) == len(dones) == len(env_indices)
+
+        observations, _, _, _ = env.step_wait()
+        assert len(observations) == 2 - len(env_indices)
+
+        observations, _, _, _ = env.step([single_env_actions] * num_env)
+        assert len(observations) == num_env
+    finally:
+        env.close()
+
+
+def test_envs_per_process(env_constructor, single_env_actions):
+    num_env = 3
+    env = ParallelEnv(
+        env_constructors=[env_constructor] * num_env,
+        auto_reset=True,
+        envs_per_process=2,
+    )
+    try:
+        assert env.batch_size == num_env
+        seeds = env.seed(7)
+        assert seeds == [7, 8, 9]
+
+        batched_observations = env.reset()
+        assert len(batched_observations) == num_env
+
+        batched_observations, _, batched_dones, _ = env.step(
+            [single_env_actions] * num_env
+        )
+        assert len(batched_observations) == len(batched_dones) == num_env
+    finally:
+        env.close()
@@ -0,0 +1,165 @@
+# MIT License
+#
+# Copyright (C) 2022. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import gym
+import numpy as np
+
+gym.logger.set_level(40)
+import pytest
+
+from smarts.core.agent_interface import AgentInterface
+from smarts.core.controllers import ActionSpaceType
+from smarts.env.hiway_env import HiWayEnv
+from smarts.env.wrappers.vector_env import VectorEnv
+from smarts.zoo.agent_spec import AgentSpec
+
+AGENT_IDS = ["Agent_2", "Agent_1"]
+NUM_ENVS = 2
+MAX_EPISODE_STEPS = 3
+
+
+@pytest.fixture(scope="module")
+def env_constructor():
+    agent_specs = {
+        agent_id: AgentSpec(
+            interface=AgentInterface(
+                waypoints=True,
+                action=ActionSpaceType.Lane,
+                max_episode_steps=MAX_EPISODE_STEPS,
+            )
+        )
+        for agent_id in AGENT_IDS
+    }
+    return lambda: HiWayEnv(
+        scenarios=["scenarios/figure_eight"],
+        agent_specs=agent_specs,
+        headless=True,
+    )
+
+
+def test_vector_env(env_constructor):
+    env = VectorEnv(
+        [env_constructor] * NUM_ENVS,
+        observation_adapter=lambda obs: obs,
+        reward_adapter=lambda obs, rewards: rewards * obs["active"],
+    )
+    assert env.batch_size == NUM_ENVS
+    assert env.agent_ids == sorted(AGENT_IDS)
+
+    observations = env.reset()
+    assert observations["active"].shape == (NUM_ENVS, len(AGENT_IDS))
+    assert np.all(observations["active"])
+    assert observations["ego"]["pos"].shape == (NUM_ENVS, len(AGENT_IDS), 3)
+    assert observations["waypoints"]["pos"].shape[:2] == (NUM_ENVS, len(AGENT_IDS))
+
+    actions = np.full((NUM_ENVS, len(AGENT_IDS)), "keep_lane")
+    # The observation on reset counts as the first step of the episode
+    for step in range(2, MAX_EPISODE_STEPS + 1):
+        observations, rewards, dones, infos = env.step(actions)
+        assert rewards.shape == dones.shape == (NUM_ENVS, len(AGENT_IDS))
+        assert np.all(rewards > 0)
+        assert len(infos) == NUM_ENVS
+        episode_done = step == MAX_EPISODE_STEPS
+        assert np.all(dones == episode_done)
+        assert all(info["__all__"] == episode_done for info in infos)
+
+    # Auto reset starts a new episode
+    assert np.all(observations["active"])
+    assert np.all(observations["dist"] == 0)
+
+    env.close()
+
+
+def test_vector_env_rewards_final_observations(env_constructor):
+    rewarded_dists = []
+
+    def reward_adapter(obs, rewards):
+        rewarded_dists.append(obs["dist"].copy())
+        return obs["dist"].copy()
+
+    env = VectorEnv([env_constructor] * NUM_ENVS, reward_adapter=reward_adapter)
+    env.reset()
+    actions = np.full((NUM_ENVS, len(AGENT_IDS)), "keep_lane")
+    for _ in range(2, MAX_EPISODE_STEPS + 1):
+        observations, rewards, dones, infos = env.step(actions)
+    env.close()
+
+    # The last rewards are computed before the auto reset clears the distance.
+    assert np.all(dones)
+    assert np.all(rewarded_dists[-1] > 0)
+    assert np.all(rewards == rewarded_dists[-1])
+    assert np.all(observations["dist"] == 0)
+
+
+def test_mismatched_agents(env_constructor):
+    other_constructor = lambda: HiWayEnv(
+        scenarios=["scenarios/figure_eight"],
+        agent_specs={
+            "Agent_3": AgentSpec(interface=AgentInterface(action=ActionSpaceType.Lane))
+        },
+        headless=True,
+    )
+    with pytest.raises(ValueError):
+        VectorEnv([env_constructor, other_constructor])
+
+
+def test_vector_env_without_auto_reset(env_constructor, monkeypatch):
+    env = VectorEnv([env_constructor] * NUM_ENVS, auto_reset=False)
+    env.reset()
+    actions = np.full((NUM_ENVS, len(AGENT_IDS)), "keep_lane")
+    for _ in range(2, MAX_EPISODE_STEPS + 1):
+        observations, rewards, dones, infos = env.step(actions)
+    assert np.all(env.env_dones)
+    last = (observations["dist"].copy(), rewards.copy(), dones.copy(), infos)
+
+    # Ended environments are skipped and keep their last outputs
+    for wrapped_env in env._envs:
+        monkeypatch.setattr(wrapped_env, "step", None)
+    observations, rewards, dones, infos = env.step(actions)
+    assert np.all(observations["dist"] == last[0])
+    assert np.all(rewards == last[1])
+    assert np.all(dones == last[2])
+    assert infos == last[3]
+
+    env.reset()
+    assert not np.any(env.env_dones)
+    env.close()
+
+
+@pytest.mark.parametrize("adapter", ["observation_adapter", "reward_adapter"])
+def test_custom_agent_adapters(adapter):
+    adapters = {
+        "observation_adapter": lambda obs: obs,
+        "reward_adapter": lambda obs, reward: reward,
+    }
+    env_constructor = lambda: HiWayEnv(
+        scenarios=["scenarios/figure_eight"],
+        agent_specs={
+            "Agent_1": AgentSpec(
+                interface=AgentInterface(action=ActionSpaceType.Lane),
+                **{adapter: adapters[adapter]},
+            )
+        },
+        headless=True,
+    )
+    with pytest.raises(ValueError):
+        VectorEnv([env_constructor])
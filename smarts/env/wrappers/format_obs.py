@@ -24,6 +24,7 @@ from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import gym
 import numpy as np
+from gym.vector.utils import batch_space, create_empty_array
 
 from smarts.core.events import Events
 from smarts.core.road_map import Waypoint
@@ -202,17 +203,28 @@ class FormatObs(gym.ObservationWrapper):
     and returns `StdObs`. The observation set returned depends on the features
     enabled via AgentInterface.
 
+    In batched mode, the observations of all agents are instead written into
+    arrays with a leading agent dimension, ordered as in `agent_ids`. The
+    returned dictionary mirrors the fields of `StdObs` and adds an `active`
+    array, which is 0 for agents without an observation in the current step.
+    Their rows are zeroed. Optional fields that an agent did not observe, such
+    as neighbors when there are none, are zeroed as well.
+
     Note:
         (a) FormatObs wrapper requires all agents must have the same
             AgentInterface attributes.
         (b) Observation adapters should not be used inside the `step` and
             `reset` methods of the base environment.
+        (c) In batched mode, the same arrays are returned and overwritten every
+            step. Copy them to keep an observation.
     """
 
-    def __init__(self, env: gym.Env):
+    def __init__(self, env: gym.Env, batched: bool = False):
         """
         Args:
             env (gym.Env): SMARTS environment to be wrapped.
+            batched (bool, optional): Return all agents' observations as one
+                dictionary of batched arrays. Defaults to False.
 
         Raises:
             AssertionError: If all agents do not have the same AgentInterface.
@@ -236,9 +248,25 @@ class FormatObs(gym.ObservationWrapper):
                 intrfcs.update({intrfc: val})
 
         space = _make_space(intrfcs)
-        self.observation_space = gym.spaces.Dict(
-            {agent_id: gym.spaces.Dict(space) for agent_id in self.agent_specs.keys()}
-        )
+        self._batched = batched
+        if batched:
+            self.agent_ids = sorted(self.agent_specs.keys())
+            self.observation_space = gym.spaces.Dict(
+                {
+                    **batch_space(gym.spaces.Dict(space), len(self.agent_ids)).spaces,
+                    "active": gym.spaces.MultiBinary(len(self.agent_ids)),
+                }
+            )
+            self._buffers = create_empty_array(
+                self.observation_space, n=None, fn=np.zeros
+            )
+        else:
+            self.observation_space = gym.spaces.Dict(
+                {
+                    agent_id: gym.spaces.Dict(space)
+                    for agent_id in self.agent_specs.keys()
+                }
+            )
 
         self._obs = {
             "dagm": "drivable_area_grid_map",
@@ -252,6 +280,12 @@ class FormatObs(gym.ObservationWrapper):
             "ttc": "ttc",
             "waypoints": "waypoint_paths",
         }
+        prefix = "_batch_" if batched else "_std_"
+        self._funcs = {
+            stdob: globals()[prefix + stdob]
+            for stdob in self._obs
+            if not batched or stdob in space
+        }
 
     def _cmp_intrfc(self, intrfc: str, val: Any):
         assert all(
@@ -266,20 +300,40 @@ class FormatObs(gym.ObservationWrapper):
 
         Note: Users should not directly call this method.
         """
+        if self._batched:
+            return self._batch_observation(obs)
+
         wrapped_obs = {}
         for agent_id, agent_obs in obs.items():
             wrapped_ob = {}
-            for stdob, ob in self._obs.items():
-                func = globals()[f"_std_{stdob}"]
+            for stdob, func in self._funcs.items():
                 if stdob == "ttc":
                     val = func(obs[agent_id])
                 else:
-                    val = func(getattr(agent_obs, ob))
+                    val = func(getattr(agent_obs, self._obs[stdob]))
                 wrapped_ob.update({stdob: val})
             wrapped_obs.update({agent_id: StdObs(**wrapped_ob)})
 
         return wrapped_obs
 
+    def _batch_observation(self, obs: Dict[str, Any]) -> Dict[str, Any]:
+        buffers = self._buffers
+        for idx, agent_id in enumerate(self.agent_ids):
+            agent_obs = obs.get(agent_id)
+            buffers["active"][idx] = agent_obs is not None
+            if agent_obs is None:
+                for stdob in self._funcs:
+                    _zero_row(buffers[stdob], idx)
+                continue
+
+            for stdob, func in self._funcs.items():
+                if stdob == "ttc":
+                    func(buffers[stdob], idx, agent_obs)
+                else:
+                    func(buffers[stdob], idx, getattr(agent_obs, self._obs[stdob]))
+
+        return buffers
+
 
 def intrfc_to_stdobs(intrfc: str) -> Optional[str]:
     """Returns formatted observation name corresponding to the
@@ -601,3 +655,129 @@ def _std_waypoints(
         "pos": pos,
         "speed_limit": speed_limit,
     }
+
+
+def _zero_row(buffer: Union[np.ndarray, Dict[str, np.ndarray]], idx: int):
+    if isinstance(buffer, dict):
+        for val in buffer.values():
+            val[idx] = 0
+    else:
+        buffer[idx] = 0
+
+
+def _batch_dagm(buffer: np.ndarray, idx: int, val: Optional[DrivableAreaGridMap]):
+    buffer[idx] = val.data if val else 0
+
+
+def _batch_dist(buffer: np.ndarray, idx: int, val: float):
+    buffer[idx] = val
+
+
+def _batch_ego(buffer: Dict[str, np.ndarray], idx: int, val: EgoVehicleObservation):
+    if val.angular_acceleration is None:
+        buffer["angular_acceleration"][idx] = 0
+        buffer["angular_jerk"][idx] = 0
+        buffer["linear_acceleration"][idx] = 0
+        buffer["linear_jerk"][idx] = 0
+    else:
+        buffer["angular_acceleration"][idx] = val.angular_acceleration
+        buffer["angular_jerk"][idx] = val.angular_jerk
+        buffer["linear_acceleration"][idx] = val.linear_acceleration
+        buffer["linear_jerk"][idx] = val.linear_jerk
+
+    buffer["angular_velocity"][idx] = val.angular_velocity
+    buffer["box"][idx] = val.bounding_box.as_lwh
+    buffer["heading"][idx] = val.heading
+    buffer["lane_index"][idx] = val.lane_index
+    buffer["linear_velocity"][idx] = val.linear_velocity
+    buffer["pos"][idx] = val.position
+    buffer["speed"][idx] = val.speed
+    buffer["steering"][idx] = val.steering
+    buffer["yaw_rate"][idx] = val.yaw_rate
+
+
+def _batch_events(buffer: Dict[str, np.ndarray], idx: int, val: Events):
+    buffer["agents_alive_done"][idx] = val.agents_alive_done
+    buffer["collisions"][idx] = len(val.collisions) > 0
+    buffer["not_moving"][idx] = val.not_moving
+    buffer["off_road"][idx] = val.off_road
+    buffer["off_route"][idx] = val.off_route
+    buffer["on_shoulder"][idx] = val.on_shoulder
+    buffer["reached_goal"][idx] = val.reached_goal
+    buffer["reached_max_episode_steps"][idx] = val.reached_max_episode_steps
+    buffer["wrong_way"][idx] = val.wrong_way
+
+
+def _batch_lidar(
+    buffer: Dict[str, np.ndarray],
+    idx: int,
+    val: Optional[
+        Tuple[List[np.ndarray], List[np.ndarray], List[Tuple[np.ndarray, np.ndarray]]]
+    ],
+):
+    if not val:
+        _zero_row(buffer, idx)
+        return
+
+    buffer["hit"][idx] = val[1]
+    point_cloud = buffer["point_cloud"][idx]
+    point_cloud[:] = val[0]
+    np.nan_to_num(point_cloud, copy=False, nan=0, posinf=0, neginf=0)
+    rays = np.asarray(val[2], dtype=np.float64)
+    buffer["ray_origin"][idx] = rays[:, 0]
+    buffer["ray_vector"][idx] = rays[:, 1]
+
+
+def _batch_neighbors(
+    buffer: Dict[str, np.ndarray],
+    idx: int,
+    nghbs: Optional[List[VehicleObservation]],
+):
+    nghbs = (nghbs or [])[:_NEIGHBOR_SHP]
+    num = len(nghbs)
+    if num > 0:
+        buffer["box"][idx, :num] = [nghb.bounding_box.as_lwh for nghb in nghbs]
+        buffer["heading"][idx, :num] = [nghb.heading for nghb in nghbs]
+        buffer["lane_index"][idx, :num] = [nghb.lane_index for nghb in nghbs]
+        buffer["pos"][idx, :num] = [nghb.position for nghb in nghbs]
+        buffer["speed"][idx, :num] = [nghb.speed for nghb in nghbs]
+    for val in buffer.values():
+        val[idx, num:] = 0
+
+
+def _batch_ogm(buffer: np.ndarray, idx: int, val: Optional[OccupancyGridMap]):
+    buffer[idx] = val.data if val else 0
+
+
+def _batch_rgb(buffer: np.ndarray, idx: int, val: Optional[TopDownRGB]):
+    buffer[idx] = val.data if val else 0
+
+
+def _batch_ttc(buffer: Dict[str, np.ndarray], idx: int, obs: Observation):
+    if not obs.neighborhood_vehicle_states or not obs.waypoint_paths:
+        _zero_row(buffer, idx)
+        return
+
+    val = lane_ttc(obs)
+    buffer["angle_error"][idx] = val["angle_error"][0]
+    buffer["distance_from_center"][idx] = val["distance_from_center"][0]
+    buffer["dtc"][idx] = val["ego_lane_dist"]
+    buffer["ttc"][idx] = val["ego_ttc"]
+
+
+def _batch_waypoints(
+    buffer: Dict[str, np.ndarray],
+    idx: int,
+    paths: Optional[List[List[Waypoint]]],
+):
+    _zero_row(buffer, idx)
+    for path_idx, path in enumerate((paths or [])[: _WAYPOINT_SHP[0]]):
+        path = path[: _WAYPOINT_SHP[1]]
+        num = len(path)
+        if num == 0:
+            continue
+        buffer["heading"][idx, path_idx, :num] = [wp.heading for wp in path]
+        buffer["lane_index"][idx, path_idx, :num] = [wp.lane_index for wp in path]
+        buffer["lane_width"][idx, path_idx, :num] = [wp.lane_width for wp in path]
+        buffer["pos"][idx, path_idx, :num, :2] = [wp.pos for wp in path]
+        buffer["speed_limit"][idx, path_idx, :num] = [wp.speed_limit for wp in path]
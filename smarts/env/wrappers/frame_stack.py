@@ -22,34 +22,76 @@
 
 import copy
 from collections import defaultdict, deque
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Sequence, Tuple, Union
 
 import gym
+import numpy as np
 
 from smarts.core import sensors
 
 
+class LazyFrames(Sequence):
+    """An immutable stack of frames, newest first, as returned by `FrameStack` with
+    `lazy=True`. The frames are shared with the `FrameStack` and with the other
+    stacks that contain them instead of being copied, so they must not be modified.
+    `np.asarray(lazy_frames)` stacks array frames into a single array.
+    """
+
+    __slots__ = ("_frames", "_head")
+
+    def __init__(self, frames: Tuple, head: int):
+        self._frames = frames
+        self._head = head
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if not -len(self) <= index < len(self):
+            raise IndexError("LazyFrames index out of range")
+        return self._frames[(self._head - index) % len(self._frames)]
+
+    def __array__(self, dtype=None):
+        frames = np.stack(list(self))
+        return frames if dtype is None else frames.astype(dtype)
+
+    def __repr__(self):
+        return f"LazyFrames({list(self)})"
+
+
 class FrameStack(gym.Wrapper):
     """Wrapper stacks num_stack (default=3) consecutive frames, in a moving-window
     fashion, and returns the stacked_frames.
 
     Note:
-        Wrapper returns a deepcopy of the stacked frames, which may be expensive
-        for large frames and large num_stack values.
+        Unless `lazy`, wrapper returns a deepcopy of the stacked frames, which may be
+        expensive for large frames and large num_stack values.
     """
 
-    def __init__(self, env: gym.Env, num_stack: int = 3):
+    def __init__(self, env: gym.Env, num_stack: int = 3, lazy: bool = False):
         """
         Args:
             env (gym.Env): Gym environment to be wrapped.
             num_stack (int, optional): Number of frames to be stacked. Defaults to 3.
+            lazy (bool, optional): Keep each frame once in a ring buffer and return
+                `LazyFrames` that share them, instead of deep copies. Defaults to
+                False.
         """
         assert num_stack > 1, f"Expected num_stack > 1, but got {num_stack}."
         super(FrameStack, self).__init__(env)
         self._num_stack = num_stack
+        self._lazy = lazy
         self._frames = {
             key: deque(maxlen=self._num_stack) for key in self.env.agent_specs.keys()
         }
+        # Ring buffers of frames and the index of their newest frame. An agent has
+        # no head until its first frame, which fills its ring buffer.
+        self._ring_buffers = {
+            key: [None] * self._num_stack for key in self.env.agent_specs.keys()
+        }
+        self._heads = {}
 
         if self.observation_space:
             self.observation_space = gym.spaces.Dict(
@@ -64,15 +106,38 @@ class FrameStack(gym.Wrapper):
     ) -> Dict[str, List[sensors.Observation]]:
         """Update and return frames stack with given latest single frame."""
 
+        if self._lazy:
+            return self._get_lazy_observations(frame)
+
         new_frames = defaultdict(list)
 
         for agent_id, observation in frame.items():
+            # The first frame of an agent fills its stack.
+            if not self._frames[agent_id]:
+                self._frames[agent_id].extend([observation] * (self._num_stack - 1))
             self._frames[agent_id].appendleft(observation)
             frames_list = list(self._frames[agent_id])
             new_frames[agent_id] = copy.deepcopy(frames_list)
 
         return dict(new_frames)
 
+    def _get_lazy_observations(
+        self, frame: Dict[str, sensors.Observation]
+    ) -> Dict[str, LazyFrames]:
+        new_frames = {}
+        for agent_id, observation in frame.items():
+            ring_buffer = self._ring_buffers[agent_id]
+            if agent_id not in self._heads:
+                ring_buffer[:] = [observation] * self._num_stack
+                self._heads[agent_id] = 0
+            head = (self._heads[agent_id] + 1) % self._num_stack
+            ring_buffer[head] = observation
+            self._heads[agent_id] = head
+            # Only references are copied, the frames are shared.
+            new_frames[agent_id] = LazyFrames(tuple(ring_buffer), head)
+
+        return new_frames
+
     def step(
         self, agent_actions: Dict
     ) -> Tuple[
@@ -102,8 +167,8 @@ class FrameStack(gym.Wrapper):
             Dict[str, List[sensors.Observation]]: Observation upon reset for each agent.
         """
         env_observations = super(FrameStack, self).reset()
-        for agent_id, observation in env_observations.items():
-            for _ in range(self._num_stack - 1):
-                self._frames[agent_id].appendleft(observation)
+        for frames in self._frames.values():
+            frames.clear()
+        self._heads.clear()
 
         return self._get_observations(env_observations)
@@ -20,15 +20,34 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import math
 import multiprocessing as mp
+import multiprocessing.connection
 import sys
 import traceback
 import warnings
 from enum import Enum
-from typing import Any, Callable, Dict, Sequence, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import cloudpickle
 import gym
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory as mp_shared_memory
+except ImportError:
+    # `multiprocessing.shared_memory` is only available from python 3.8 onwards.
+    mp_shared_memory = None
 
 __all__ = ["ParallelEnv"]
 
@@ -44,16 +63,41 @@ class _Message(Enum):
     RESULT = 5
     CLOSE = 6
     EXCEPTION = 7
+    SHARE = 8
+
+
+class _SharedLeaf:
+    """Placeholder for an observation array which was written to shared memory."""
+
+    pass
+
+
+ObservationPath = Tuple[Any, ...]
 
 
 class ParallelEnv(object):
-    """Batch together multiple environments and step them in parallel. Each environment
-    is simulated in an external process for lock-free parallelism using `multiprocessing`
+    """Batch together multiple environments and step them in parallel. Environments
+    are simulated in external processes for lock-free parallelism using `multiprocessing`
     processes, and pipes for communication.
 
     Note:
-        Simulation might slow down when number of parallel environments requested
+        Simulation might slow down when number of worker processes requested
         exceed number of available CPUs.
+
+    Note:
+        With `envs_per_process > 1`, each worker process hosts several environments
+        and steps them one after the other. Environments in the same process share
+        process level caches, such as the road map and its lanepoints when they use
+        the same map, which reduces the memory used per environment.
+
+    Note:
+        With `shared_memory=True`, the numpy arrays found in the (nested dictionary)
+        observations of the first `reset()` determine a fixed layout. From then on,
+        workers write matching arrays into preallocated shared memory instead of
+        pickling them through the pipes, and the returned observations hold views into
+        that shared memory. These views are overwritten by the next `reset()` or
+        `step()`; copy them if they need to be kept. Arrays which do not match the
+        layout, and all non-array data, are still sent through the pipes.
     """
 
     def __init__(
@@ -61,6 +105,8 @@ class ParallelEnv(object):
         env_constructors: Sequence[EnvConstructor],
         auto_reset: bool,
         seed: int = 42,
+        shared_memory: bool = False,
+        envs_per_process: int = 1,
     ):
         """The environments can be different but must use the same action and
         observation spaces.
@@ -69,17 +115,29 @@ class ParallelEnv(object):
             env_constructors (Sequence[EnvConstructor]): List of callables that create environments.
             auto_reset (bool): Automatically resets an environment when episode ends.
             seed (int, optional): Seed for the first environment. Defaults to 42.
+            shared_memory (bool, optional): Transport observation arrays through
+                shared memory instead of pipes. Defaults to False.
+            envs_per_process (int, optional): Number of environments hosted by each
+                worker process. Defaults to 1.
 
         Raises:
             TypeError: If any environment constructor is not callable.
-            ValueError: If the action or observation spaces do not match.
+            ValueError: If the action or observation spaces do not match, or if
+                `envs_per_process` is not positive.
+            RuntimeError: If shared memory is requested but not supported.
         """
 
-        if len(env_constructors) > mp.cpu_count():
+        if envs_per_process < 1:
+            raise ValueError(
+                f"Expected `envs_per_process` to be positive, but got {envs_per_process}."
+            )
+
+        num_processes = math.ceil(len(env_constructors) / envs_per_process)
+        if num_processes > mp.cpu_count():
             warnings.warn(
-                f"Simulation might slow down, as the requested number of parallel "
-                f"environments ({len(env_constructors)}) exceed the number of available "
-                f"CPUs ({mp.cpu_count()}).",
+                f"Simulation might slow down, as the requested number of worker "
+                f"processes ({num_processes}) exceed the number of available "
+                f"CPUs ({mp.cpu_count()}). Consider increasing `envs_per_process`.",
                 ResourceWarning,
             )
 
@@ -89,9 +147,20 @@ class ParallelEnv(object):
                 f"`Sequence[Callable[[], gym.Env]]`, but got {env_constructors})."
             )
 
+        if shared_memory and mp_shared_memory is None:
+            raise RuntimeError(
+                "Shared memory observations require `multiprocessing.shared_memory`, "
+                "which is available from python 3.8 onwards."
+            )
+
         self._num_envs = len(env_constructors)
         self._polling_period = 0.1
         self._closed = False
+        # Environments which are stepping, grouped by the process hosting them.
+        self._waiting: Dict[int, List[int]] = {}
+        self._use_shared_memory = shared_memory
+        self._shared_memories = []
+        self._shared_buffers: Dict[ObservationPath, np.ndarray] = {}
 
         # Fork is not a thread safe method.
         forkserver_available = "forkserver" in mp.get_all_start_methods()
@@ -100,13 +169,21 @@ class ParallelEnv(object):
 
         self._parent_pipes = []
         self._processes = []
-        for idx, env_constructor in enumerate(env_constructors):
+        # Maps each environment index to its (process index, slot within process).
+        self._env_locations: List[Tuple[int, int]] = []
+        for idx in range(num_processes):
+            hosted_constructors = env_constructors[
+                idx * envs_per_process : (idx + 1) * envs_per_process
+            ]
+            self._env_locations.extend(
+                (idx, slot) for slot in range(len(hosted_constructors))
+            )
             parent_pipe, child_pipe = mp_ctx.Pipe()
             process = mp_ctx.Process(
                 target=_worker,
                 name=f"Worker-<{type(self).__name__}>-<{idx}>",
                 args=(
-                    cloudpickle.dumps(env_constructor),
+                    [cloudpickle.dumps(ctor) for ctor in hosted_constructors],
                     auto_reset,
                     child_pipe,
                     self._polling_period,
@@ -140,28 +217,81 @@ class ParallelEnv(object):
         """The environment's action space in gym representation."""
         return self._single_action_space
 
-    def _call(self, msg: _Message, payloads: Sequence[Any]) -> Sequence[Any]:
-        assert len(payloads) == self._num_envs
-        for pipe, payload in zip(self._parent_pipes, payloads):
-            pipe.send((msg, payload))
-
-        return self._recv()
+    def _group_by_process(self, env_indices: Sequence[int]) -> Dict[int, List[int]]:
+        groups = {}
+        for env_idx in env_indices:
+            process_idx, _ = self._env_locations[env_idx]
+            groups.setdefault(process_idx, []).append(env_idx)
+        return groups
 
-    def _recv(self) -> Sequence[Any]:
-        messages = []
-        payloads = []
-        for pipe in self._parent_pipes:
-            message, payload = pipe.recv()
-            messages.append(message)
-            payloads.append(payload)
-
-        for messages, payload in zip(messages, payloads):
-            if message == _Message.EXCEPTION:
-                worker_name, stacktrace = payload
-                self.close()
-                raise Exception(f"\n{worker_name}\n{stacktrace}")
+    def _send(self, msg: _Message, payloads: Dict[int, Any]):
+        """Send a message with one payload per given environment to the processes
+        hosting those environments.
+        """
+        for process_idx, env_indices in self._group_by_process(payloads).items():
+            self._parent_pipes[process_idx].send(
+                (
+                    msg,
+                    {
+                        self._env_locations[env_idx][1]: payloads[env_idx]
+                        for env_idx in env_indices
+                    },
+                )
+            )
 
-        return payloads
+    def _call(self, msg: _Message, payloads: Sequence[Any]) -> Sequence[Any]:
+        assert len(payloads) == self._num_envs
+        assert not self._waiting, (
+            f"Environments {sorted(self._waiting_env_indices())} are still stepping, "
+            "call `step_wait()` first."
+        )
+        self._send(msg, dict(enumerate(payloads)))
+
+        results = self._recv()
+        return [results[idx] for idx in range(self._num_envs)]
+
+    def _waiting_env_indices(
+        self, process_indices: Optional[Iterable[int]] = None
+    ) -> List[int]:
+        if process_indices is None:
+            process_indices = self._waiting.keys()
+        return [
+            env_idx
+            for process_idx in process_indices
+            for env_idx in self._waiting.get(process_idx, [])
+        ]
+
+    def _recv(
+        self,
+        process_indices: Optional[Sequence[int]] = None,
+        num_ready: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[int, Any]:
+        """Receive replies from the given processes, in whichever order they arrive.
+        Stops early once replies covering `num_ready` environments are in or `timeout`
+        elapsed. Returns the payloads keyed by environment index.
+        """
+        if process_indices is None:
+            process_indices = range(len(self._parent_pipes))
+        pending = {self._parent_pipes[idx]: idx for idx in process_indices}
+
+        results = {}
+        while pending and (num_ready is None or len(results) < num_ready):
+            ready = mp.connection.wait(list(pending), timeout=timeout)
+            if not ready:
+                break
+            for pipe in ready:
+                process_idx = pending.pop(pipe)
+                message, payload = pipe.recv()
+                if message == _Message.EXCEPTION:
+                    worker_name, stacktrace = payload
+                    self.close()
+                    raise Exception(f"\n{worker_name}\n{stacktrace}")
+                for env_idx, location in enumerate(self._env_locations):
+                    if location[0] == process_idx and location[1] in payload:
+                        results[env_idx] = payload[location[1]]
+
+        return dict(sorted(results.items()))
 
     def _wait_start(self):
         self._recv()
@@ -209,7 +339,9 @@ class ParallelEnv(object):
         """
 
         observations = self._call(_Message.RESET, [None] * self._num_envs)
-        return observations
+        if self._use_shared_memory and not self._shared_memories:
+            self._share(observations)
+        return self._unpack_observations(observations)
 
     def step(
         self, actions: Sequence[Dict[str, Any]]
@@ -228,10 +360,183 @@ class ParallelEnv(object):
             Tuple[ Sequence[Dict[str, Any]], Sequence[Dict[str, float]], Sequence[Dict[str, bool]], Sequence[Dict[str, Any]] ]:
                 A batch of (observations, rewards, dones, infos) from the vectorized environment.
         """
-        result = self._call(_Message.STEP, actions)
-        observations, rewards, dones, infos = zip(*result)
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(
+        self,
+        actions: Sequence[Dict[str, Any]],
+        env_indices: Optional[Sequence[int]] = None,
+    ):
+        """Starts stepping the given environments without waiting for the results.
+        Collect the results with `step_wait()` or `step_wait_ready()`.
+
+        Args:
+            actions (Sequence[Dict[str,Any]]): Actions for each of the given environments.
+            env_indices (Optional[Sequence[int]], optional): Environments to step.
+                Defaults to all environments.
+
+        Raises:
+            ValueError: If an environment is already stepping or the number of
+                actions does not match the number of environments.
+        """
+        if env_indices is None:
+            env_indices = range(self._num_envs)
+        if len(actions) != len(env_indices):
+            raise ValueError(
+                f"Expected {len(env_indices)} actions, one for each environment in "
+                f"{list(env_indices)}, but got {len(actions)}."
+            )
+        groups = self._group_by_process(env_indices)
+        busy = self._waiting_env_indices(groups)
+        if busy:
+            raise ValueError(
+                f"Environments {sorted(busy)}, hosted by the same processes, are still "
+                "stepping, wait for them first."
+            )
+
+        self._send(_Message.STEP, dict(zip(env_indices, actions)))
+        self._waiting.update(groups)
+
+    def step_wait(
+        self,
+    ) -> Tuple[
+        Sequence[Dict[str, Any]],
+        Sequence[Dict[str, float]],
+        Sequence[Dict[str, bool]],
+        Sequence[Dict[str, Any]],
+    ]:
+        """Waits for all environments started with `step_async()`.
+
+        Returns:
+            Tuple[ Sequence[Dict[str, Any]], Sequence[Dict[str, float]], Sequence[Dict[str, bool]], Sequence[Dict[str, Any]] ]:
+                A batch of (observations, rewards, dones, infos), ordered by
+                environment index, of the environments which were stepping.
+        """
+        _, observations, rewards, dones, infos = self.step_wait_ready(
+            num_ready=self._num_envs
+        )
         return (observations, rewards, dones, infos)
 
+    def step_wait_ready(
+        self, num_ready: int = 1, timeout: Optional[float] = None
+    ) -> Tuple[
+        List[int],
+        Sequence[Dict[str, Any]],
+        Sequence[Dict[str, float]],
+        Sequence[Dict[str, bool]],
+        Sequence[Dict[str, Any]],
+    ]:
+        """Waits until at least `num_ready` of the environments started with
+        `step_async()` have finished, and returns the results of those that finished.
+        The remaining environments keep stepping and can be collected later.
+        Environments hosted by the same process finish together.
+
+        Args:
+            num_ready (int, optional): Minimum number of environments to wait for.
+                Defaults to 1.
+            timeout (Optional[float], optional): Maximum seconds to wait for each
+                reply. Fewer than `num_ready` results may be returned on timeout.
+                Defaults to None, i.e., no timeout.
+
+        Returns:
+            Tuple[ List[int], Sequence[Dict[str, Any]], Sequence[Dict[str, float]], Sequence[Dict[str, bool]], Sequence[Dict[str, Any]] ]:
+                The indices of the finished environments followed by their
+                (observations, rewards, dones, infos), in the same order.
+        """
+        num_waiting = len(self._waiting_env_indices())
+        results = self._recv(
+            sorted(self._waiting),
+            num_ready=min(num_ready, num_waiting),
+            timeout=timeout,
+        )
+        for env_idx in results:
+            self._waiting.pop(self._env_locations[env_idx][0], None)
+
+        env_indices = list(results)
+        if not env_indices:
+            return env_indices, (), (), (), ()
+        observations, rewards, dones, infos = zip(*results.values())
+        observations = tuple(
+            self._unpack_observations(observations, env_indices=env_indices)
+        )
+        return env_indices, observations, rewards, dones, infos
+
+    @property
+    def shared_observation_buffers(self) -> Dict[ObservationPath, np.ndarray]:
+        """The batched shared memory arrays, of shape `(batch_size, ...)`, keyed by the
+        path of dictionary keys leading to the array within an observation. Empty
+        unless `shared_memory=True` and `reset()` has been called.
+        """
+        return self._shared_buffers
+
+    def _share(self, observations: Sequence[Any]):
+        layout = {}
+        for observation in observations:
+            for path, array in _array_leaves(observation):
+                if path not in layout:
+                    layout[path] = (array.shape, array.dtype)
+                elif layout[path] != (array.shape, array.dtype):
+                    # Inconsistent across environments, keep sending it by pipe.
+                    layout[path] = None
+
+        shared_layout = {}
+        for path, spec in layout.items():
+            if spec is None:
+                continue
+            shape, dtype = spec
+            batch_shape = (self._num_envs, *shape)
+            memory = mp_shared_memory.SharedMemory(
+                create=True,
+                size=max(1, int(np.prod(batch_shape)) * dtype.itemsize),
+            )
+            self._shared_memories.append(memory)
+            self._shared_buffers[path] = np.ndarray(
+                batch_shape, dtype=dtype, buffer=memory.buf
+            )
+            shared_layout[path] = (memory.name, batch_shape, dtype.str)
+
+        self._call(
+            _Message.SHARE,
+            [(shared_layout, env_index) for env_index in range(self._num_envs)],
+        )
+
+    def _unpack_observations(
+        self,
+        observations: Sequence[Any],
+        env_indices: Optional[Sequence[int]] = None,
+    ) -> Sequence[Any]:
+        if not self._shared_buffers:
+            return observations
+        if env_indices is None:
+            env_indices = range(len(observations))
+        return [
+            self._unpack(observation, (), env_index)
+            for env_index, observation in zip(env_indices, observations)
+        ]
+
+    def _unpack(self, value: Any, path: ObservationPath, env_index: int) -> Any:
+        if isinstance(value, _SharedLeaf):
+            return self._shared_buffers[path][env_index]
+        if isinstance(value, dict):
+            return {
+                key: self._unpack(item, path + (key,), env_index)
+                for key, item in value.items()
+            }
+        return value
+
+    def _release_shared_memory(self):
+        self._shared_buffers = {}
+        for memory in self._shared_memories:
+            try:
+                memory.close()
+            except BufferError:
+                # Views into the memory are still referenced by the user. The
+                # mapping is released once those are garbage collected.
+                pass
+            memory.unlink()
+        self._shared_memories = []
+
     def close(self, terminate=False):
         """Sends a close message to all external processes.
 
@@ -257,6 +562,7 @@ class ParallelEnv(object):
             if process.is_alive():
                 process.join()
 
+        self._release_shared_memory()
         self._closed = True
 
     def __del__(self):
@@ -265,17 +571,20 @@ class ParallelEnv(object):
 
 
 def _worker(
-    env_constructor: bytes,
+    env_constructors: Sequence[bytes],
     auto_reset: bool,
     pipe: mp.connection.Connection,
     polling_period: float = 0.1,
 ):
-    """Process to build and run an environment. Using a pipe to
-    communicate with parent, the process receives action, steps
-    the environment, and returns the observations.
+    """Process to build and run one or more environments. Using a pipe to
+    communicate with parent, the process receives actions, steps
+    the environments one after the other, and returns the observations.
+
+    Every message payload, and every reply, is a dictionary keyed by the slot of
+    the hosted environment it is meant for.
 
     Args:
-        env_constructor (bytes): Cloudpickled callable which constructs the environment.
+        env_constructors (Sequence[bytes]): Cloudpickled callables which construct the environments.
         auto_reset (bool): If True, auto resets environment when episode ends.
         pipe (mp.connection.Connection): Child's end of the pipe.
         polling_period (float, optional): Time to wait for keyboard interrupts. Defaults to 0.1.
@@ -283,8 +592,31 @@ def _worker(
     Raises:
         KeyError: If unknown message type is received.
     """
-    env = cloudpickle.loads(env_constructor)()
-    pipe.send((_Message.RESULT, None))
+    envs = [
+        cloudpickle.loads(env_constructor)() for env_constructor in env_constructors
+    ]
+    shared_memories = {}
+    shared_slots = [{} for _ in envs]
+    pipe.send((_Message.RESULT, {}))
+
+    def step(slot, action):
+        env = envs[slot]
+        observation, reward, done, info = env.step(action)
+        if done["__all__"] and auto_reset:
+            # Final observation can be obtained from `info` as follows:
+            # `final_obs = info[agent_id]["env_obs"]`
+            observation = env.reset()
+        observation = _pack(observation, (), shared_slots[slot])
+        return (observation, reward, done, info)
+
+    def share(slot, shared_layout, env_index):
+        for path, (name, batch_shape, dtype) in shared_layout.items():
+            if name not in shared_memories:
+                shared_memories[name] = mp_shared_memory.SharedMemory(name=name)
+            batch = np.ndarray(
+                batch_shape, dtype=np.dtype(dtype), buffer=shared_memories[name].buf
+            )
+            shared_slots[slot][path] = batch[env_index]
 
     try:
         while True:
@@ -292,21 +624,27 @@ def _worker(
                 continue
             message, payload = pipe.recv()
             if message == _Message.SEED:
-                env_seed = env.seed(payload)
-                pipe.send((_Message.RESULT, env_seed))
+                result = {slot: envs[slot].seed(seed) for slot, seed in payload.items()}
+                pipe.send((_Message.RESULT, result))
             elif message == _Message.ACCESS:
-                result = getattr(env, payload, None)
+                result = {
+                    slot: getattr(envs[slot], name, None)
+                    for slot, name in payload.items()
+                }
                 pipe.send((_Message.RESULT, result))
             elif message == _Message.RESET:
-                observation = env.reset()
-                pipe.send((_Message.RESULT, observation))
+                result = {
+                    slot: _pack(envs[slot].reset(), (), shared_slots[slot])
+                    for slot in payload
+                }
+                pipe.send((_Message.RESULT, result))
             elif message == _Message.STEP:
-                observation, reward, done, info = env.step(payload)
-                if done["__all__"] and auto_reset:
-                    # Final observation can be obtained from `info` as follows:
-                    # `final_obs = info[agent_id]["env_obs"]`
-                    observation = env.reset()
-                pipe.send((_Message.RESULT, (observation, reward, done, info)))
+                result = {slot: step(slot, action) for slot, action in payload.items()}
+                pipe.send((_Message.RESULT, result))
+            elif message == _Message.SHARE:
+                for slot, (shared_layout, env_index) in payload.items():
+                    share(slot, shared_layout, env_index)
+                pipe.send((_Message.RESULT, {slot: None for slot in payload}))
             elif message == _Message.CLOSE:
                 break
             else:
@@ -322,5 +660,41 @@ def _worker(
         payload = (mp.current_process().name, stacktrace)
         pipe.send((_Message.EXCEPTION, payload))
     finally:
-        env.close()
+        for env in envs:
+            env.close()
         pipe.close()
+        shared_slots.clear()
+        for memory in shared_memories.values():
+            memory.close()
+
+
+def _array_leaves(
+    value: Any, path: ObservationPath = ()
+) -> Iterator[Tuple[ObservationPath, np.ndarray]]:
+    """Yields the numpy arrays nested in dictionaries along with their key paths."""
+    if isinstance(value, np.ndarray):
+        yield path, value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _array_leaves(item, path + (key,))
+
+
+def _pack(
+    value: Any, path: ObservationPath, shared_slots: Dict[ObservationPath, np.ndarray]
+) -> Any:
+    """Writes arrays which match the shared memory layout into their slots and
+    replaces them with placeholders.
+    """
+    if not shared_slots:
+        return value
+    if isinstance(value, np.ndarray):
+        slot = shared_slots.get(path)
+        if slot is not None and slot.shape == value.shape and slot.dtype == value.dtype:
+            slot[...] = value
+            return _SharedLeaf()
+        return value
+    if isinstance(value, dict):
+        return {
+            key: _pack(item, path + (key,), shared_slots) for key, item in value.items()
+        }
+    return value
@@ -90,12 +90,13 @@ class RGBImage(gym.ObservationWrapper):
                 f"stacked (={true_num_stack}) in the underlying base env."
             )
 
-            images = []
-            for agent_ob in agent_obs:
-                image = agent_ob.top_down_rgb.data
-                images.append(image.astype(np.uint8))
-
-            stacked_images = np.dstack(images)
+            # The images are already uint8, so a single image is passed on as is
+            # and stacked images are copied once.
+            images = [agent_ob.top_down_rgb.data for agent_ob in agent_obs]
+            if len(images) == 1:
+                stacked_images = images[0]
+            else:
+                stacked_images = np.dstack(images)
             wrapped_obs.update({agent_id: stacked_images})
 
         return wrapped_obs
@@ -0,0 +1,244 @@
+# MIT License
+#
+# Copyright (C) 2022. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import gym
+import numpy as np
+from gym.vector.utils import batch_space, create_empty_array
+
+from smarts.env.wrappers.format_obs import FormatObs
+from smarts.zoo.agent_spec import AgentSpec
+
+__all__ = ["VectorEnv"]
+
+
+EnvConstructor = Callable[[], gym.Env]
+BatchedObservation = Dict[str, Union[np.ndarray, Dict[str, np.ndarray]]]
+ObservationAdapter = Callable[[BatchedObservation], Any]
+RewardAdapter = Callable[[BatchedObservation, np.ndarray], np.ndarray]
+
+
+class VectorEnv(object):
+    """Steps several SMARTS environments in the same process and returns their
+    observations, rewards and dones as arrays with a fixed slot per agent.
+
+    Each environment is wrapped with `FormatObs(env, batched=True)`. The
+    observations are a dictionary of arrays shaped `(num_envs, num_agents, ...)`,
+    where the agents are ordered as in `agent_ids`, and `active` marks the agents
+    which have an observation in the current step. Rewards are a float array and
+    dones a boolean array, both shaped `(num_envs, num_agents)`, and are zero for
+    the inactive agents. Whether the episode of each environment ended is returned
+    in `infos[env_idx]["__all__"]`. Without `auto_reset`, the ended environments
+    are marked in `env_dones` and are not stepped again until `reset`, while their
+    last observations, rewards, dones and infos are returned.
+
+    Instead of the per agent observation and reward adapters of the `AgentSpec`,
+    which have to be left to their defaults, a vectorized observation adapter and
+    reward adapter are called once per step with the arrays of all environments.
+
+    Note:
+        The same arrays are returned and overwritten every step. Copy them to keep
+        an observation.
+    """
+
+    def __init__(
+        self,
+        env_constructors: Sequence[EnvConstructor],
+        auto_reset: bool = True,
+        seed: int = 42,
+        observation_adapter: Optional[ObservationAdapter] = None,
+        reward_adapter: Optional[RewardAdapter] = None,
+    ):
+        """The environments must control the same agents with the same interface.
+
+        Args:
+            env_constructors (Sequence[EnvConstructor]): List of callables that
+                create `HiWayEnv` environments.
+            auto_reset (bool, optional): Automatically resets an environment when
+                its episode ends. Defaults to True.
+            seed (int, optional): Seed for the first environment. Defaults to 42.
+            observation_adapter (Optional[ObservationAdapter], optional): Maps the
+                batched observations into the returned observations. Defaults to
+                returning them unchanged.
+            reward_adapter (Optional[RewardAdapter], optional): Maps the batched
+                observations and the `(num_envs, num_agents)` rewards into the
+                returned rewards. Defaults to returning the rewards unchanged.
+
+        Raises:
+            TypeError: If any environment constructor is not callable.
+            ValueError: If the environments do not control the same agents, or
+                if an agent uses a custom observation or reward adapter.
+        """
+        if any([not callable(ctor) for ctor in env_constructors]):
+            raise TypeError(
+                f"Found non-callable `env_constructors`. Expected `env_constructors` of type "
+                f"`Sequence[Callable[[], gym.Env]]`, but got {env_constructors})."
+            )
+
+        self._envs = [FormatObs(ctor(), batched=True) for ctor in env_constructors]
+        self.agent_ids = self._envs[0].agent_ids
+        if any([env.agent_ids != self.agent_ids for env in self._envs]):
+            self.close()
+            raise ValueError(
+                f"Expected all environments to control the agents {self.agent_ids}."
+            )
+        for env in self._envs:
+            for agent_id, agent_spec in env.agent_specs.items():
+                for adapter in ("observation_adapter", "reward_adapter"):
+                    if getattr(agent_spec, adapter) is not getattr(AgentSpec, adapter):
+                        self.close()
+                        raise ValueError(
+                            f"Expected the default `{adapter}` for agent {agent_id}, "
+                            f"pass a vectorized `{adapter}` to `VectorEnv` instead."
+                        )
+
+        self._auto_reset = auto_reset
+        self._observation_adapter = observation_adapter or (lambda obs: obs)
+        self._reward_adapter = reward_adapter or (lambda obs, reward: reward)
+
+        self._single_observation_space = self._envs[0].observation_space
+        self.observation_space = batch_space(
+            self._single_observation_space, len(self._envs)
+        )
+        self._observations = create_empty_array(
+            self.observation_space, n=None, fn=np.zeros
+        )
+        shape = (len(self._envs), len(self.agent_ids))
+        self._rewards = np.zeros(shape, dtype=np.float32)
+        self._dones = np.zeros(shape, dtype=bool)
+        self._env_dones = np.zeros(len(self._envs), dtype=bool)
+        self._infos = [{} for _ in self._envs]
+
+        self.seed(seed)
+
+    @property
+    def batch_size(self) -> int:
+        """The number of environments."""
+        return len(self._envs)
+
+    @property
+    def env_dones(self) -> np.ndarray:
+        """Whether the episode of each environment ended, without `auto_reset`. The
+        ended environments are skipped by `step` until `reset`."""
+        return self._env_dones
+
+    def seed(self, seed: int) -> Sequence[int]:
+        """Sets unique seed for each environment.
+
+        Args:
+            seed (int): Seed number.
+
+        Returns:
+            Sequence[int]: Seed of each environment.
+        """
+        return [env.seed(seed + idx) for idx, env in enumerate(self._envs)]
+
+    def reset(self) -> Any:
+        """Reset all environments.
+
+        Returns:
+            Any: The batched observations of all environments.
+        """
+        for env_idx, env in enumerate(self._envs):
+            _copy_into(self._observations, env_idx, env.reset())
+        self._env_dones.fill(False)
+        return self._observation_adapter(self._observations)
+
+    def step(
+        self, actions: Union[np.ndarray, Sequence[Sequence[Any]]]
+    ) -> Tuple[Any, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """Steps all environments.
+
+        Args:
+            actions (Union[np.ndarray, Sequence[Sequence[Any]]]): Actions indexed by
+                environment and agent slot. The actions of inactive agents and of
+                ended environments are ignored.
+
+        Returns:
+            Tuple[Any, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+                A batch of (observations, rewards, dones, infos). The infos of each
+                environment hold the info of every active agent and `__all__`.
+        """
+        if len(actions) != len(self._envs):
+            raise ValueError(
+                f"Expected {len(self._envs)} actions, one for each environment, "
+                f"but got {len(actions)}."
+            )
+
+        active = self._observations["active"]
+        ended = []
+        for env_idx, env in enumerate(self._envs):
+            if self._env_dones[env_idx]:
+                continue
+            self._rewards[env_idx] = 0
+            self._dones[env_idx] = False
+            env_actions = {
+                agent_id: actions[env_idx][agent_idx]
+                for agent_idx, agent_id in enumerate(self.agent_ids)
+                if active[env_idx][agent_idx]
+            }
+            observations, rewards, dones, info = env.step(env_actions)
+            for agent_idx, agent_id in enumerate(self.agent_ids):
+                if agent_id in rewards:
+                    self._rewards[env_idx, agent_idx] = rewards[agent_id]
+                if agent_id in dones:
+                    self._dones[env_idx, agent_idx] = dones[agent_id]
+            info["__all__"] = dones["__all__"]
+            if dones["__all__"]:
+                if self._auto_reset:
+                    ended.append(env_idx)
+                else:
+                    self._env_dones[env_idx] = True
+            _copy_into(self._observations, env_idx, observations)
+            self._infos[env_idx] = info
+
+        # The rewards are computed from the final observations of the ended episodes.
+        rewards = self._reward_adapter(self._observations, self._rewards)
+        for env_idx in ended:
+            # Final observation can be obtained from `info` as follows:
+            # `final_obs = info[agent_id]["env_obs"]`
+            _copy_into(self._observations, env_idx, self._envs[env_idx].reset())
+
+        return (
+            self._observation_adapter(self._observations),
+            rewards,
+            self._dones,
+            list(self._infos),
+        )
+
+    def close(self):
+        """Closes all environments."""
+        for env in self._envs:
+            env.close()
+
+
+def _copy_into(
+    out: Union[np.ndarray, Dict[str, Any]],
+    idx: int,
+    value: Union[np.ndarray, Dict[str, Any]],
+):
+    if isinstance(out, dict):
+        for key, sub_out in out.items():
+            _copy_into(sub_out, idx, value[key])
+    else:
+        out[idx] = value
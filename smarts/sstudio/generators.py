@@ -17,12 +17,14 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
+import heapq
 import logging
 import os
 import random
 import tempfile
+import weakref
 from dataclasses import replace
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import sh
 from yattag import Doc, indent
@@ -39,6 +41,12 @@ class InvalidRoute(Exception):
     pass
 
 
+# Memoized edges of the routes planned on each road map
+_route_edges_cache: "weakref.WeakKeyDictionary[RoadMap, Dict]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
 class RandomRouteGenerator:
     """Generates a random route out of the routes available in the road map.
 
@@ -103,6 +111,49 @@ class RandomRouteGenerator:
         )
 
 
+def _fastest_path(net, from_edge, to_edge, vehicle_class: str, max_speed: float):
+    """Finds the path with the least travel time between two edges that is open to
+    the vehicle class, like duarouter's default routing. Returns the edges of the path,
+    including the start and end edges, or None if there is no such path.
+    """
+
+    def travel_time(edge):
+        return edge.getLength() / min(edge.getSpeed(), max_speed)
+
+    if from_edge == to_edge:
+        return [from_edge]
+
+    queue = [(0.0, from_edge.getID(), from_edge)]
+    costs = {from_edge: 0.0}
+    previous = {}
+    visited = set()
+    while queue:
+        cost, _, edge = heapq.heappop(queue)
+        if edge in visited:
+            continue
+        visited.add(edge)
+        if edge == to_edge:
+            path = [edge]
+            while path[-1] != from_edge:
+                path.append(previous[path[-1]])
+            return path[::-1]
+
+        for next_edge, connections in edge.getAllowedOutgoing(vehicle_class).items():
+            if next_edge in visited:
+                continue
+            new_cost = cost + travel_time(next_edge)
+            if net.hasInternal:
+                # Crossing the junction takes time as well.
+                via_path, _ = net.getInternalPath(connections)
+                if via_path:
+                    new_cost += sum(travel_time(via_edge) for via_edge in via_path)
+            if new_cost < costs.get(next_edge, float("inf")):
+                costs[next_edge] = new_cost
+                previous[next_edge] = edge
+                heapq.heappush(queue, (new_cost, next_edge.getID(), next_edge))
+    return None
+
+
 class TrafficGenerator:
     """Generates traffic from scenario information."""
 
@@ -112,6 +163,7 @@ class TrafficGenerator:
         scenario_map_spec: Optional[types.MapSpec],
         log_dir: Optional[str] = None,
         overwrite: bool = False,
+        route_in_process: bool = False,
     ):
         """
         Args:
@@ -123,12 +175,17 @@ class TrafficGenerator:
                 Where logging information about traffic planning should be written to.
             overwrite:
                 Whether to overwrite existing traffic information.
+            route_in_process:
+                Whether to plan routes without running duarouter where possible.
+                The routes follow the fastest path like duarouter's, but the
+                generated traffic is not guaranteed to be identical to duarouter's.
         """
         from smarts.core.utils.sumo import sumolib
 
         self._log = logging.getLogger(self.__class__.__name__)
         self._scenario = scenario_dir
         self._overwrite = overwrite
+        self._route_in_process = route_in_process
         self._duarouter = sh.Command(sumolib.checkBinary("duarouter"))
         self._scenario_map_spec = scenario_map_spec
         self._road_network_path = os.path.join(self._scenario, "map.net.xml")
@@ -171,6 +228,14 @@ class TrafficGenerator:
                 self._log.info(f"Routes at routes={route_path} already exist, skipping")
                 return None
 
+        if self._route_in_process:
+            if self._plan_and_save_in_process(traffic, route_path):
+                return route_path
+            self._log.info(
+                f"Unable to plan routes={route_path} in-process, using duarouter"
+            )
+            random.seed(seed)
+
         with tempfile.TemporaryDirectory() as temp_dir:
             trips_path = os.path.join(temp_dir, "trips.trips.xml")
             self._writexml(traffic, trips_path)
@@ -200,44 +265,137 @@ class TrafficGenerator:
 
         return route_path
 
+    def _plan_and_save_in_process(
+        self, traffic: types.Traffic, route_path: str
+    ) -> bool:
+        """Writes a route file of the routed vehicles that duarouter would generate for
+        the traffic spec, without running duarouter. The vehicle types are declared as
+        in the duarouter input. Routes between the given roads follow the fastest
+        paths for each vehicle class. Returns False, having written nothing, if the
+        traffic uses features that are left for duarouter to handle.
+        """
+        from smarts.core.sumo_road_network import SumoRoadNetwork
+
+        if not isinstance(self.road_network, SumoRoadNetwork):
+            return False
+
+        # Sample the actors and resolve the routes in the same order as `_writexml()`
+        # so that both produce the same traffic for a given seed.
+        vtypes = self._sample_vtypes(traffic)
+        resolved_routes = {}
+        for route in {flow.route for flow in traffic.flows}:
+            resolved_routes[route] = self.resolve_route(route)
+
+        vehicles = []
+        for flow_idx, flow in enumerate(traffic.flows):
+            total_weight = sum(flow.actors.values())
+            route = resolved_routes[flow.route]
+            for actor_idx, (actor, weight) in enumerate(flow.actors.items()):
+                vehs_per_hour = flow.rate * (weight / total_weight)
+                edges = self._route_edges(route, actor.vehicle_type, actor.max_speed)
+                if vehs_per_hour <= 0 or not edges:
+                    return False
+                # Flows depart vehicles periodically, in whole milliseconds like Sumo
+                period = int(3600 * 1000 / vehs_per_hour + 0.5)
+                begin = int(flow.begin * 1000 + 0.5)
+                end = int(flow.end * 1000 + 0.5)
+                if period <= 0:
+                    return False
+                flow_id = "{}-{}-{}-{}".format(actor.name, flow.id, flow_idx, actor_idx)
+                for i, depart in enumerate(range(begin, end, period)):
+                    vehicles.append(
+                        (
+                            depart,
+                            f"{flow_id}.{i}",
+                            dict(
+                                type=actor.id,
+                                depart=f"{depart / 1000:.2f}",
+                                departLane=route.begin[1],
+                                departPos=_format_value(route.begin[2]),
+                                departSpeed=_format_value(actor.depart_speed),
+                                arrivalLane=route.end[1],
+                                arrivalPos=_format_value(route.end[2]),
+                            ),
+                            " ".join(edges),
+                        )
+                    )
+        vehicles.sort(key=lambda vehicle: vehicle[:2])
+
+        def write_routes(doc: Doc):
+            for vtype in vtypes:
+                doc.stag("vType", **vtype)
+            for _, vehicle_id, attributes, edges in vehicles:
+                with doc.tag("vehicle", id=vehicle_id, **attributes):
+                    doc.stag("route", edges=edges)
+
+        _write_routes_file(route_path, write_routes)
+        return True
+
+    def _route_edges(
+        self, route: types.Route, vehicle_class: str, max_speed: float
+    ) -> Optional[Tuple[str, ...]]:
+        """The ids of all the edges along the fastest path through the roads of the
+        route for the given vehicle class, or None if there is no such path or a lane
+        along it is missing.
+        """
+        road_map = self.road_network
+        route_edges = _route_edges_cache.setdefault(road_map, {})
+        key = (route.roads, vehicle_class, max_speed)
+        if key in route_edges:
+            edges = route_edges[key]
+        else:
+            edges = None
+            try:
+                sumo_edges = [
+                    road_map.road_by_id(road_id)._sumo_edge for road_id in route.roads
+                ]
+            except KeyError:
+                sumo_edges = []
+            if sumo_edges and sumo_edges[0].allows(vehicle_class):
+                path = [sumo_edges[0]]
+                for start, end in zip(sumo_edges, sumo_edges[1:]):
+                    sub_path = _fastest_path(
+                        road_map._graph, start, end, vehicle_class, max_speed
+                    )
+                    if sub_path is None:
+                        path = None
+                        break
+                    # The sub path includes both the start and the end edges.
+                    path.extend(sub_path[1:])
+                if path:
+                    edges = tuple(edge.getID() for edge in path)
+            route_edges[key] = edges
+
+        if not edges or (edges[0], edges[-1]) != (route.begin[0], route.end[0]):
+            return None
+        for road_id, lane_index in (
+            (route.begin[0], route.begin[1]),
+            (route.end[0], route.end[1]),
+        ):
+            if not (
+                isinstance(lane_index, int)
+                and 0 <= lane_index < len(road_map.road_by_id(road_id).lanes)
+            ):
+                return None
+        return edges
+
     def _writexml(self, traffic: types.Traffic, route_path: str):
         """Writes a traffic spec into a route file. Typically this would be the source
         data to Sumo's DUAROUTER.
         """
-        doc = Doc()
-        doc.asis('<?xml version="1.0" encoding="UTF-8"?>')
-        with doc.tag(
-            "routes",
-            ("xmlns:xsi", "http://www.w3.org/2001/XMLSchema-instance"),
-            ("xsi:noNamespaceSchemaLocation", "http://sumo.sf.net/xsd/routes_file.xsd"),
-        ):
-            # Actors and routes may be declared once then reused. To prevent creating
-            # duplicates we unique them here.
-            for actor in {
-                actor for flow in traffic.flows for actor in flow.actors.keys()
-            }:
-                sigma = min(1, max(0, actor.imperfection.sample()))  # range [0,1]
-                min_gap = max(0, actor.min_gap.sample())  # range >= 0
-                doc.stag(
-                    "vType",
-                    id=actor.id,
-                    accel=actor.accel,
-                    decel=actor.decel,
-                    vClass=actor.vehicle_type,
-                    speedFactor=actor.speed.mean,
-                    speedDev=actor.speed.sigma,
-                    sigma=sigma,
-                    minGap=min_gap,
-                    maxSpeed=actor.max_speed,
-                    **actor.lane_changing_model,
-                    **actor.junction_model,
-                )
+        # Actors and routes may be declared once then reused. To prevent creating
+        # duplicates we unique them here.
+        vtypes = self._sample_vtypes(traffic)
+
+        # Make sure all routes are "resolved" (e.g. `RandomRoute` are converted to
+        # `Route`) so that we can write them all to file.
+        resolved_routes = {}
+        for route in {flow.route for flow in traffic.flows}:
+            resolved_routes[route] = self.resolve_route(route)
 
-            # Make sure all routes are "resolved" (e.g. `RandomRoute` are converted to
-            # `Route`) so that we can write them all to file.
-            resolved_routes = {}
-            for route in {flow.route for flow in traffic.flows}:
-                resolved_routes[route] = self.resolve_route(route)
+        def write_routes(doc: Doc):
+            for vtype in vtypes:
+                doc.stag("vType", **vtype)
 
             for route in set(resolved_routes.values()):
                 doc.stag("route", id=route.id, edges=" ".join(route.roads))
@@ -266,19 +424,37 @@ class TrafficGenerator:
                         end=flow.end,
                     )
 
-        with open(route_path, "w") as f:
-            f.write(
-                indent(
-                    doc.getvalue(), indentation="    ", newline="\r\n", indent_text=True
+        _write_routes_file(route_path, write_routes)
+
+    @staticmethod
+    def _sample_vtypes(traffic: types.Traffic) -> List[Dict[str, Any]]:
+        """Samples the vehicle type attributes of each distinct actor of the traffic."""
+        vtypes = []
+        for actor in {actor for flow in traffic.flows for actor in flow.actors.keys()}:
+            sigma = min(1, max(0, actor.imperfection.sample()))  # range [0,1]
+            min_gap = max(0, actor.min_gap.sample())  # range >= 0
+            vtypes.append(
+                dict(
+                    id=actor.id,
+                    accel=actor.accel,
+                    decel=actor.decel,
+                    vClass=actor.vehicle_type,
+                    speedFactor=actor.speed.mean,
+                    speedDev=actor.speed.sigma,
+                    sigma=sigma,
+                    minGap=min_gap,
+                    maxSpeed=actor.max_speed,
+                    **actor.lane_changing_model,
+                    **actor.junction_model,
                 )
             )
+        return vtypes
 
     def _cache_road_network(self):
         if not self._road_network:
-            from smarts.core.sumo_road_network import SumoRoadNetwork
-
+            # Shares the road maps cached by the map builder across generators.
             map_spec = types.MapSpec(self._road_network_path)
-            self._road_network = SumoRoadNetwork.from_spec(map_spec)
+            self._road_network, _ = map_spec.builder_fn(map_spec)
 
     def resolve_edge_length(self, edge_id, lane_idx):
         """Determine the length of the given lane on an edge.
@@ -332,3 +508,25 @@ class TrafficGenerator:
             log_dir = make_dir_in_smarts_log_dir("_duarouter_routing")
 
         return os.path.abspath(log_dir)
+
+
+def _write_routes_file(route_path: str, write_routes: Callable[[Doc], None]):
+    doc = Doc()
+    doc.asis('<?xml version="1.0" encoding="UTF-8"?>')
+    with doc.tag(
+        "routes",
+        ("xmlns:xsi", "http://www.w3.org/2001/XMLSchema-instance"),
+        ("xsi:noNamespaceSchemaLocation", "http://sumo.sf.net/xsd/routes_file.xsd"),
+    ):
+        write_routes(doc)
+
+    with open(route_path, "w") as f:
+        f.write(
+            indent(doc.getvalue(), indentation="    ", newline="\r\n", indent_text=True)
+        )
+
+
+def _format_value(value):
+    if isinstance(value, (int, float)):
+        return f"{value:.2f}"
+    return value
@@ -46,10 +46,11 @@ def gen_scenario(
     output_dir: Path,
     seed: int = 42,
     overwrite: bool = False,
+    route_in_process: bool = False,
 ):
     """This is now the preferred way to generate a scenario. Instead of calling the
     gen_* methods directly, we provide this higher-level abstraction that takes care
-    of the sub-calls.
+    of the sub-calls. See `gen_traffic()` for `route_in_process`.
     """
     # XXX: For now this simply coalesces the sub-calls but in the future this allows
     #      us to simplify our serialization between SStudio and SMARTS.
@@ -71,6 +72,7 @@ def gen_scenario(
                 seed=seed,
                 overwrite=overwrite,
                 map_spec=map_spec,
+                route_in_process=route_in_process,
             )
 
     if scenario.ego_missions:
@@ -151,17 +153,22 @@ def gen_traffic(
     seed: int = 42,
     overwrite: bool = False,
     map_spec: Optional[types.MapSpec] = None,
+    route_in_process: bool = False,
 ):
     """Generates the traffic routes for the given scenario. If the output directory is
     not provided, the scenario directory is used. If name is not provided the default is
-    "routes".
+    "routes". If `route_in_process` is set, the routes are planned without running
+    duarouter where possible, which is faster but not guaranteed to give the same
+    traffic as duarouter.
     """
     assert name != "missions", "The name 'missions' is reserved for missions!"
 
     output_dir = os.path.join(output_dir or scenario, "traffic")
     os.makedirs(output_dir, exist_ok=True)
 
-    generator = TrafficGenerator(scenario, map_spec, overwrite=overwrite)
+    generator = TrafficGenerator(
+        scenario, map_spec, overwrite=overwrite, route_in_process=route_in_process
+    )
     saved_path = generator.plan_and_save(traffic, name, output_dir, seed=seed)
 
     if saved_path:
@@ -99,6 +99,35 @@ def test_generate_traffic(traffic: Traffic):
         assert sorted(items) == sorted(generated_items)
 
 
+def test_generate_traffic_in_process(traffic: Traffic):
+    scenario = "scenarios/intersections/4lane_t"
+    with tempfile.TemporaryDirectory() as temp_dir:
+        vtypes, vehicles = [], []
+        for route_in_process in [True, False]:
+            output_dir = os.path.join(temp_dir, str(route_in_process))
+            gen_traffic(
+                scenario,
+                traffic,
+                name="generated",
+                output_dir=output_dir,
+                route_in_process=route_in_process,
+            )
+
+            with open(os.path.join(output_dir, "traffic", "generated.rou.xml")) as f:
+                root = ElementTree(file=f).getroot()
+            vtypes.append(sorted(x.get("id") for x in root.iter("vType")))
+            vehicles.append(
+                [
+                    (x.items(), [route.items() for route in x.iter("route")])
+                    for x in root.iter("vehicle")
+                ]
+            )
+
+        # duarouter rewrites the vehicle types, the routed vehicles are the same.
+        assert vtypes[0] == vtypes[1]
+        assert vehicles[0] and vehicles[0] == vehicles[1]
+
+
 def _gen_map_from_spec(scenario_root: str, map_spec: MapSpec):
     with tempfile.TemporaryDirectory() as temp_dir:
         gen_map(scenario_root, map_spec, output_dir=temp_dir)
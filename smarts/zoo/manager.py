@@ -34,11 +34,13 @@ logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(f"manager.py - pid({os.getpid()})")
 
 
-def serve(port):
+def serve(port, pool_size=0, agents_per_worker=1):
     """ Starts a SMARTS agent worker server to offload agent action processing. """
     ip = "[::]"
     server = grpc.server(futures.ThreadPoolExecutor(max_workers=1))
-    manager_servicer_object = manager_servicer.ManagerServicer()
+    manager_servicer_object = manager_servicer.ManagerServicer(
+        pool_size=pool_size, agents_per_worker=agents_per_worker
+    )
     manager_pb2_grpc.add_ManagerServicer_to_server(manager_servicer_object, server)
     server.add_insecure_port(f"{ip}:{port}")
     server.start()
@@ -70,6 +72,18 @@ if __name__ == "__main__":
         default=7432,
         help="Port to listen for remote client connections.",
     )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=0,
+        help="Number of worker processes to start ahead of time and keep warm for reuse.",
+    )
+    parser.add_argument(
+        "--agents-per-worker",
+        type=int,
+        default=1,
+        help="Maximum number of agents hosted by each worker process at a time.",
+    )
 
     args = parser.parse_args()
-    serve(args.port)
+    serve(args.port, args.pool_size, args.agents_per_worker)
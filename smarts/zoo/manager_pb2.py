@@ -18,7 +18,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
     syntax="proto3",
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
-    serialized_pb=b'\n\rmanager.proto\x12\x07manager"\t\n\x07Machine"\x13\n\x04Port\x12\x0b\n\x03num\x18\x01 \x01(\x05"\x08\n\x06Status2m\n\x07Manager\x12\x31\n\x0cspawn_worker\x12\x10.manager.Machine\x1a\r.manager.Port"\x00\x12/\n\x0bstop_worker\x12\r.manager.Port\x1a\x0f.manager.Status"\x00\x62\x06proto3',
+    serialized_pb=b'\n\rmanager.proto\x12\x07manager"\x18\n\x07Machine\x12\r\n\x05group\x18\x01 \x01(\t"\x13\n\x04Port\x12\x0b\n\x03num\x18\x01 \x01(\x05"\x08\n\x06Status2m\n\x07Manager\x12\x31\n\x0cspawn_worker\x12\x10.manager.Machine\x1a\r.manager.Port"\x00\x12/\n\x0bstop_worker\x12\r.manager.Port\x1a\x0f.manager.Status"\x00\x62\x06proto3',
 )
 
 
@@ -29,7 +29,27 @@ _MACHINE = _descriptor.Descriptor(
     file=DESCRIPTOR,
     containing_type=None,
     create_key=_descriptor._internal_create_key,
-    fields=[],
+    fields=[
+        _descriptor.FieldDescriptor(
+            name="group",
+            full_name="manager.Machine.group",
+            index=0,
+            number=1,
+            type=9,
+            cpp_type=9,
+            label=1,
+            has_default_value=False,
+            default_value=b"".decode("utf-8"),
+            message_type=None,
+            enum_type=None,
+            containing_type=None,
+            is_extension=False,
+            extension_scope=None,
+            serialized_options=None,
+            file=DESCRIPTOR,
+            create_key=_descriptor._internal_create_key,
+        ),
+    ],
     extensions=[],
     nested_types=[],
     enum_types=[],
@@ -39,7 +59,7 @@ _MACHINE = _descriptor.Descriptor(
     extension_ranges=[],
     oneofs=[],
     serialized_start=26,
-    serialized_end=35,
+    serialized_end=50,
 )
 
 
@@ -79,8 +99,8 @@ _PORT = _descriptor.Descriptor(
     syntax="proto3",
     extension_ranges=[],
     oneofs=[],
-    serialized_start=37,
-    serialized_end=56,
+    serialized_start=52,
+    serialized_end=71,
 )
 
 
@@ -100,8 +120,8 @@ _STATUS = _descriptor.Descriptor(
     syntax="proto3",
     extension_ranges=[],
     oneofs=[],
-    serialized_start=58,
-    serialized_end=66,
+    serialized_start=73,
+    serialized_end=81,
 )
 
 DESCRIPTOR.message_types_by_name["Machine"] = _MACHINE
@@ -150,8 +170,8 @@ _MANAGER = _descriptor.ServiceDescriptor(
     index=0,
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
-    serialized_start=68,
-    serialized_end=177,
+    serialized_start=83,
+    serialized_end=192,
     methods=[
         _descriptor.MethodDescriptor(
             name="spawn_worker",
@@ -31,7 +31,8 @@ class ManagerServicer(object):
 
     def spawn_worker(self, request, context):
         """Spawn worker processes.
-        Returns the address (ip, port) of new worker process.
+        Returns the address (ip, port) of new worker process. Agents of the same
+        group are placed on the same worker when possible.
         """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
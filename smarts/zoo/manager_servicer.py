@@ -36,15 +36,33 @@ log = logging.getLogger(f"manager_servicer.py - pid({os.getpid()})")
 
 
 class ManagerServicer(manager_pb2_grpc.ManagerServicer):
-    """Provides methods that implement functionality of Manager Servicer."""
+    """Provides methods that implement functionality of Manager Servicer.
 
-    def __init__(self):
+    Workers are kept in a warm pool: up to `pool_size` worker processes are started
+    ahead of time and are reused after `stop_worker` instead of being terminated.
+    Each worker hosts up to `agents_per_worker` agents at a time.
+    """
+
+    def __init__(self, pool_size: int = 0, agents_per_worker: int = 1):
+        assert pool_size >= 0
+        assert agents_per_worker > 0
+
+        self._pool_size = pool_size
+        self._agents_per_worker = agents_per_worker
+        # Worker processes keyed by port.
         self._workers = {}
+        # Number of agents leased out on each worker, keyed by port.
+        self._leases = {}
+        # Co-location group of the agents leased out on each worker, keyed by port.
+        self._groups = {}
+
+        for _ in range(self._pool_size):
+            self._start_worker()
 
     def __del__(self):
         self.destroy()
 
-    def spawn_worker(self, request, context):
+    def _start_worker(self):
         port = find_free_port()
 
         cmd = [
@@ -52,11 +70,60 @@ class ManagerServicer(manager_pb2_grpc.ManagerServicer):
             str((pathlib.Path(__file__).parent / "worker.py").absolute().resolve()),
             "--port",
             str(port),
+            "--max-agents",
+            str(self._agents_per_worker),
         ]
 
         worker = subprocess.Popen(cmd)
+        if worker.poll() != None:
+            return None
+
+        self._workers[port] = worker
+        self._leases[port] = 0
+        return port
+
+    def _stop_worker(self, port):
+        worker = self._workers.pop(port)
+        del self._leases[port]
+        self._groups.pop(port, None)
         if worker.poll() == None:
-            self._workers[port] = worker
+            worker.terminate()
+            worker.wait()
+
+    def spawn_worker(self, request, context):
+        # Drop workers which have died since they were started.
+        for port in [p for p, w in self._workers.items() if w.poll() != None]:
+            self._stop_worker(port)
+
+        # Prefer a live worker which has room for another agent and already hosts
+        # the same group, then an idle worker, then the least loaded one. Grouped
+        # agents are not mixed into workers hosting another group.
+        available = [
+            port
+            for port, leases in self._leases.items()
+            if leases < self._agents_per_worker
+            and (
+                not request.group
+                or leases == 0
+                or self._groups.get(port) in ("", request.group)
+            )
+        ]
+        if available:
+            port = min(
+                available,
+                key=lambda p: (
+                    self._groups.get(p) != request.group,
+                    self._leases[p] > 0,
+                    self._leases[p],
+                ),
+            )
+        else:
+            port = self._start_worker()
+
+        if port != None:
+            if self._leases[port] == 0:
+                self._groups[port] = request.group
+            self._leases[port] += 1
             return manager_pb2.Port(num=port)
 
         context.set_details("Error in spawning worker subprocess.")
@@ -77,12 +144,15 @@ class ManagerServicer(manager_pb2_grpc.ManagerServicer):
             context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
             return manager_pb2.Status()
 
-        # Terminate worker process.
-        worker.terminate()
-        worker.wait()
+        self._leases[request.num] = max(self._leases[request.num] - 1, 0)
+        if self._leases[request.num] == 0:
+            self._groups.pop(request.num, None)
 
-        # Delete worker process entry from dictionary.
-        del self._workers[request.num]
+        # Keep the worker warm for reuse unless the pool is already full of idle
+        # workers.
+        idle_workers = sum(1 for leases in self._leases.values() if leases == 0)
+        if self._leases[request.num] == 0 and idle_workers > self._pool_size:
+            self._stop_worker(request.num)
 
         return manager_pb2.Status()
 
@@ -91,8 +161,5 @@ class ManagerServicer(manager_pb2_grpc.ManagerServicer):
         log.debug(
             f"Manager - pid({os.getpid()}), shutting down remaining agent worker processes."
         )
-        workers_to_kill = list(self._workers.values())
-        for worker in workers_to_kill:
-            if worker.poll() == None:
-                worker.terminate()
-                worker.wait()
+        for port in list(self._workers):
+            self._stop_worker(port)
@@ -0,0 +1,85 @@
+# MIT License
+#
+# Copyright (C) 2021. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+import pickle
+from typing import Any, Iterable, List, Tuple
+
+import cloudpickle
+
+# Pickle protocol 5 (python 3.8+) can hand numpy array data out-of-band so that large
+# fields such as camera images and grid maps are not copied into the pickle stream.
+# On python 3.7 the `pickle5` backport provides it when installed; without it the
+# whole object is pickled in-band as before.
+if pickle.HIGHEST_PROTOCOL < 5:
+    try:
+        import pickle5 as pickle
+    except ImportError:
+        pass
+
+_PROTOCOL = max(pickle.HIGHEST_PROTOCOL, pickle.DEFAULT_PROTOCOL)
+_OUT_OF_BAND = _PROTOCOL >= 5
+
+
+def dumps(obj: Any) -> Tuple[bytes, List[memoryview]]:
+    """Serialize an observation or action for transport to or from a remote agent.
+
+    Array data is returned as a list of flat buffers next to a compact pickle of the
+    remaining structure. This needs pickle protocol 5 (python 3.8+ or the `pickle5`
+    backport), otherwise no buffers are returned and arrays stay in the payload.
+    Objects that plain pickle cannot handle (e.g. lambdas) fall back to cloudpickle.
+
+    The buffers are views of the array data, not copies, so the arrays must not be
+    modified while the buffers are in use.
+
+    Returns:
+        Tuple[bytes, List[memoryview]]: The payload and the out-of-band buffers it
+            references.
+    """
+    buffers = []
+    try:
+        if _OUT_OF_BAND:
+            payload = pickle.dumps(
+                obj, protocol=_PROTOCOL, buffer_callback=buffers.append
+            )
+        else:
+            payload = pickle.dumps(obj, protocol=_PROTOCOL)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return cloudpickle.dumps(obj), []
+    return payload, [buffer.raw() for buffer in buffers]
+
+
+def loads(payload: bytes, buffers: Iterable[Any] = ()) -> Any:
+    """Deserialize an object produced by `dumps` (or by plain cloudpickle)."""
+    if _OUT_OF_BAND:
+        # Arrays are views of the buffers. Read-only buffers, such as the bytes of a
+        # received protobuf message, are copied so that arrays are writable as they
+        # would be if they had been pickled in-band.
+        return pickle.loads(
+            payload,
+            buffers=[bytearray(b) if memoryview(b).readonly else b for b in buffers],
+        )
+    return pickle.loads(payload)
+
+
+def as_bytes(buffers: Iterable[memoryview]) -> List[bytes]:
+    """Convert out-of-band buffers for a protobuf message, whose bytes fields only
+    accept `bytes`. This is the only copy of the array data when sending."""
+    return [bytes(buffer) for buffer in buffers]
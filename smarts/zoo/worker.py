@@ -33,9 +33,11 @@ The protocol is as follows:
 1. SMARTS calls: worker.py --port 5467 # sets a unique port per agent
 2. worker.py will begin listening on port 5467.
 3. SMARTS connects to (ip, 5467) as a client.
-4. SMARTS calls `build()` rpc with `AgentSpec` as input.
-5. worker.py receives the `AgentSpec` instances and builds the Agent.
+4. SMARTS calls `build()` rpc with `AgentSpec` and an agent id as input.
+5. worker.py receives the `AgentSpec` instances and builds the Agent, hosted under the agent id.
 6. SMARTS calls `act()` rpc with observation as input and receives the actions as response from worker.py.
+   Alternatively, SMARTS opens a single `act_stream()` rpc and streams observations and actions over it.
+7. SMARTS calls `release()` rpc with the agent id once done, after which the worker may host another agent.
 """
 
 import argparse
@@ -80,10 +82,12 @@ logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(f"worker.py - pid({os.getpid()})")
 
 
-def serve(port):
-    """Start an agent worker server."""
+def serve(port, max_agents=1):
+    """Start an agent worker server hosting up to `max_agents` agents at a time."""
     ip = "[::]"
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=1))
+    # Each hosted agent may hold a thread with its `act_stream()` call, keep one
+    # spare for the unary calls.
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_agents + 1))
     worker_pb2_grpc.add_WorkerServicer_to_server(
         worker_servicer.WorkerServicer(), server
     )
@@ -114,6 +118,12 @@ if __name__ == "__main__":
         required=True,
         help="Port to listen for remote client connections.",
     )
+    parser.add_argument(
+        "--max-agents",
+        type=int,
+        default=1,
+        help="Maximum number of agents hosted by this worker at a time.",
+    )
 
     args = parser.parse_args()
-    serve(args.port)
+    serve(args.port, args.max_agents)
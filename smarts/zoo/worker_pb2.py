@@ -18,7 +18,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
     syntax="proto3",
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
-    serialized_pb=b'\n\x0cworker.proto\x12\x06worker" \n\rSpecification\x12\x0f\n\x07payload\x18\x01 \x01(\x0c"\x08\n\x06Status"\x1e\n\x0bObservation\x12\x0f\n\x07payload\x18\x01 \x01(\x0c"\x18\n\x06\x41\x63tion\x12\x0e\n\x06\x61\x63tion\x18\x01 \x01(\x0c\x32h\n\x06Worker\x12\x30\n\x05\x62uild\x12\x15.worker.Specification\x1a\x0e.worker.Status"\x00\x12,\n\x03\x61\x63t\x12\x13.worker.Observation\x1a\x0e.worker.Action"\x00\x62\x06proto3',
+    serialized_pb=b'\n\x0cworker.proto\x12\x06worker"A\n\rSpecification\x12\x0f\n\x07payload\x18\x01 \x01(\x0c\x12\x10\n\x08\x61gent_id\x18\x02 \x01(\t\x12\r\n\x05group\x18\x03 \x01(\t"\x19\n\x05\x41gent\x12\x10\n\x08\x61gent_id\x18\x01 \x01(\t"\x08\n\x06Status"A\n\x0bObservation\x12\x0f\n\x07payload\x18\x01 \x01(\x0c\x12\x0f\n\x07\x62uffers\x18\x02 \x03(\x0c\x12\x10\n\x08\x61gent_id\x18\x03 \x01(\t")\n\x06\x41\x63tion\x12\x0e\n\x06\x61\x63tion\x18\x01 \x01(\x0c\x12\x0f\n\x07\x62uffers\x18\x02 \x03(\x0c"9\n\x0cObservations\x12)\n\x0cobservations\x18\x01 \x03(\x0b\x32\x13.worker.Observation"*\n\x07\x41\x63tions\x12\x1f\n\x07\x61\x63tions\x18\x01 \x03(\x0b\x32\x0e.worker.Action2\x83\x02\n\x06Worker\x12\x30\n\x05\x62uild\x12\x15.worker.Specification\x1a\x0e.worker.Status"\x00\x12*\n\x07release\x12\r.worker.Agent\x1a\x0e.worker.Status"\x00\x12,\n\x03\x61\x63t\x12\x13.worker.Observation\x1a\x0e.worker.Action"\x00\x12\x37\n\nact_stream\x12\x13.worker.Observation\x1a\x0e.worker.Action"\x00(\x01\x30\x01\x12\x34\n\tact_batch\x12\x14.worker.Observations\x1a\x0f.worker.Actions"\x00\x62\x06proto3',
 )
 
 
@@ -49,6 +49,44 @@ _SPECIFICATION = _descriptor.Descriptor(
             file=DESCRIPTOR,
             create_key=_descriptor._internal_create_key,
         ),
+        _descriptor.FieldDescriptor(
+            name="agent_id",
+            full_name="worker.Specification.agent_id",
+            index=1,
+            number=2,
+            type=9,
+            cpp_type=9,
+            label=1,
+            has_default_value=False,
+            default_value=b"".decode("utf-8"),
+            message_type=None,
+            enum_type=None,
+            containing_type=None,
+            is_extension=False,
+            extension_scope=None,
+            serialized_options=None,
+            file=DESCRIPTOR,
+            create_key=_descriptor._internal_create_key,
+        ),
+        _descriptor.FieldDescriptor(
+            name="group",
+            full_name="worker.Specification.group",
+            index=2,
+            number=3,
+            type=9,
+            cpp_type=9,
+            label=1,
+            has_default_value=False,
+            default_value=b"".decode("utf-8"),
+            message_type=None,
+            enum_type=None,
+            containing_type=None,
+            is_extension=False,
+            extension_scope=None,
+            serialized_options=None,
+            file=DESCRIPTOR,
+            create_key=_descriptor._internal_create_key,
+        ),
     ],
     extensions=[],
     nested_types=[],
@@ -59,7 +97,48 @@ _SPECIFICATION = _descriptor.Descriptor(
     extension_ranges=[],
     oneofs=[],
     serialized_start=24,
-    serialized_end=56,
+    serialized_end=89,
+)
+
+
+_AGENT = _descriptor.Descriptor(
+    name="Agent",
+    full_name="worker.Agent",
+    filename=None,
+    file=DESCRIPTOR,
+    containing_type=None,
+    create_key=_descriptor._internal_create_key,
+    fields=[
+        _descriptor.FieldDescriptor(
+            name="agent_id",
+            full_name="worker.Agent.agent_id",
+            index=0,
+            number=1,
+            type=9,
+            cpp_type=9,
+            label=1,
+            has_default_value=False,
+            default_value=b"".decode("utf-8"),
+            message_type=None,
+            enum_type=None,
+            containing_type=None,
+            is_extension=False,
+            extension_scope=None,
+            serialized_options=None,
+            file=DESCRIPTOR,
+            create_key=_descriptor._internal_create_key,
+        ),
+    ],
+    extensions=[],
+    nested_types=[],
+    enum_types=[],
+    serialized_options=None,
+    is_extendable=False,
+    syntax="proto3",
+    extension_ranges=[],
+    oneofs=[],
+    serialized_start=91,
+    serialized_end=116,
 )
 
 
@@ -79,8 +158,8 @@ _STATUS = _descriptor.Descriptor(
     syntax="proto3",
     extension_ranges=[],
     oneofs=[],
-    serialized_start=58,
-    serialized_end=66,
+    serialized_start=118,
+    serialized_end=126,
 )
 
 
@@ -111,6 +190,44 @@ _OBSERVATION = _descriptor.Descriptor(
             file=DESCRIPTOR,
             create_key=_descriptor._internal_create_key,
         ),
+        _descriptor.FieldDescriptor(
+            name="buffers",
+            full_name="worker.Observation.buffers",
+            index=1,
+            number=2,
+            type=12,
+            cpp_type=9,
+            label=3,
+            has_default_value=False,
+            default_value=[],
+            message_type=None,
+            enum_type=None,
+            containing_type=None,
+            is_extension=False,
+            extension_scope=None,
+            serialized_options=None,
+            file=DESCRIPTOR,
+            create_key=_descriptor._internal_create_key,
+        ),
+        _descriptor.FieldDescriptor(
+            name="agent_id",
+            full_name="worker.Observation.agent_id",
+            index=2,
+            number=3,
+            type=9,
+            cpp_type=9,
+            label=1,
+            has_default_value=False,
+            default_value=b"".decode("utf-8"),
+            message_type=None,
+            enum_type=None,
+            containing_type=None,
+            is_extension=False,
+            extension_scope=None,
+            serialized_options=None,
+            file=DESCRIPTOR,
+            create_key=_descriptor._internal_create_key,
+        ),
     ],
     extensions=[],
     nested_types=[],
@@ -120,8 +237,8 @@ _OBSERVATION = _descriptor.Descriptor(
     syntax="proto3",
     extension_ranges=[],
     oneofs=[],
-    serialized_start=68,
-    serialized_end=98,
+    serialized_start=128,
+    serialized_end=193,
 )
 
 
@@ -152,6 +269,66 @@ _ACTION = _descriptor.Descriptor(
             file=DESCRIPTOR,
             create_key=_descriptor._internal_create_key,
         ),
+        _descriptor.FieldDescriptor(
+            name="buffers",
+            full_name="worker.Action.buffers",
+            index=1,
+            number=2,
+            type=12,
+            cpp_type=9,
+            label=3,
+            has_default_value=False,
+            default_value=[],
+            message_type=None,
+            enum_type=None,
+            containing_type=None,
+            is_extension=False,
+            extension_scope=None,
+            serialized_options=None,
+            file=DESCRIPTOR,
+            create_key=_descriptor._internal_create_key,
+        ),
+    ],
+    extensions=[],
+    nested_types=[],
+    enum_types=[],
+    serialized_options=None,
+    is_extendable=False,
+    syntax="proto3",
+    extension_ranges=[],
+    oneofs=[],
+    serialized_start=195,
+    serialized_end=236,
+)
+
+
+_OBSERVATIONS = _descriptor.Descriptor(
+    name="Observations",
+    full_name="worker.Observations",
+    filename=None,
+    file=DESCRIPTOR,
+    containing_type=None,
+    create_key=_descriptor._internal_create_key,
+    fields=[
+        _descriptor.FieldDescriptor(
+            name="observations",
+            full_name="worker.Observations.observations",
+            index=0,
+            number=1,
+            type=11,
+            cpp_type=10,
+            label=3,
+            has_default_value=False,
+            default_value=[],
+            message_type=None,
+            enum_type=None,
+            containing_type=None,
+            is_extension=False,
+            extension_scope=None,
+            serialized_options=None,
+            file=DESCRIPTOR,
+            create_key=_descriptor._internal_create_key,
+        ),
     ],
     extensions=[],
     nested_types=[],
@@ -161,14 +338,60 @@ _ACTION = _descriptor.Descriptor(
     syntax="proto3",
     extension_ranges=[],
     oneofs=[],
-    serialized_start=100,
-    serialized_end=124,
+    serialized_start=238,
+    serialized_end=295,
 )
 
+
+_ACTIONS = _descriptor.Descriptor(
+    name="Actions",
+    full_name="worker.Actions",
+    filename=None,
+    file=DESCRIPTOR,
+    containing_type=None,
+    create_key=_descriptor._internal_create_key,
+    fields=[
+        _descriptor.FieldDescriptor(
+            name="actions",
+            full_name="worker.Actions.actions",
+            index=0,
+            number=1,
+            type=11,
+            cpp_type=10,
+            label=3,
+            has_default_value=False,
+            default_value=[],
+            message_type=None,
+            enum_type=None,
+            containing_type=None,
+            is_extension=False,
+            extension_scope=None,
+            serialized_options=None,
+            file=DESCRIPTOR,
+            create_key=_descriptor._internal_create_key,
+        ),
+    ],
+    extensions=[],
+    nested_types=[],
+    enum_types=[],
+    serialized_options=None,
+    is_extendable=False,
+    syntax="proto3",
+    extension_ranges=[],
+    oneofs=[],
+    serialized_start=297,
+    serialized_end=339,
+)
+
+_OBSERVATIONS.fields_by_name["observations"].message_type = _OBSERVATION
+_ACTIONS.fields_by_name["actions"].message_type = _ACTION
 DESCRIPTOR.message_types_by_name["Specification"] = _SPECIFICATION
+DESCRIPTOR.message_types_by_name["Agent"] = _AGENT
 DESCRIPTOR.message_types_by_name["Status"] = _STATUS
 DESCRIPTOR.message_types_by_name["Observation"] = _OBSERVATION
 DESCRIPTOR.message_types_by_name["Action"] = _ACTION
+DESCRIPTOR.message_types_by_name["Observations"] = _OBSERVATIONS
+DESCRIPTOR.message_types_by_name["Actions"] = _ACTIONS
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 Specification = _reflection.GeneratedProtocolMessageType(
@@ -182,6 +405,17 @@ Specification = _reflection.GeneratedProtocolMessageType(
 )
 _sym_db.RegisterMessage(Specification)
 
+Agent = _reflection.GeneratedProtocolMessageType(
+    "Agent",
+    (_message.Message,),
+    {
+        "DESCRIPTOR": _AGENT,
+        "__module__": "worker_pb2"
+        # @@protoc_insertion_point(class_scope:worker.Agent)
+    },
+)
+_sym_db.RegisterMessage(Agent)
+
 Status = _reflection.GeneratedProtocolMessageType(
     "Status",
     (_message.Message,),
@@ -215,6 +449,28 @@ Action = _reflection.GeneratedProtocolMessageType(
 )
 _sym_db.RegisterMessage(Action)
 
+Observations = _reflection.GeneratedProtocolMessageType(
+    "Observations",
+    (_message.Message,),
+    {
+        "DESCRIPTOR": _OBSERVATIONS,
+        "__module__": "worker_pb2"
+        # @@protoc_insertion_point(class_scope:worker.Observations)
+    },
+)
+_sym_db.RegisterMessage(Observations)
+
+Actions = _reflection.GeneratedProtocolMessageType(
+    "Actions",
+    (_message.Message,),
+    {
+        "DESCRIPTOR": _ACTIONS,
+        "__module__": "worker_pb2"
+        # @@protoc_insertion_point(class_scope:worker.Actions)
+    },
+)
+_sym_db.RegisterMessage(Actions)
+
 
 _WORKER = _descriptor.ServiceDescriptor(
     name="Worker",
@@ -223,8 +479,8 @@ _WORKER = _descriptor.ServiceDescriptor(
     index=0,
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
-    serialized_start=126,
-    serialized_end=230,
+    serialized_start=342,
+    serialized_end=601,
     methods=[
         _descriptor.MethodDescriptor(
             name="build",
@@ -236,16 +492,46 @@ _WORKER = _descriptor.ServiceDescriptor(
             serialized_options=None,
             create_key=_descriptor._internal_create_key,
         ),
+        _descriptor.MethodDescriptor(
+            name="release",
+            full_name="worker.Worker.release",
+            index=1,
+            containing_service=None,
+            input_type=_AGENT,
+            output_type=_STATUS,
+            serialized_options=None,
+            create_key=_descriptor._internal_create_key,
+        ),
         _descriptor.MethodDescriptor(
             name="act",
             full_name="worker.Worker.act",
-            index=1,
+            index=2,
             containing_service=None,
             input_type=_OBSERVATION,
             output_type=_ACTION,
             serialized_options=None,
             create_key=_descriptor._internal_create_key,
         ),
+        _descriptor.MethodDescriptor(
+            name="act_stream",
+            full_name="worker.Worker.act_stream",
+            index=3,
+            containing_service=None,
+            input_type=_OBSERVATION,
+            output_type=_ACTION,
+            serialized_options=None,
+            create_key=_descriptor._internal_create_key,
+        ),
+        _descriptor.MethodDescriptor(
+            name="act_batch",
+            full_name="worker.Worker.act_batch",
+            index=4,
+            containing_service=None,
+            input_type=_OBSERVATIONS,
+            output_type=_ACTIONS,
+            serialized_options=None,
+            create_key=_descriptor._internal_create_key,
+        ),
     ],
 )
 _sym_db.RegisterServiceDescriptor(_WORKER)
@@ -19,11 +19,26 @@ class WorkerStub(object):
             request_serializer=worker__pb2.Specification.SerializeToString,
             response_deserializer=worker__pb2.Status.FromString,
         )
+        self.release = channel.unary_unary(
+            "/worker.Worker/release",
+            request_serializer=worker__pb2.Agent.SerializeToString,
+            response_deserializer=worker__pb2.Status.FromString,
+        )
         self.act = channel.unary_unary(
             "/worker.Worker/act",
             request_serializer=worker__pb2.Observation.SerializeToString,
             response_deserializer=worker__pb2.Action.FromString,
         )
+        self.act_stream = channel.stream_stream(
+            "/worker.Worker/act_stream",
+            request_serializer=worker__pb2.Observation.SerializeToString,
+            response_deserializer=worker__pb2.Action.FromString,
+        )
+        self.act_batch = channel.unary_unary(
+            "/worker.Worker/act_batch",
+            request_serializer=worker__pb2.Observations.SerializeToString,
+            response_deserializer=worker__pb2.Actions.FromString,
+        )
 
 
 class WorkerServicer(object):
@@ -35,12 +50,34 @@ class WorkerServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def release(self, request, context):
+        """Releases a built agent so that the worker can host another one."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def act(self, request, context):
         """Agent processes observations and returns action."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def act_stream(self, request_iterator, context):
+        """Agent processes a stream of observations over a single long-lived call
+        and returns one action per observation, in order.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def act_batch(self, request, context):
+        """Agents process a batch of observations, one per agent, and return the
+        actions in the same order. Agents sharing a policy act in a single call.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
 
 def add_WorkerServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -49,11 +86,26 @@ def add_WorkerServicer_to_server(servicer, server):
             request_deserializer=worker__pb2.Specification.FromString,
             response_serializer=worker__pb2.Status.SerializeToString,
         ),
+        "release": grpc.unary_unary_rpc_method_handler(
+            servicer.release,
+            request_deserializer=worker__pb2.Agent.FromString,
+            response_serializer=worker__pb2.Status.SerializeToString,
+        ),
         "act": grpc.unary_unary_rpc_method_handler(
             servicer.act,
             request_deserializer=worker__pb2.Observation.FromString,
             response_serializer=worker__pb2.Action.SerializeToString,
         ),
+        "act_stream": grpc.stream_stream_rpc_method_handler(
+            servicer.act_stream,
+            request_deserializer=worker__pb2.Observation.FromString,
+            response_serializer=worker__pb2.Action.SerializeToString,
+        ),
+        "act_batch": grpc.unary_unary_rpc_method_handler(
+            servicer.act_batch,
+            request_deserializer=worker__pb2.Observations.FromString,
+            response_serializer=worker__pb2.Actions.SerializeToString,
+        ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
         "worker.Worker", rpc_method_handlers
@@ -92,6 +144,33 @@ class Worker(object):
             metadata,
         )
 
+    @staticmethod
+    def release(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/worker.Worker/release",
+            worker__pb2.Agent.SerializeToString,
+            worker__pb2.Status.FromString,
+            options,
+            channel_credentials,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
     @staticmethod
     def act(
         request,
@@ -118,3 +197,57 @@ class Worker(object):
             timeout,
             metadata,
         )
+
+    @staticmethod
+    def act_stream(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            "/worker.Worker/act_stream",
+            worker__pb2.Observation.SerializeToString,
+            worker__pb2.Action.FromString,
+            options,
+            channel_credentials,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
+    @staticmethod
+    def act_batch(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/worker.Worker/act_batch",
+            worker__pb2.Observations.SerializeToString,
+            worker__pb2.Actions.FromString,
+            options,
+            channel_credentials,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
@@ -22,12 +22,14 @@
 
 import logging
 import os
+import threading
 import time
 
 import cloudpickle
 import grpc
 
-from smarts.zoo import worker_pb2, worker_pb2_grpc
+from smarts.core.agent import Agent
+from smarts.zoo import serialization, worker_pb2, worker_pb2_grpc
 
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(f"worker_servicer.py - pid({os.getpid()})")
@@ -37,14 +39,29 @@ class WorkerServicer(worker_pb2_grpc.WorkerServicer):
     """Provides methods that implement functionality of Worker Servicer."""
 
     def __init__(self):
-        self._agent = None
-        self._agent_spec = None
+        # Built agents and their specs, keyed by agent id.
+        self._agents = {}
+        self._agent_specs = {}
+        # Batchable agents (see `Agent.act_batch`) keyed by their policy group, so
+        # that agents of the same group share one policy.
+        self._shared_agents = {}
+        # A lock per policy, keyed by agent id. Agents sharing a policy share its lock
+        # since they are served concurrently by different calls.
+        self._locks = {}
 
     def build(self, request, context):
         time_start = time.time()
-        self._agent_spec = cloudpickle.loads(request.payload)
+        agent_spec = cloudpickle.loads(request.payload)
         pickle_load_time = time.time()
-        self._agent = self._agent_spec.build_agent()
+        agent, lock = self._shared_agents.get(request.group, (None, None))
+        if agent is None:
+            agent = agent_spec.build_agent()
+            lock = threading.Lock()
+            if request.group and type(agent).act_batch is not Agent.act_batch:
+                self._shared_agents[request.group] = (agent, lock)
+        self._agents[request.agent_id] = agent
+        self._locks[request.agent_id] = lock
+        self._agent_specs[request.agent_id] = agent_spec
         agent_build_time = time.time()
         log.debug(
             "Build agent timings:\n"
@@ -54,15 +71,76 @@ class WorkerServicer(worker_pb2_grpc.WorkerServicer):
         )
         return worker_pb2.Status()
 
+    def release(self, request, context):
+        agent = self._agents.pop(request.agent_id, None)
+        self._agent_specs.pop(request.agent_id, None)
+        self._locks.pop(request.agent_id, None)
+        if agent is not None and agent not in self._agents.values():
+            self._shared_agents = {
+                k: v for k, v in self._shared_agents.items() if v[0] is not agent
+            }
+        return worker_pb2.Status()
+
     def act(self, request, context):
-        if self._agent == None or self._agent_spec == None:
+        if request.agent_id not in self._agents:
             context.set_details(f"Remote agent not built yet.")
             context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
             return worker_pb2.Action()
 
-        adapted_obs = self._agent_spec.observation_adapter(
-            cloudpickle.loads(request.payload)
+        return self._act(request)
+
+    def act_stream(self, request_iterator, context):
+        for request in request_iterator:
+            if request.agent_id not in self._agents:
+                context.abort(
+                    grpc.StatusCode.FAILED_PRECONDITION, "Remote agent not built yet."
+                )
+            yield self._act(request)
+
+    def act_batch(self, request, context):
+        for observation in request.observations:
+            if observation.agent_id not in self._agents:
+                context.set_details(f"Remote agent not built yet.")
+                context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+                return worker_pb2.Actions()
+
+        # Gather the adapted observations of the agents sharing a policy.
+        batches = {}
+        for index, observation in enumerate(request.observations):
+            agent_spec = self._agent_specs[observation.agent_id]
+            adapted_obs = agent_spec.observation_adapter(
+                serialization.loads(observation.payload, observation.buffers)
+            )
+            agent = self._agents[observation.agent_id]
+            lock = self._locks[observation.agent_id]
+            batches.setdefault(id(agent), (agent, lock, []))[2].append(
+                (index, adapted_obs)
+            )
+
+        # Act once per policy and scatter the actions back in request order.
+        actions = [None] * len(request.observations)
+        for agent, lock, batch in batches.values():
+            indices, adapted_obs = zip(*batch)
+            with lock:
+                batch_actions = agent.act_batch(list(adapted_obs))
+            for index, action in zip(indices, batch_actions):
+                agent_id = request.observations[index].agent_id
+                adapted_action = self._agent_specs[agent_id].action_adapter(action)
+                payload, buffers = serialization.dumps(adapted_action)
+                actions[index] = worker_pb2.Action(
+                    action=payload, buffers=serialization.as_bytes(buffers)
+                )
+
+        return worker_pb2.Actions(actions=actions)
+
+    def _act(self, request):
+        agent_spec = self._agent_specs[request.agent_id]
+        observation = serialization.loads(request.payload, request.buffers)
+        adapted_obs = agent_spec.observation_adapter(observation)
+        with self._locks[request.agent_id]:
+            action = self._agents[request.agent_id].act(adapted_obs)
+        adapted_action = agent_spec.action_adapter(action)
+        payload, buffers = serialization.dumps(adapted_action)
+        return worker_pb2.Action(
+            action=payload, buffers=serialization.as_bytes(buffers)
         )
-        action = self._agent.act(adapted_obs)
-        adapted_action = self._agent_spec.action_adapter(action)
-        return worker_pb2.Action(action=cloudpickle.dumps(adapted_action))
@@ -334,6 +334,7 @@ def generate_left_turn_missions(
     bubbles,
     intersection_name,
     traffic_density,
+    route_in_process=False,
 ):
     # dont worry about these seeds, theyre used by sumo
     sumo_seed = random.choice([0, 1, 2, 3, 4])
@@ -421,7 +422,13 @@ def generate_left_turn_missions(
     vehicles_to_not_hijack = []
     traffic = Traffic(flows=all_flows)
     try:
-        gen_traffic(scenario, traffic, name=f"all", seed=sumo_seed)
+        gen_traffic(
+            scenario,
+            traffic,
+            name=f"all",
+            seed=sumo_seed,
+            route_in_process=route_in_process,
+        )
         if stops:
             add_stops_to_traffic(scenario, stops, vehicles_to_not_hijack)
     except Exception as exception:
@@ -656,6 +663,7 @@ def scenario_worker(
     stops,
     bubbles,
     dynamic_pattern_func,
+    route_in_process,
 ):
     for i, seed in enumerate(seeds):
         if not dynamic_pattern_func is None:
@@ -677,6 +685,7 @@ def scenario_worker(
             bubbles=bubbles,
             traffic_density=traffic_density,
             intersection_name=intersection_type,
+            route_in_process=route_in_process,
         )
     # print(
     #     f"{mode} {intersection_type} {speed} {traffic_density}, counts:{len(seeds)}, generated:{len(seeds)/len(total_seeds)}, real:{percent}"
@@ -693,6 +702,7 @@ def build_scenarios(
     shuffle_missions=True,
     pool_dir=None,
     dynamic_pattern_func=None,
+    route_in_process=False,
 ):
     print("Generating Scenario ...")
     manager = Manager()
@@ -801,6 +811,7 @@ def build_scenarios(
                         stops,
                         bubbles,
                         dynamic_pattern_func,
+                        route_in_process,
                     ),
                 )
                 jobs.append(sub_proc)
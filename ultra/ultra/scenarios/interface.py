@@ -79,6 +79,11 @@ if __name__ == "__main__":
         help="Do not shuffle ego missions.",
         action="store_false",
     )
+    parser_generate_scenarios.add_argument(
+        "--route-in-process",
+        help="Plan the traffic routes without running duarouter where possible.",
+        action="store_true",
+    )
 
     parser_generate_scenarios.set_defaults(which="generate")
 
@@ -147,6 +152,7 @@ if __name__ == "__main__":
             root_path=args.root_dir,
             pool_dir=args.pool_dir,
             shuffle_missions=args.no_mission_shuffle,
+            route_in_process=args.route_in_process,
         )
     else:
         ray.init()